@@ -0,0 +1,109 @@
+# archive.py
+"""
+Arsip bulanan: waktu arsip dan restore per bulan, ukuran database aktif
+sebelum/sesudah, dan laporan lintas partisi (PartitionedReader) dibanding
+laporan yang sama pada database tanpa arsip.
+
+    python -m benchmarks.archive --months 24 --per-month 5000 --keep-months 3
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from database.archive import Archiver, PartitionedReader
+from database.database import Database
+from benchmarks.workload import seed_history
+
+
+def file_size_mb(path):
+    size = os.path.getsize(path)
+    if os.path.exists(path + "-wal"):
+        size += os.path.getsize(path + "-wal")
+    return size / (1024 * 1024)
+
+
+def unarchived_monthly_sales(db, date_from, date_to):
+    """The same report as PartitionedReader.monthly_sales on one database"""
+    with db.read() as conn:
+        rows = conn.execute('''
+            SELECT substr(created_at, 1, 7), COUNT(*), SUM(final_amount)
+            FROM transactions
+            WHERE created_at >= ? AND created_at < date(?, '+1 day') AND status = 'completed'
+            GROUP BY 1 ORDER BY 1
+        ''', (date_from, date_to)).fetchall()
+    return [{'month': month, 'transaction_count': count, 'total_sales': total}
+            for month, count, total in rows]
+
+
+def bench_archive(tmp, months=24, per_month=5000, lines=5, keep_months=3, report_runs=5):
+    db_path = os.path.join(tmp, 'bench.db')
+    with Database(db_path) as db:
+        periods = seed_history(db, months, per_month, lines)
+        db.pool.checkpoint()
+    # Salinan tanpa arsip sebagai pembanding laporan
+    baseline_path = os.path.join(tmp, 'baseline.db')
+    shutil.copy(db_path, baseline_path)
+    date_from, date_to = periods[0] + "-01", periods[-1] + "-28"
+    
+    results = {'months': months, 'transactions_per_month': per_month}
+    with Database(db_path) as db:
+        results['hot_mb_before'] = file_size_mb(db_path)
+        archiver = Archiver(db, os.path.join(tmp, 'archive'), keep_months)
+        
+        start = time.perf_counter()
+        archived = archiver.archive_closed(vacuum=True)
+        elapsed = time.perf_counter() - start
+        results['archive'] = {
+            'periods': len(archived),
+            'seconds': elapsed,
+            'seconds_per_period': elapsed / len(archived) if archived else 0.0,
+            'rows_per_second': sum(r['transactions'] + r['transaction_details'] + r['inventory_logs']
+                                   for r in archived) / elapsed if elapsed else 0.0
+        }
+        results['hot_mb_after'] = file_size_mb(db_path)
+        
+        reader = PartitionedReader(db)
+        samples = []
+        for _ in range(report_runs):
+            start = time.perf_counter()
+            report = reader.monthly_sales(date_from, date_to)
+            samples.append(time.perf_counter() - start)
+        results['report_partitioned_ms'] = min(samples) * 1000
+        
+        with Database(baseline_path) as baseline:
+            samples = []
+            for _ in range(report_runs):
+                start = time.perf_counter()
+                expected = unarchived_monthly_sales(baseline, date_from, date_to)
+                samples.append(time.perf_counter() - start)
+        results['report_unarchived_ms'] = min(samples) * 1000
+        results['report_matches'] = (
+            [(r['month'], r['transaction_count'], round(r['total_sales'], 2)) for r in report] ==
+            [(r['month'], r['transaction_count'], round(r['total_sales'], 2)) for r in expected])
+        
+        if archived:
+            start = time.perf_counter()
+            archiver.restore_period(archived[0]['period'])
+            results['restore_seconds'] = time.perf_counter() - start
+    
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark arsip bulanan")
+    parser.add_argument('--months', type=int, default=24)
+    parser.add_argument('--per-month', type=int, default=5000)
+    parser.add_argument('--lines', type=int, default=5)
+    parser.add_argument('--keep-months', type=int, default=3)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        results = bench_archive(tmp, args.months, args.per_month, args.lines, args.keep_months)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
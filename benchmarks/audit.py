@@ -0,0 +1,123 @@
+# audit.py
+"""
+Throughput audit transaksi (TransactionAuditor, NumPy) dalam transaksi per
+detik, dibandingkan dengan calculate_final_amount per transaksi.
+
+    python -m benchmarks.audit --transactions 200000 --lines 5
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from core.audit import TransactionAuditor
+from core.transaction import TransactionCalculator
+from database.database import Database
+
+# Jenis kesalahan yang disuntikkan ke data uji
+FAULTS = ('line_subtotal', 'subtotal', 'discount', 'tax', 'final_amount')
+
+
+def seed_transactions(db, count, lines=5, fault_rate=0.001, seed=42):
+    """
+    Insert `count` transactions straight into the tables (no stock checks),
+    with roughly `fault_rate` of them corrupted. Returns the injected faults
+    as {transaction_id: fault}.
+    """
+    rng = random.Random(seed)
+    calculator = TransactionCalculator()
+    faults = {}
+    headers = []
+    details = []
+    for tid in range(1, count + 1):
+        items = [{'product_id': rng.randint(1, 1000), 'quantity': rng.randint(1, 5),
+                  'price': rng.randrange(1_000, 100_000, 500)} for _ in range(lines)]
+        pct = rng.choice([0, 0, 0, 5, 10])
+        result = calculator.calculate_final_amount(items, 'percentage' if pct else None, pct)
+        line_rows = [[tid, item['product_id'], item['quantity'], item['price'], 0,
+                      item['price'] * item['quantity']] for item in items]
+        
+        row = [tid, f"TRX{tid:012d}", 1, result['subtotal'], result['discount_amount'], pct,
+               result['tax_amount'], result['final_amount'],
+               f"2024-01-{1 + tid % 28:02d} 10:00:00"]
+        if rng.random() < fault_rate:
+            fault = rng.choice(FAULTS)
+            faults[tid] = fault
+            if fault == 'line_subtotal':
+                line_rows[0][5] += 1000
+                row[3] += 1000
+            elif fault == 'subtotal':
+                row[3] += 1000
+            elif fault == 'discount':
+                row[5] = 10 if pct != 10 else 5
+            elif fault == 'tax':
+                # Transaksi dengan tarif pajak lama (11%)
+                row[6] = (row[3] - row[4]) * 0.11
+            else:
+                row[7] += 1
+        headers.append(row)
+        details.extend(line_rows)
+    
+    with db.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO transactions (id, transaction_code, user_id, total_amount,
+                                      discount_amount, discount_percentage, tax_amount,
+                                      final_amount, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', headers)
+        conn.executemany('''
+            INSERT INTO transaction_details (transaction_id, product_id, quantity,
+                                             unit_price, discount, subtotal)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', details)
+    return faults
+
+
+def scalar_audit(db, limit):
+    """Baseline: one calculate_final_amount call per transaction"""
+    calculator = TransactionCalculator()
+    started = time.perf_counter()
+    with db.read() as conn:
+        headers = conn.execute('''
+            SELECT id, discount_percentage FROM transactions ORDER BY id LIMIT ?
+        ''', (limit,)).fetchall()
+        for tid, pct in headers:
+            items = [{'price': price, 'quantity': quantity} for price, quantity in conn.execute(
+                "SELECT unit_price, quantity FROM transaction_details WHERE transaction_id = ?",
+                (tid,))]
+            calculator.calculate_final_amount(items, 'percentage' if pct else None, pct)
+    elapsed = time.perf_counter() - started
+    return len(headers) / elapsed
+
+
+def bench_audit(transactions=200_000, lines=5, chunk_size=50_000, scalar_sample=20_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"))
+        try:
+            faults = seed_transactions(db, transactions, lines)
+            summary = TransactionAuditor(db, chunk_size=chunk_size).run(
+                os.path.join(tmp, "audit.csv"))
+            scalar_tps = scalar_audit(db, min(scalar_sample, transactions))
+        finally:
+            db.close()
+    
+    summary.pop('report_path')
+    summary['injected_faults'] = len(faults)
+    summary['scalar_transactions_per_second'] = scalar_tps
+    summary['speedup'] = summary['transactions_per_second'] / scalar_tps
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized transaction audit")
+    parser.add_argument('--transactions', type=int, default=200_000)
+    parser.add_argument('--lines', type=int, default=5)
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    args = parser.parse_args()
+    print(json.dumps(bench_audit(args.transactions, args.lines, args.chunk_size), indent=2))
+
+
+if __name__ == "__main__":
+    main()
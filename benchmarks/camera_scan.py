@@ -0,0 +1,56 @@
+# camera_scan.py
+"""
+Decode FPS dan latency ScanPipeline dari rekaman video atau folder gambar.
+
+    python -m benchmarks.camera_scan --video scan.mp4 --decoder pyzbar --scale 0.5
+    python -m benchmarks.camera_scan --images "frames/*.png" --workers 2 --roi 0.25 0.25 0.5 0.5
+"""
+import argparse
+import json
+from collections import Counter
+
+from utils.camera_scan import ImageSequenceSource, ScanPipeline, VideoFileSource
+
+
+def bench_camera_scan(source, decoder='pyzbar', workers=1, grayscale=True, scale=1.0,
+                      roi=None, debounce=1.0):
+    """Run the pipeline over a file source; returns stats plus the codes seen"""
+    codes = Counter()
+    
+    def on_code(code):
+        codes[code] += 1
+    
+    pipeline = ScanPipeline(source, on_code, decoder=decoder, workers=workers,
+                            grayscale=grayscale, scale=scale, roi=roi, debounce=debounce)
+    result = pipeline.run()
+    result['codes'] = dict(codes)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the camera scan pipeline")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--video', help="recorded video file")
+    group.add_argument('--images', help="glob pattern of image frames")
+    parser.add_argument('--realtime', action='store_true',
+                        help="pace video at its FPS and drop frames like a live camera")
+    parser.add_argument('--decoder', choices=['pyzbar', 'opencv'], default='pyzbar')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--color', action='store_true', help="skip grayscale conversion")
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--roi', type=float, nargs=4, metavar=('X', 'Y', 'W', 'H'),
+                        help="region of interest as fractions of the frame")
+    parser.add_argument('--debounce', type=float, default=1.0)
+    args = parser.parse_args()
+    
+    if args.video:
+        source = VideoFileSource(args.video, realtime=args.realtime)
+    else:
+        source = ImageSequenceSource(args.images)
+    result = bench_camera_scan(source, args.decoder, args.workers, not args.color,
+                               args.scale, args.roi, args.debounce)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# cart.py
+"""
+Cart (total berjalan) vs TransactionCalculator.calculate_final_amount per scan,
+plus cek paritas hasilnya.
+
+    python -m benchmarks.cart --lines 200 --baskets 50
+"""
+import argparse
+import json
+import random
+import time
+
+from core.transaction import Cart, TransactionCalculator
+from benchmarks.workload import basket_size
+
+DISCOUNTS = [(None, 0), ('percentage', 5), ('percentage', 12.5), ('fixed', 25_000)]
+
+
+def make_catalog(count, seed=42):
+    rng = random.Random(seed)
+    return [{'id': i, 'code': f"P{i:07d}", 'name': f"Produk {i}",
+             'selling_price': rng.randrange(1_500, 250_000, 500)} for i in range(count)]
+
+
+def scan_script(rng, catalog, lines):
+    """Random scans, quantity changes, removals and undos for one basket"""
+    ops = []
+    in_cart = []
+    for product in rng.sample(catalog, lines):
+        ops.append(('add', product, rng.randint(1, 3)))
+        in_cart.append(product['id'])
+        roll = rng.random()
+        if roll < 0.1:
+            ops.append(('set', rng.choice(in_cart), rng.randint(1, 10)))
+        elif roll < 0.15:
+            ops.append(('undo',))
+    ops.append(('discount',) + rng.choice(DISCOUNTS))
+    return ops
+
+
+def check_parity(cart, calculator):
+    # Cart membulatkan diskon dan pajak ke rupiah (masing-masing <= 0.5),
+    # jadi final bisa bergeser paling banyak 0.5 x 1.1 + 0.5 dari hitungan float
+    expected = calculator.calculate_final_amount(cart.items(), cart.discount_type,
+                                                 cart.discount_value)
+    totals = cart.totals()
+    return all(abs(totals[key] - expected[key]) <= 1.05 for key in expected)
+
+
+def bench_cart(lines=200, baskets=50, seed=7):
+    rng = random.Random(seed)
+    catalog = make_catalog(max(lines * 5, 1000))
+    scripts = [scan_script(rng, catalog, lines) for _ in range(baskets)]
+    calculator = TransactionCalculator()
+    
+    mismatches = 0
+    incremental = 0.0
+    recompute = 0.0
+    for ops in scripts:
+        cart = Cart(calculator)
+        for op in ops:
+            if op[0] == 'add':
+                cart.add(op[1], op[2])
+            elif op[0] == 'set':
+                if op[1] in cart:
+                    cart.set_quantity(op[1], op[2])
+            elif op[0] == 'undo':
+                cart.undo()
+            else:
+                cart.set_discount(op[1], op[2])
+            
+            # GUI menghitung ulang total setelah setiap scan: bandingkan kedua cara
+            start = time.perf_counter()
+            cart.totals()
+            incremental += time.perf_counter() - start
+            
+            start = time.perf_counter()
+            calculator.calculate_final_amount(cart.items(), cart.discount_type, cart.discount_value)
+            recompute += time.perf_counter() - start
+            
+            if not check_parity(cart, calculator):
+                mismatches += 1
+    
+    updates = sum(len(ops) for ops in scripts)
+    return {
+        'lines_per_basket': lines,
+        'baskets': baskets,
+        'updates': updates,
+        'parity_mismatches': mismatches,
+        'cart_totals_us': incremental / updates * 1e6,
+        'calculate_final_amount_us': recompute / updates * 1e6,
+        'speedup': recompute / incremental if incremental else None
+    }
+
+
+def bench_calculator(baskets=20_000, seed=5):
+    """calculate_final_amount once per checkout, on realistic basket sizes"""
+    rng = random.Random(seed)
+    catalog = make_catalog(1000)
+    calculator = TransactionCalculator()
+    inputs = []
+    for _ in range(baskets):
+        items = [{'price': product['selling_price'], 'quantity': rng.randint(1, 3)}
+                 for product in rng.sample(catalog, basket_size(rng))]
+        inputs.append((items,) + rng.choice(DISCOUNTS))
+    
+    start = time.perf_counter()
+    for items, discount_type, discount_value in inputs:
+        calculator.calculate_final_amount(items, discount_type, discount_value)
+    elapsed = time.perf_counter() - start
+    
+    return {
+        'baskets': baskets,
+        'mean_lines': sum(len(items) for items, _, _ in inputs) / baskets,
+        'calculate_final_amount_us': elapsed / baskets * 1e6,
+        'baskets_per_second': baskets / elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental cart totals")
+    parser.add_argument('--lines', type=int, default=200)
+    parser.add_argument('--baskets', type=int, default=50)
+    parser.add_argument('--calculator', action='store_true',
+                        help="time calculate_final_amount on realistic basket sizes instead")
+    args = parser.parse_args()
+    if args.calculator:
+        result = bench_calculator(args.baskets)
+    else:
+        result = bench_cart(args.lines, args.baskets)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
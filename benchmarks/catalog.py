@@ -0,0 +1,67 @@
+# catalog.py
+"""
+Memori per 100k SKU dan latensi lookup ProductCatalog.
+
+    python -m benchmarks.catalog --products 100000
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from database.database import Database
+from core.catalog import ProductCatalog
+from benchmarks.workload import seed_products
+
+
+def bench_catalog(db, lookups=200_000, seed=11):
+    """Return load time, memory and lookup latency for the products in `db`"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    catalog = ProductCatalog(db, subscribe=False)
+    load_s = time.perf_counter() - start
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    count = len(catalog)
+    rng = random.Random(seed)
+    entries = list(catalog._by_id.values())
+    payloads = []
+    for _ in range(lookups):
+        entry = rng.choice(entries)
+        if rng.random() < 0.5:
+            payloads.append(f"PRODUCT:{entry.code}|{entry.name}|{entry.selling_price}")
+        else:
+            payloads.append(entry.barcode_data)
+    
+    resolve = catalog.resolve
+    start = time.perf_counter()
+    for payload in payloads:
+        resolve(payload)
+    lookup_s = time.perf_counter() - start
+    
+    usage = catalog.memory_usage()
+    return {
+        'products': count,
+        'load_ms': load_s * 1000,
+        'traced_bytes_per_100k': traced / count * 100_000 if count else 0,
+        'estimated_bytes_per_100k': usage['bytes_per_100k'],
+        'lookup_ns': lookup_s / lookups * 1e9,
+        'lookups_per_second': lookups / lookup_s
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ProductCatalog")
+    parser.add_argument('--products', type=int, default=100_000)
+    parser.add_argument('--lookups', type=int, default=200_000)
+    args = parser.parse_args()
+    
+    with Database(':memory:') as db:
+        seed_products(db, args.products)
+        print(json.dumps(bench_catalog(db, args.lookups), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# checkout.py
+"""
+Latensi Database.record_sale per ukuran keranjang.
+
+    python -m benchmarks.checkout --sizes 1 10 50 --runs 200
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from database.database import Database
+from benchmarks.workload import seed_products, make_cart
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def bench_checkout(db, basket_sizes=(1, 10, 50, 100), runs=200, seed=7):
+    """Return latency stats (ms) of record_sale for each basket size"""
+    rng = random.Random(seed)
+    with db.read() as conn:
+        prices = {row[0]: row[1] for row in conn.execute("SELECT id, selling_price FROM products")}
+    
+    results = {}
+    for size in basket_sizes:
+        samples = []
+        for _ in range(runs):
+            cart = make_cart(rng, prices, size)
+            start = time.perf_counter()
+            db.record_sale(cart, {'method': 'cash', 'cash_paid': cart['final_amount']})
+            samples.append((time.perf_counter() - start) * 1000)
+        
+        results[f"basket_{size}"] = {
+            'runs': runs,
+            'mean_ms': statistics.mean(samples),
+            'p50_ms': percentile(samples, 50),
+            'p95_ms': percentile(samples, 95),
+            'max_ms': max(samples)
+        }
+    
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark record_sale")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 50, 100])
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--products', type=int, default=5000)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        with Database(os.path.join(tmp, 'bench.db')) as db:
+            seed_products(db, max(args.products, max(args.sizes)))
+            results = bench_checkout(db, args.sizes, args.runs)
+    
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
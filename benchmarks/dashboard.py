@@ -0,0 +1,71 @@
+# dashboard.py
+"""
+Latensi query dashboard admin (kartu statistik, grafik 7 hari, ringkasan
+30 hari, stok rendah dan halaman pertama daftar transaksi) pada database
+hasil seed_workload.
+
+    python -m benchmarks.dashboard --products 5000 --users 20 --transactions 100000
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from database.database import Database
+from benchmarks.checkout import percentile
+from benchmarks.workload import seed_workload
+
+
+def bench_dashboard(db, runs=200):
+    """Latency stats (ms) for each query the dashboard issues on refresh"""
+    today = datetime.now().date()
+    month_ago = (today - timedelta(days=29)).strftime('%Y-%m-%d')
+    today = today.strftime('%Y-%m-%d')
+    queries = {
+        'today_stats': db.get_today_stats,
+        'sales_series_7d': lambda: db.get_sales_series(7),
+        'sales_summary_30d': lambda: db.get_sales_summary(month_ago, today),
+        'low_stock': db.get_low_stock,
+        'transactions_first_page': lambda: db.search_transactions(limit=100),
+        'transactions_count_30d': lambda: db.count_transactions(date_from=month_ago,
+                                                                date_to=today),
+    }
+    
+    results = {}
+    for name, query in queries.items():
+        query()
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            query()
+            samples.append((time.perf_counter() - start) * 1000)
+        results[name] = {
+            'runs': runs,
+            'mean_ms': statistics.mean(samples),
+            'p50_ms': percentile(samples, 50),
+            'p95_ms': percentile(samples, 95)
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark query dashboard")
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--transactions', type=int, default=100_000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        with Database(os.path.join(tmp, 'bench.db')) as db:
+            workload = seed_workload(db, args.products, args.users, args.transactions, args.days)
+            results = {'workload': workload, 'queries': bench_dashboard(db, args.runs)}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
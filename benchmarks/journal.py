@@ -0,0 +1,85 @@
+# journal.py
+"""
+Journal penjualan: throughput checkout lewat journal dibanding record_sale
+langsung dan kecepatan applier. Uji pemulihan (kill, ekor terpotong, CRC
+rusak) ada di tests/test_journal.py.
+
+    python -m benchmarks.journal --threads 1 4 --sales 500
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+from database.database import Database
+from database.journal import JournaledSales
+from benchmarks.server import run_terminals
+from benchmarks.workload import seed_products
+
+
+def product_prices(db):
+    with db.read() as conn:
+        return {row[0]: row[1] for row in conn.execute("SELECT id, selling_price FROM products")}
+
+
+def bench_journal(db_path, journal_path, thread_counts=(1, 4), sales=500, basket_size=5,
+                  fsync_window_ms=0):
+    """Checkout throughput through the journal vs direct record_sale, plus apply rate"""
+    results = {}
+    with Database(db_path) as db:
+        prices = product_prices(db)
+        for threads in thread_counts:
+            # Applier dimatikan saat mengukur checkout, diukur terpisah sesudahnya
+            sales_front = JournaledSales(db, journal_path, fsync_window_ms, autostart=False)
+            handle = SimpleNamespace(record_sale=sales_front.record_sale, close=lambda: None)
+            stats = run_terminals(threads, sales, prices, lambda: handle, basket_size)
+            stats['fsyncs'] = sales_front.journal.fsyncs
+            
+            start = time.perf_counter()
+            applied = sales_front.flush()
+            elapsed = time.perf_counter() - start
+            stats['applied_per_second'] = applied / elapsed if elapsed else 0.0
+            sales_front.close()
+            results[f"journal_{threads}"] = stats
+            
+            results[f"direct_{threads}"] = run_terminals(threads, sales, prices,
+                                                         lambda: Database(db_path), basket_size)
+            # Pembanding yang sama tahan mati listrik: fsync di setiap commit
+            results[f"direct_full_sync_{threads}"] = run_terminals(threads, sales, prices,
+                                                                   full_sync_database(db_path),
+                                                                   basket_size)
+    return results
+
+
+def full_sync_database(db_path):
+    def connect():
+        db = Database(db_path)
+        db.pool.writer.execute("PRAGMA synchronous=FULL")
+        return db
+    return connect
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark journal penjualan")
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--sales', type=int, default=500)
+    parser.add_argument('--basket', type=int, default=5)
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--fsync-window-ms', type=float, default=0)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        journal_path = os.path.join(tmp, 'sales.journal')
+        with Database(db_path) as db:
+            seed_products(db, args.products)
+        results = bench_journal(db_path, journal_path, args.threads, args.sales, args.basket,
+                                args.fsync_window_ms)
+    
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# keyboard_wedge.py
+"""
+Deteksi burst dan latency KeyboardWedgeReader dari trace keystroke.
+
+    python -m benchmarks.keyboard_wedge --scans 500 --speed 0
+    python -m benchmarks.keyboard_wedge --trace kasir1.jsonl --speed 1
+    python -m benchmarks.keyboard_wedge --scans 50 --save-trace synthetic.jsonl
+"""
+import argparse
+import json
+import random
+
+from utils.keyboard_wedge import (BurstDetector, EventBus, KeyboardWedgeReader,
+                                  load_trace, replay_trace, save_trace)
+
+
+def make_trace(scans=500, seed=42, scanner_gap_ms=(2, 8), human_gap_ms=(90, 300),
+               human_words=0.3, terminator='enter'):
+    """
+    Synthetic keystrokes: scanner bursts (13-digit codes plus terminator)
+    with human typing mixed in. Returns (trace, expected_codes).
+    """
+    rng = random.Random(seed)
+    trace = []
+    expected = []
+    t = 0.0
+    for _ in range(scans):
+        if rng.random() < human_words:
+            for char in rng.choice(["cari", "kopi", "gula", "123"]):
+                t += rng.uniform(*human_gap_ms) / 1000
+                trace.append((char, t))
+            t += rng.uniform(*human_gap_ms) / 1000
+        
+        code = "".join(rng.choice("0123456789") for _ in range(13))
+        expected.append(code)
+        t += rng.uniform(200, 800) / 1000
+        for char in code + "\n":
+            trace.append((terminator if char == "\n" else char, t))
+            t += rng.uniform(*scanner_gap_ms) / 1000
+    return trace, expected
+
+
+def bench_keyboard_wedge(trace, expected=None, speed=0, max_gap_ms=30):
+    """Replay a trace; returns code counts, accuracy against expected and latency"""
+    codes = []
+    bus = EventBus()
+    reader = KeyboardWedgeReader(bus, BurstDetector(max_gap_ms=max_gap_ms))
+    reader.subscribe(codes.append)
+    reader.start()
+    replay_trace(reader, trace, speed=speed)
+    reader.stop()
+    
+    result = {
+        'keystrokes': len(trace),
+        'codes': len(codes),
+        'human_keys': reader.detector.human_keys,
+        'latency': reader.latency.summary()
+    }
+    if expected is not None:
+        result['expected_codes'] = len(expected)
+        result['exact_match'] = codes == expected
+        result['missed'] = len(set(expected) - set(codes))
+        result['spurious'] = len(set(codes) - set(expected))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark keyboard-wedge scanner input")
+    parser.add_argument('--trace', help="recorded trace (JSON lines); default: synthetic")
+    parser.add_argument('--scans', type=int, default=500)
+    parser.add_argument('--speed', type=float, default=0,
+                        help="1 = real time, 0 = as fast as possible")
+    parser.add_argument('--max-gap-ms', type=float, default=30)
+    parser.add_argument('--save-trace', help="write the synthetic trace to this file")
+    args = parser.parse_args()
+    
+    if args.trace:
+        trace, expected = load_trace(args.trace), None
+    else:
+        trace, expected = make_trace(args.scans)
+        if args.save_trace:
+            save_trace(trace, args.save_trace)
+    print(json.dumps(bench_keyboard_wedge(trace, expected, args.speed, args.max_gap_ms), indent=2))
+
+
+if __name__ == "__main__":
+    main()
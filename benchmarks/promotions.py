@@ -0,0 +1,103 @@
+# promotions.py
+"""
+Biaya evaluasi PromotionEngine per perubahan keranjang, terhadap jumlah rule
+dan ukuran keranjang; dibandingkan dengan evaluasi penuh setiap perubahan.
+
+    python -m benchmarks.promotions --rules 10 100 1000 --lines 20 200
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks.workload import CATEGORIES
+from core.promotions import BUNDLE_PRICE, BUY_N_GET_M, TIERED_PERCENTAGE, PromotionEngine
+from core.transaction import Cart
+
+
+def make_rules(count, product_count, seed=42):
+    """Random rules; most target a few product codes, some a whole category"""
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        rule_type = rng.choice([BUY_N_GET_M, BUNDLE_PRICE, TIERED_PERCENTAGE])
+        definition = {'name': f"Promo {i}", 'type': rule_type}
+        if rng.random() < 0.1:
+            definition['categories'] = [rng.choice(CATEGORIES)]
+        else:
+            definition['products'] = [f"P{rng.randrange(product_count):07d}"
+                                      for _ in range(rng.randint(1, 5))]
+        if rule_type == BUY_N_GET_M:
+            definition.update(n=rng.randint(1, 3), m=1)
+        elif rule_type == BUNDLE_PRICE:
+            definition.update(quantity=rng.randint(2, 4), price=rng.randrange(5_000, 50_000, 500))
+        else:
+            definition['tiers'] = [[6, 2.5], [12, 5], [24, 10]]
+        rules.append(definition)
+    return rules
+
+
+def make_products(count, seed=42):
+    rng = random.Random(seed)
+    return [{'id': i, 'code': f"P{i:07d}", 'name': f"Produk {i}",
+             'category': rng.choice(CATEGORIES),
+             'selling_price': rng.randrange(1_500, 100_000, 500)} for i in range(count)]
+
+
+def bench_promotions(rule_counts=(10, 100, 1000), line_counts=(20, 200), products=5000,
+                     baskets=20, seed=7):
+    catalog = make_products(products)
+    results = []
+    for rule_count in rule_counts:
+        definitions = make_rules(rule_count, products)
+        for lines in line_counts:
+            rng = random.Random(seed)
+            incremental = 0.0
+            full = 0.0
+            updates = 0
+            evaluations = 0
+            mismatches = 0
+            for _ in range(baskets):
+                engine = PromotionEngine(definitions)
+                reference = PromotionEngine(definitions)
+                cart = Cart(promotions=engine)
+                for product in rng.sample(catalog, lines):
+                    start = time.perf_counter()
+                    cart.add(product, rng.randint(1, 6))
+                    cart.totals()
+                    incremental += time.perf_counter() - start
+                    
+                    # Pembanding: evaluasi ulang semua rule atas seluruh keranjang
+                    start = time.perf_counter()
+                    expected = reference.evaluate(cart.items())
+                    full += time.perf_counter() - start
+                    updates += 1
+                    if expected != engine.discount:
+                        mismatches += 1
+                evaluations += engine.evaluations
+            
+            results.append({
+                'rules': rule_count,
+                'lines': lines,
+                'updates': updates,
+                'rule_evaluations_per_update': evaluations / updates,
+                'incremental_us': incremental / updates * 1e6,
+                'full_reevaluation_us': full / updates * 1e6,
+                'mismatches': mismatches
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the promotion engine")
+    parser.add_argument('--rules', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--lines', type=int, nargs='+', default=[20, 200])
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--baskets', type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(bench_promotions(args.rules, args.lines, args.products, args.baskets),
+                     indent=2))
+
+
+if __name__ == "__main__":
+    main()
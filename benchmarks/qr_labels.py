@@ -0,0 +1,86 @@
+# qr_labels.py
+"""
+Throughput QRGenerator.generate_bulk_qr dalam label per detik.
+
+    python -m benchmarks.qr_labels --products 2000 --copies 3 --workers 1 4
+    python -m benchmarks.qr_labels --sheet --products 5000 --template A4_3x10
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from core.label_sheet import write_label_sheet
+from core.qr_generator import QRGenerator
+
+
+def make_products(count):
+    return [{'code': f"P{i:07d}", 'name': f"Produk {i}", 'selling_price': 1_000 + i * 500}
+            for i in range(count)]
+
+
+def bench_bulk_qr(products=2000, copies=3, worker_counts=(1, None)):
+    """Labels per second (copies included) for each worker count; None = CPU count"""
+    data = make_products(products)
+    results = {}
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            generator = QRGenerator(output_dir=tmp)
+            start = time.perf_counter()
+            files, _ = generator.generate_bulk_qr(data, copies, workers=workers)
+            elapsed = time.perf_counter() - start
+        
+        label = f"workers_{workers or os.cpu_count()}"
+        results[label] = {
+            'labels': len(files),
+            'unique_images': products,
+            'seconds': elapsed,
+            'labels_per_second': len(files) / elapsed,
+            'images_per_second': products / elapsed
+        }
+    return results
+
+
+def bench_label_sheet(products=2000, copies=3, template='A4_3x10', max_pages_per_file=None):
+    """Vector label-sheet PDF: labels per second, pages and output size"""
+    import resource
+    
+    data = make_products(products)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        files = write_label_sheet(iter(data), os.path.join(tmp, "labels.pdf"), template,
+                                  copies=copies, max_pages_per_file=max_pages_per_file)
+        elapsed = time.perf_counter() - start
+        size = sum(os.path.getsize(path) for path in files)
+    
+    labels = products * copies
+    return {
+        'template': template,
+        'labels': labels,
+        'files': len(files),
+        'seconds': elapsed,
+        'labels_per_second': labels / elapsed,
+        'pdf_bytes': size,
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk QR label generation")
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--copies', type=int, default=3)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--sheet', action='store_true', help="benchmark the vector label sheet")
+    parser.add_argument('--template', default='A4_3x10')
+    parser.add_argument('--pages-per-file', type=int, default=None)
+    args = parser.parse_args()
+    if args.sheet:
+        result = bench_label_sheet(args.products, args.copies, args.template, args.pages_per_file)
+    else:
+        result = bench_bulk_qr(args.products, args.copies, args.workers)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
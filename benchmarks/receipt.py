@@ -0,0 +1,64 @@
+# receipt.py
+"""
+Bandingkan jalur PDF (reportlab) dan ESC/POS untuk struk yang sama.
+
+    python -m benchmarks.receipt --lines 5 20 50 --runs 50
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from core.printer import ReceiptPrinter
+from benchmarks.workload import make_receipt_data
+
+
+def _time_ms(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'mean_ms': statistics.mean(samples), 'min_ms': min(samples)}
+
+
+def bench_receipts(line_counts=(5, 20, 50), runs=50, seed=3, include_pdf=True):
+    """Per line count: ESC/POS render time and (if reportlab is installed) PDF time"""
+    rng = random.Random(seed)
+    printer = ReceiptPrinter()
+    results = {}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "receipt.pdf")
+        for lines in line_counts:
+            data = make_receipt_data(rng, lines)
+            entry = {'escpos': _time_ms(lambda: printer.render_raw(data), runs),
+                     'escpos_bytes': len(printer.render_raw(data))}
+            
+            if include_pdf:
+                try:
+                    import reportlab  # noqa: F401
+                except ImportError:
+                    entry['pdf'] = None
+                else:
+                    entry['pdf'] = _time_ms(lambda: printer.generate_receipt(data, pdf_path), runs)
+                    entry['pdf_bytes'] = os.path.getsize(pdf_path)
+            
+            results[f"lines_{lines}"] = entry
+    
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark struk PDF vs ESC/POS")
+    parser.add_argument('--lines', type=int, nargs='+', default=[5, 20, 50])
+    parser.add_argument('--runs', type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(bench_receipts(args.lines, args.runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# reports.py
+"""
+Ekspor laporan (core/reports.py): waktu, baris/detik dan puncak memori
+Python (tracemalloc) untuk rentang tanggal yang makin panjang. Memori
+seharusnya datar terhadap rentang, bukan naik sebanding jumlah baris.
+
+    python -m benchmarks.reports --months 12 --per-month 5000 --format csv
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from core.reports import REPORTS, ReportEngine
+from database.database import Database
+from benchmarks.workload import seed_history
+
+
+def measure_report(engine, report, output_path, date_from, date_to):
+    tracemalloc.start()
+    try:
+        summary = engine.run(report, output_path, date_from, date_to)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'rows_read': summary['rows_read'],
+        'rows_written': summary['rows_written'],
+        'seconds': summary['seconds'],
+        'rows_per_second': summary['rows_read'] / summary['seconds'] if summary['seconds'] else 0.0,
+        'peak_mb': peak / (1024 * 1024),
+        'file_kb': os.path.getsize(output_path) / 1024
+    }
+
+
+def bench_reports(tmp, months=12, per_month=5000, lines=5, extension='.csv', reports=None,
+                  fetch_size=2000):
+    db_path = os.path.join(tmp, 'bench.db')
+    with Database(db_path) as db:
+        periods = seed_history(db, months, per_month, lines)
+        db.pool.checkpoint()
+    
+    # Rentang 1 bulan, seperempat, separuh dan seluruh riwayat
+    spans = sorted({1, max(1, months // 4), max(1, months // 2), months})
+    results = {'months': months, 'transactions_per_month': per_month, 'format': extension,
+               'reports': {}}
+    with Database(db_path) as db:
+        engine = ReportEngine(db, fetch_size)
+        for report in reports or sorted(REPORTS):
+            runs = []
+            for span in spans:
+                output_path = os.path.join(tmp, f"{report}_{span}{extension}")
+                entry = measure_report(engine, report, output_path,
+                                       periods[-span] + "-01", periods[-1] + "-28")
+                entry['months'] = span
+                runs.append(entry)
+                os.remove(output_path)
+            results['reports'][report] = runs
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ekspor laporan streaming")
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--per-month', type=int, default=5000)
+    parser.add_argument('--lines', type=int, default=5)
+    parser.add_argument('--format', choices=['csv', 'xlsx', 'parquet'], default='csv')
+    parser.add_argument('--report', action='append', choices=sorted(REPORTS))
+    parser.add_argument('--fetch-size', type=int, default=2000)
+    args = parser.parse_args()
+    
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        results = bench_reports(tmp, args.months, args.per_month, args.lines,
+                                '.' + args.format, args.report, args.fetch_size)
+    results['total_seconds'] = time.perf_counter() - started
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# server.py
+"""
+Throughput record_sale dari beberapa terminal: lewat SalesServer (group
+commit) dibanding setiap terminal membuka Database sendiri pada file yang sama.
+
+    python -m benchmarks.server --terminals 1 4 8 --sales 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from database.database import Database
+from database.server import SalesServer, DatabaseClient
+from benchmarks.checkout import percentile
+from benchmarks.workload import seed_products, make_cart
+
+
+def run_terminals(terminals, sales, prices, connect, basket_size=5, seed=11):
+    """
+    Run `terminals` threads, each doing `sales` record_sale calls through
+    its own connect() handle. Returns throughput and latency stats.
+    """
+    samples = []
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(terminals + 1)
+    
+    def terminal(index):
+        rng = random.Random(seed + index)
+        carts = [make_cart(rng, prices, basket_size, user_id=1) for _ in range(sales)]
+        handle = connect()
+        latencies = []
+        try:
+            barrier.wait()
+            for cart in carts:
+                start = time.perf_counter()
+                try:
+                    handle.record_sale(cart, {'method': 'cash', 'cash_paid': cart['final_amount']})
+                except Exception as e:
+                    with lock:
+                        errors.append(repr(e))
+                latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            handle.close()
+        with lock:
+            samples.extend(latencies)
+    
+    threads = [threading.Thread(target=terminal, args=(i,)) for i in range(terminals)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    return {
+        'terminals': terminals,
+        'sales': len(samples),
+        'errors': len(errors),
+        'sales_per_second': len(samples) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(samples, 50),
+        'p95_ms': percentile(samples, 95),
+        'max_ms': max(samples)
+    }
+
+
+def login_client(server, username="admin", password="admin123"):
+    """DatabaseClient logged in with the default admin account"""
+    client = DatabaseClient(server.host, server.port)
+    if client.authenticate_user(username, password) is None:
+        raise ValueError("Login ke sales server gagal")
+    return client
+
+
+class BackgroundServer:
+    """SalesServer on its own event loop thread (port 0 = any free port)"""
+    
+    def __init__(self, db, **options):
+        self.server = SalesServer(host="127.0.0.1", port=0, db=db, **options)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+    
+    def __enter__(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.server.start(), self.loop).result()
+        return self.server
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        asyncio.run_coroutine_threadsafe(self.server.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+def bench_server(db_path, terminal_counts=(1, 4, 8), sales=200, basket_size=5,
+                 max_batch=64, batch_window_ms=0):
+    """Compare SalesServer against direct per-terminal Database connections"""
+    with Database(db_path) as db:
+        with db.read() as conn:
+            prices = {row[0]: row[1] for row in conn.execute("SELECT id, selling_price FROM products")}
+        
+        results = {}
+        for terminals in terminal_counts:
+            with BackgroundServer(db, max_batch=max_batch, batch_window_ms=batch_window_ms) as server:
+                stats = run_terminals(terminals, sales, prices,
+                                      lambda: login_client(server),
+                                      basket_size)
+                stats['avg_batch'] = server.sales / server.batches if server.batches else 0.0
+            results[f"server_{terminals}"] = stats
+            
+            # Pembanding: setiap terminal membuka Database sendiri dan berebut write lock
+            results[f"direct_{terminals}"] = run_terminals(terminals, sales, prices,
+                                                           lambda: Database(db_path), basket_size)
+    
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sales server multi-terminal")
+    parser.add_argument('--terminals', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--sales', type=int, default=200)
+    parser.add_argument('--basket', type=int, default=5)
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--batch-window-ms', type=float, default=0)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        with Database(db_path) as db:
+            seed_products(db, args.products)
+        results = bench_server(db_path, args.terminals, args.sales, args.basket,
+                               args.max_batch, args.batch_window_ms)
+    
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+# suite.py
+"""
+Suite benchmark headless (tanpa Tk, printer atau kamera) untuk jalur panas
+kasir. Semua data berasal dari generator ber-seed di benchmarks/workload.py,
+jadi hasil antar-run bisa dibandingkan. Hasil ditulis sebagai JSON dan bisa
+dibandingkan dengan baseline yang disimpan; metrik yang memburuk melebihi
+toleransi dilaporkan dan exit code menjadi 1.
+
+    python -m benchmarks.suite --output hasil.json
+    python -m benchmarks.suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --tolerance 0.25
+    python -m benchmarks.suite --only checkout dashboard --scale full
+"""
+import argparse
+import glob
+import importlib.util
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from database.database import Database
+from benchmarks.workload import seed_products, seed_workload
+
+# Ukuran data per skala; quick untuk cek cepat sebelum commit, full untuk angka rilis
+SCALES = {
+    'quick': {'products': 2000, 'users': 10, 'transactions': 20_000, 'runs': 50,
+              'labels': 50, 'months': 4, 'per_month': 2000, 'sales': 100},
+    'full': {'products': 20_000, 'users': 30, 'transactions': 200_000, 'runs': 200,
+             'labels': 500, 'months': 12, 'per_month': 10_000, 'sales': 500},
+}
+
+# Akhiran nama metrik -> arah yang lebih baik; metrik lain hanya informasi
+LOWER_IS_BETTER = ('_ms', '_us', '_ns', 'seconds', '_mb', '_bytes', '_per_100k')
+HIGHER_IS_BETTER = ('per_second', 'speedup')
+
+# Latensi per panggilan (ms/detik): selisih di bawah ini dianggap noise. Metrik
+# _us/_ns adalah rata-rata ribuan panggilan, jadi tanpa batas bawah
+NOISE_FLOOR_MS = 0.05
+
+# Ekor distribusi (p95/max) terlalu berisik untuk gerbang regresi, hanya dicatat
+TAIL_PREFIXES = ('p95_', 'p99_', 'max_')
+
+# Metrik kebenaran: tidak boleh naik / turun sama sekali dibanding baseline
+MUST_NOT_RISE = ('parity_mismatches', 'mismatches', 'missing', 'duplicates', 'missed', 'spurious')
+MUST_NOT_DROP = ('exact_match', 'report_matches', 'decoded')
+
+
+def bench_checkout(tmp, scale):
+    from benchmarks.checkout import bench_checkout
+    
+    with Database(os.path.join(tmp, 'checkout.db')) as db:
+        seed_products(db, scale['products'])
+        return bench_checkout(db, (1, 5, 20, 50), scale['runs'])
+
+
+def bench_catalog(tmp, scale):
+    from benchmarks.catalog import bench_catalog
+    
+    with Database(':memory:') as db:
+        seed_products(db, scale['products'])
+        return bench_catalog(db, scale['runs'] * 1000)
+
+
+def bench_calculator(tmp, scale):
+    from benchmarks.cart import bench_calculator
+    
+    return bench_calculator(scale['runs'] * 200)
+
+
+def bench_cart(tmp, scale):
+    from benchmarks.cart import bench_cart
+    
+    return bench_cart(200, max(10, scale['runs'] // 5))
+
+
+def bench_promotions(tmp, scale):
+    from benchmarks.promotions import bench_promotions
+    
+    return bench_promotions((10, 100), (20, 200), scale['products'], baskets=10)
+
+
+def bench_dashboard(tmp, scale):
+    from benchmarks.dashboard import bench_dashboard
+    
+    with Database(os.path.join(tmp, 'dashboard.db')) as db:
+        workload = seed_workload(db, scale['products'], scale['users'], scale['transactions'])
+        return {'workload': workload, 'queries': bench_dashboard(db, scale['runs'])}
+
+
+def bench_receipt(tmp, scale):
+    from benchmarks.receipt import bench_receipts
+    
+    return bench_receipts((5, 20, 50), scale['runs'],
+                          include_pdf=importlib.util.find_spec('reportlab') is not None)
+
+
+def bench_qr_labels(tmp, scale):
+    from benchmarks.qr_labels import bench_bulk_qr
+    
+    return bench_bulk_qr(scale['labels'], copies=3, worker_counts=(1,))
+
+
+def bench_scanner(tmp, scale):
+    """Decode fixture images: QR labels rendered by QRGenerator, one code per image"""
+    from benchmarks.camera_scan import bench_camera_scan
+    from benchmarks.qr_labels import make_products
+    from core.qr_generator import QRGenerator
+    from utils.camera_scan import ImageSequenceSource
+    
+    fixtures = os.path.join(tmp, 'fixtures')
+    QRGenerator(output_dir=fixtures).generate_bulk_qr(make_products(scale['labels']), workers=1)
+    paths = sorted(glob.glob(os.path.join(fixtures, '*.png')))
+    result = bench_camera_scan(ImageSequenceSource(paths), decoder='pyzbar')
+    result['fixtures'] = len(paths)
+    result['decoded'] = len(result.pop('codes'))
+    return result
+
+
+def bench_keyboard_wedge(tmp, scale):
+    from benchmarks.keyboard_wedge import bench_keyboard_wedge, make_trace
+    
+    trace, expected = make_trace(scale['runs'] * 5)
+    return bench_keyboard_wedge(trace, expected)
+
+
+def bench_audit(tmp, scale):
+    from benchmarks.audit import bench_audit
+    
+    return bench_audit(scale['transactions'], scalar_sample=scale['transactions'] // 10)
+
+
+def bench_reports(tmp, scale):
+    from benchmarks.reports import bench_reports
+    
+    return bench_reports(tmp, scale['months'], scale['per_month'])
+
+
+def bench_journal(tmp, scale):
+    from benchmarks.journal import bench_journal
+    
+    db_path = os.path.join(tmp, 'journal.db')
+    with Database(db_path) as db:
+        seed_products(db, scale['products'])
+    return bench_journal(db_path, os.path.join(tmp, 'sales.journal'), (1, 4), scale['sales'])
+
+
+def bench_server(tmp, scale):
+    from benchmarks.server import bench_server
+    
+    db_path = os.path.join(tmp, 'server.db')
+    with Database(db_path) as db:
+        seed_products(db, scale['products'])
+    return bench_server(db_path, (1, 4), scale['sales'])
+
+
+def bench_archive(tmp, scale):
+    from benchmarks.archive import bench_archive
+    
+    return bench_archive(tmp, scale['months'], scale['per_month'], keep_months=1)
+
+
+# nama -> (fungsi, modul opsional yang dibutuhkan); urutan = urutan eksekusi
+BENCHMARKS = {
+    'checkout': (bench_checkout, ()),
+    'catalog': (bench_catalog, ()),
+    'calculator': (bench_calculator, ()),
+    'cart': (bench_cart, ()),
+    'promotions': (bench_promotions, ()),
+    'dashboard': (bench_dashboard, ()),
+    'receipt': (bench_receipt, ()),
+    'qr_labels': (bench_qr_labels, ('qrcode', 'PIL')),
+    'scanner': (bench_scanner, ('qrcode', 'PIL', 'cv2', 'pyzbar')),
+    'keyboard_wedge': (bench_keyboard_wedge, ()),
+    'audit': (bench_audit, ('numpy',)),
+    'reports': (bench_reports, ()),
+    'journal': (bench_journal, ()),
+    'server': (bench_server, ()),
+    'archive': (bench_archive, ()),
+}
+
+
+def environment(scale_name):
+    return {
+        'started_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'scale': scale_name,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'sqlite': sqlite3.sqlite_version
+    }
+
+
+def run_suite(names=None, scale_name='quick', seed=42):
+    """
+    Run the selected benchmarks (default: all) and return
+    {'environment': ..., 'benchmarks': {name: result}}. A benchmark whose
+    optional modules are missing is recorded as skipped; one that raises is
+    recorded with its error so the rest of the suite still runs.
+    """
+    scale = SCALES[scale_name]
+    results = {'environment': environment(scale_name), 'benchmarks': {}}
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Benchmark tidak dikenal: {name}")
+        fn, requires = BENCHMARKS[name]
+        missing = [module for module in requires if importlib.util.find_spec(module) is None]
+        if missing:
+            results['benchmarks'][name] = {'skipped': f"modul tidak terpasang: {', '.join(missing)}"}
+            continue
+        
+        # Seed global juga di-reset untuk kode yang memakai modul random langsung
+        random.seed(seed)
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                entry = {'results': fn(tmp, scale)}
+            except Exception as e:
+                entry = {'error': f"{type(e).__name__}: {e}"}
+        entry['seconds'] = time.perf_counter() - start
+        results['benchmarks'][name] = entry
+        print(f"{name}: {entry.get('error', 'ok')} ({entry['seconds']:.1f} s)", file=sys.stderr)
+    return results
+
+
+def flatten(value, prefix=''):
+    """{'a': {'b': 1}, 'c': [2]} -> {'a.b': 1, 'c.0': 2}, numbers and booleans only"""
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, (list, tuple)):
+        items = enumerate(value)
+    else:
+        return {prefix: value} if isinstance(value, (int, float, bool)) else {}
+    flat = {}
+    for key, item in items:
+        flat.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+    return flat
+
+
+def compare(current, baseline, tolerance=0.25):
+    """
+    Metrics in `current` that regressed against `baseline` by more than
+    `tolerance` (a fraction), plus any correctness metric that got worse.
+    Tail latencies and benchmarks skipped or failed on either side are not
+    compared.
+    """
+    regressions = []
+    for name, entry in current['benchmarks'].items():
+        base = baseline.get('benchmarks', {}).get(name, {})
+        if 'results' not in entry or 'results' not in base:
+            continue
+        now_metrics = flatten(entry['results'])
+        for metric, old in flatten(base['results']).items():
+            new = now_metrics.get(metric)
+            if new is None:
+                continue
+            leaf = metric.rsplit('.', 1)[-1]
+            if leaf in MUST_NOT_RISE:
+                regressed = new > old
+            elif leaf in MUST_NOT_DROP:
+                regressed = new < old
+            elif isinstance(old, bool) or not old or leaf.startswith(TAIL_PREFIXES):
+                continue
+            elif leaf.endswith(HIGHER_IS_BETTER):
+                regressed = new < old * (1 - tolerance)
+            elif leaf.endswith(LOWER_IS_BETTER):
+                delta_ms = (new - old) * (1000 if leaf.endswith('seconds') else 1)
+                regressed = new > old * (1 + tolerance) and (
+                    not leaf.endswith(('_ms', 'seconds')) or delta_ms >= NOISE_FLOOR_MS)
+            else:
+                continue
+            if regressed:
+                regressions.append({
+                    'metric': f"{name}.{metric}",
+                    'baseline': old,
+                    'current': new,
+                    'change': (new - old) / old if old and not isinstance(old, bool) else None
+                })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite benchmark kasir (headless)")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help="benchmark yang dijalankan")
+    parser.add_argument('--skip', nargs='+', choices=list(BENCHMARKS), default=[])
+    parser.add_argument('--scale', choices=list(SCALES), default='quick')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="tulis hasil JSON ke file ini (default: stdout)")
+    parser.add_argument('--baseline', help="hasil JSON sebelumnya sebagai pembanding")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="regresi relatif yang masih diterima (0.25 = 25%%)")
+    parser.add_argument('--save-baseline', help="simpan hasil run ini sebagai baseline")
+    args = parser.parse_args()
+    
+    names = [name for name in (args.only or BENCHMARKS) if name not in args.skip]
+    results = run_suite(names, args.scale, args.seed)
+    
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('environment', {}).get('scale') != args.scale:
+            print(f"Peringatan: baseline memakai skala lain "
+                  f"({baseline.get('environment', {}).get('scale')})", file=sys.stderr)
+        results['regressions'] = compare(results, baseline, args.tolerance)
+    
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            f.write(output)
+    
+    for regression in results.get('regressions', []):
+        change = regression['change']
+        print(f"REGRESI {regression['metric']}: {regression['baseline']} -> {regression['current']}"
+              + (f" ({change:+.0%})" if change is not None else ""), file=sys.stderr)
+    failed = [name for name, entry in results['benchmarks'].items() if 'error' in entry]
+    if results.get('regressions') or failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
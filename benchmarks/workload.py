@@ -0,0 +1,265 @@
+# workload.py
+"""Data sintetis ber-seed untuk benchmark (tanpa GUI, printer atau kamera)"""
+import hashlib
+import math
+import random
+from datetime import date, datetime, timedelta
+
+CATEGORIES = ['Makanan', 'Minuman', 'Sembako', 'Kebersihan', 'Rokok',
+              'Snack', 'Frozen', 'Alat Tulis', 'Obat', 'Lainnya']
+
+
+def seed_products(db, count, seed=42, stock=1_000_000):
+    """Insert `count` products and return their ids"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        purchase = rng.randrange(1_000, 200_000, 500)
+        rows.append((
+            f"P{i:07d}",
+            f"Produk {i}",
+            rng.choice(CATEGORIES),
+            purchase,
+            purchase + rng.randrange(500, 50_000, 500),
+            stock,
+            10,
+            f"899{i:010d}",
+        ))
+    
+    with db.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO products (code, name, category, purchase_price, selling_price,
+                                  stock, min_stock, barcode_data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        ids = [row[0] for row in conn.execute("SELECT id FROM products ORDER BY id")]
+    
+    return ids
+
+
+def make_cart(rng, product_prices, line_count, user_id=1):
+    """Build a record_sale() cart with `line_count` random lines"""
+    from core.transaction import percent_of
+    
+    items = []
+    for product_id in rng.sample(list(product_prices), line_count):
+        price = product_prices[product_id]
+        quantity = rng.randint(1, 5)
+        items.append({
+            'product_id': product_id,
+            'quantity': quantity,
+            'price': price,
+            'subtotal': price * quantity
+        })
+    
+    subtotal = sum(item['subtotal'] for item in items)
+    # Pajak dibulatkan seperti Cart, supaya sales server menerima totalnya
+    tax = percent_of(subtotal, 10)
+    return {
+        'user_id': user_id,
+        'items': items,
+        'subtotal': subtotal,
+        'discount_amount': 0,
+        'tax_amount': tax,
+        'final_amount': subtotal + tax
+    }
+
+
+def make_receipt_data(rng, line_count, transaction_code="TRX000001"):
+    """transaction_data dict in the shape ReceiptPrinter expects"""
+    items = []
+    for i in range(line_count):
+        price = rng.randrange(1_000, 250_000, 500)
+        quantity = rng.randint(1, 5)
+        items.append({
+            'name': f"Produk {rng.randrange(100_000)} ukuran {rng.choice('SMLX')}",
+            'quantity': quantity,
+            'price': price,
+            'subtotal': price * quantity
+        })
+    
+    subtotal = sum(item['subtotal'] for item in items)
+    tax = subtotal * 0.1
+    total = subtotal + tax
+    cash = (int(total) // 50_000 + 1) * 50_000
+    return {
+        'date': "2024-01-01 12:00:00",
+        'cashier': "Kasir 1",
+        'transaction_code': transaction_code,
+        'items': items,
+        'subtotal': subtotal,
+        'discount': 0,
+        'tax': tax,
+        'total': total,
+        'cash': cash,
+        'change': cash - total
+    }
+
+
+def seed_history(db, months, per_month, lines=5, seed=42, product_count=1000, end=None):
+    """
+    Insert `per_month` completed transactions (with details and inventory
+    log rows) for each of the `months` months before `end` (YYYY-MM,
+    default: the current month). Rows go straight into the tables.
+    Returns the list of months seeded, oldest first.
+    """
+    rng = random.Random(seed)
+    end = end or date.today().strftime('%Y-%m')
+    end_index = int(end[:4]) * 12 + int(end[5:7]) - 1
+    periods = [f"{i // 12:04d}-{i % 12 + 1:02d}" for i in range(end_index - months, end_index)]
+    
+    with db.read() as conn:
+        next_id = conn.execute("SELECT IFNULL(MAX(id), 0) + 1 FROM transactions").fetchone()[0]
+    
+    for period in periods:
+        headers, details, logs = [], [], []
+        for _ in range(per_month):
+            created_at = (f"{period}-{rng.randint(1, 28):02d} "
+                          f"{rng.randint(8, 21):02d}:{rng.randint(0, 59):02d}:00")
+            code = f"TRX{next_id:012d}"
+            subtotal = 0
+            for _ in range(lines):
+                product_id = rng.randint(1, product_count)
+                quantity = rng.randint(1, 5)
+                price = rng.randrange(1_000, 100_000, 500)
+                subtotal += price * quantity
+                details.append((next_id, product_id, quantity, price, 0, price * quantity))
+                logs.append((product_id, 1, 'sale', -quantity, 100, 100 - quantity, code, created_at))
+            tax = subtotal * 0.1
+            headers.append((next_id, code, 1, subtotal, 0, 0, tax, subtotal + tax, 'cash',
+                            created_at))
+            next_id += 1
+        
+        with db.transaction() as conn:
+            conn.executemany('''
+                INSERT INTO transactions (id, transaction_code, user_id, total_amount,
+                                          discount_amount, discount_percentage, tax_amount,
+                                          final_amount, payment_method, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', headers)
+            conn.executemany('''
+                INSERT INTO transaction_details (transaction_id, product_id, quantity,
+                                                 unit_price, discount, subtotal)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', details)
+            conn.executemany('''
+                INSERT INTO inventory_logs (product_id, user_id, action, quantity_change,
+                                            previous_stock, new_stock, notes, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', logs)
+    
+    return periods
+
+
+def basket_size(rng, median=4, max_lines=60):
+    """Lines per basket: log-normal, so most baskets are small with a long tail"""
+    return min(max_lines, max(1, round(rng.lognormvariate(math.log(median), 0.75))))
+
+
+def seed_users(db, count, seed=42):
+    """Insert `count` users (about 10% managers, the rest cashiers) and return their ids"""
+    rng = random.Random(seed)
+    ids = []
+    with db.transaction() as conn:
+        for i in range(count):
+            username = f"kasir{i:04d}"
+            role = 'manager' if rng.random() < 0.1 else 'cashier'
+            ids.append(conn.execute('''
+                INSERT INTO users (username, password_hash, full_name, role)
+                VALUES (?, ?, ?, ?)
+            ''', (username, hashlib.sha256(username.encode()).hexdigest(),
+                  f"Kasir {i}", role)).lastrowid)
+    return ids
+
+
+def seed_sales(db, count, user_ids=None, days=30, seed=42, void_rate=0.01, batch_size=5000):
+    """
+    Insert `count` transactions spread over the last `days` days (today
+    included) straight into the tables, then rebuild the rollups.
+    Basket sizes follow basket_size(), sales lean towards the first
+    products, busy hours are weighted and about `void_rate` of the sales
+    are voided. Amounts come from TransactionCalculator, so the data
+    passes the audit. Returns the number of detail lines written.
+    """
+    from core.transaction import TransactionCalculator
+    
+    rng = random.Random(seed)
+    calculator = TransactionCalculator()
+    with db.read() as conn:
+        prices = conn.execute("SELECT id, selling_price FROM products ORDER BY id").fetchall()
+        next_id = conn.execute("SELECT IFNULL(MAX(id), 0) + 1 FROM transactions").fetchone()[0]
+    if not prices:
+        raise ValueError("Isi produk dulu sebelum membuat transaksi")
+    user_ids = user_ids or [1]
+    
+    # Jam ramai: siang dan sore
+    hours = list(range(8, 22))
+    hour_weights = [1, 2, 3, 4, 5, 4, 3, 3, 4, 5, 6, 5, 3, 2]
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    lines_written = 0
+    
+    for start in range(0, count, batch_size):
+        headers, details, logs = [], [], []
+        for _ in range(min(batch_size, count - start)):
+            created = today - timedelta(days=rng.randrange(days))
+            created = created.replace(hour=rng.choices(hours, hour_weights)[0],
+                                      minute=rng.randrange(60), second=rng.randrange(60))
+            created_at = created.strftime('%Y-%m-%d %H:%M:%S')
+            code = f"TRX{next_id:012d}"
+            user_id = rng.choice(user_ids)
+            
+            items = {}
+            for _ in range(basket_size(rng)):
+                # Kuadrat membuat produk di awal daftar lebih sering terjual
+                product_id, price = prices[int(len(prices) * rng.random() ** 2)]
+                quantity = rng.choices((1, 2, 3, 6, 12), (60, 20, 10, 7, 3))[0]
+                if product_id in items:
+                    items[product_id]['quantity'] += quantity
+                else:
+                    items[product_id] = {'product_id': product_id, 'quantity': quantity,
+                                         'price': price}
+            pct = rng.choices((0, 5, 10), (85, 10, 5))[0]
+            result = calculator.calculate_final_amount(list(items.values()),
+                                                       'percentage' if pct else None, pct)
+            status = 'voided' if rng.random() < void_rate else 'completed'
+            
+            headers.append((next_id, code, user_id, result['subtotal'], result['discount_amount'],
+                            pct, result['tax_amount'], result['final_amount'], 'cash', status,
+                            created_at))
+            for item in items.values():
+                details.append((next_id, item['product_id'], item['quantity'], item['price'], 0,
+                                item['price'] * item['quantity']))
+                logs.append((item['product_id'], user_id, 'sale', -item['quantity'], 0, 0, code,
+                             created_at))
+            next_id += 1
+        
+        with db.transaction() as conn:
+            conn.executemany('''
+                INSERT INTO transactions (id, transaction_code, user_id, total_amount,
+                                          discount_amount, discount_percentage, tax_amount,
+                                          final_amount, payment_method, status, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', headers)
+            conn.executemany('''
+                INSERT INTO transaction_details (transaction_id, product_id, quantity,
+                                                 unit_price, discount, subtotal)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', details)
+            conn.executemany('''
+                INSERT INTO inventory_logs (product_id, user_id, action, quantity_change,
+                                            previous_stock, new_stock, notes, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', logs)
+        lines_written += len(details)
+    
+    db.rebuild_rollups()
+    return lines_written
+
+
+def seed_workload(db, products=5000, users=20, transactions=50_000, days=30, seed=42):
+    """Fill an empty database with products, users and sales; returns the counts"""
+    product_ids = seed_products(db, products, seed)
+    user_ids = seed_users(db, users, seed)
+    lines = seed_sales(db, transactions, user_ids, days, seed)
+    return {'products': len(product_ids), 'users': len(user_ids),
+            'transactions': transactions, 'lines': lines, 'days': days}
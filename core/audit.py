@@ -0,0 +1,298 @@
+# audit.py
+# numpy di-import saat audit dijalankan supaya startup tetap cepat
+import argparse
+import csv
+import itertools
+import json
+import time
+
+# Kolom laporan selisih
+REPORT_COLUMNS = ['transaction_id', 'transaction_code', 'created_at', 'check',
+                  'stored', 'expected', 'difference', 'implied_tax_rate']
+
+# Jenis pemeriksaan per transaksi
+CHECKS = ('line_subtotal', 'subtotal', 'discount', 'tax', 'final_amount')
+
+
+def expected_discount(np, subtotal, discount_percentage, discount_amount):
+    """
+    Rows with a discount percentage get the percentage discount; others
+    keep their stored (fixed) discount, capped at the subtotal. The fixed
+    amount the cashier typed is not stored, so for those rows the discount
+    check only flags a discount larger than the subtotal.
+    """
+    return np.where(discount_percentage > 0,
+                    subtotal * (discount_percentage / 100),
+                    np.minimum(discount_amount, subtotal))
+
+
+def recompute(np, subtotal, discount_percentage, discount_amount, tax_percentage=10):
+    """
+    Vectorized TransactionCalculator.calculate_final_amount over arrays.
+    Returns (discount, tax, final) arrays.
+    """
+    discount = expected_discount(np, subtotal, discount_percentage, discount_amount)
+    taxable = subtotal - discount
+    tax = taxable * (tax_percentage / 100)
+    return discount, tax, taxable + tax
+
+
+class TransactionAuditor:
+    """
+    Recompute subtotal -> discount -> tax -> final_amount for stored
+    transactions in chunks of `chunk_size` ids. SQLite sums each
+    transaction's detail lines (and counts lines whose subtotal does not
+    match quantity x price - discount) in the same keyset query, so one
+    numeric row per transaction is streamed into a NumPy array and every
+    check runs vectorized over the chunk instead of one
+    calculate_final_amount call per transaction. Each chunk is read in its
+    own short read transaction, so a long audit does not pin a snapshot
+    that keeps WAL checkpoints from completing. Months moved out by
+    database/archive.py are audited afterwards, one archive file at a
+    time through PartitionedReader.partition_rows. Differences larger than
+    `tolerance` rupiah are written to a CSV report.
+    """
+    
+    # Kolom numerik per transaksi, urutannya sama dengan array hasil _chunks
+    COLUMNS = ('id', 'subtotal', 'discount', 'discount_percentage', 'tax', 'final',
+               'line_sum', 'bad_lines')
+    
+    def __init__(self, db, tax_percentage=10, tolerance=0.5, chunk_size=50_000):
+        self.db = db
+        self.tax_percentage = tax_percentage
+        self.tolerance = tolerance
+        self.chunk_size = chunk_size
+    
+    def _filters(self, date_from=None, date_to=None, include_voided=False):
+        """WHERE clauses on `t` and their parameters"""
+        clauses = []
+        params = []
+        if not include_voided:
+            clauses.append("t.status = 'completed'")
+        if date_from:
+            clauses.append("t.created_at >= ?")
+            params.append(date_from)
+        if date_to:
+            clauses.append("t.created_at < date(?, '+1 day')")
+            params.append(date_to)
+        return clauses, params
+    
+    def _query(self, transactions, details, clauses, detail_filter=""):
+        """One numeric row per transaction, columns in COLUMNS order"""
+        return f'''
+            SELECT t.id, t.total_amount, IFNULL(t.discount_amount, 0),
+                   IFNULL(t.discount_percentage, 0), IFNULL(t.tax_amount, 0), t.final_amount,
+                   IFNULL(d.line_sum, 0), IFNULL(d.bad_lines, 0)
+            FROM {transactions} t
+            LEFT JOIN (
+                SELECT transaction_id,
+                       SUM(subtotal) AS line_sum,
+                       SUM(ABS(subtotal - (quantity * unit_price - IFNULL(discount, 0))) > ?)
+                           AS bad_lines
+                FROM {details}
+                {detail_filter}
+                GROUP BY transaction_id
+            ) d ON d.transaction_id = t.id
+            WHERE {' AND '.join(clauses) or '1'}
+            ORDER BY t.id
+        '''
+    
+    def _chunks(self, date_from=None, date_to=None, include_voided=False):
+        """
+        Yield one float64 array (rows x COLUMNS) per id range; keyset on
+        transactions.id, one db.read() per chunk.
+        """
+        import numpy as np
+        
+        clauses, params = self._filters(date_from, date_to, include_voided)
+        query = self._query("transactions", "transaction_details",
+                            ["t.id > ?", "t.id <= ?"] + clauses,
+                            "WHERE transaction_id > ? AND transaction_id <= ?")
+        width = len(self.COLUMNS)
+        
+        with self.db.read() as conn:
+            low, high_id = conn.execute("SELECT MIN(id) - 1, MAX(id) FROM transactions").fetchone()
+        if high_id is None:
+            return
+        while low < high_id:
+            high = low + self.chunk_size
+            with self.db.read() as conn:
+                rows = conn.execute(query,
+                                    [self.tolerance, low, high, low, high] + params).fetchall()
+            low = high
+            if rows:
+                # fromiter atas nilai yang diratakan jauh lebih cepat dari np.array(list tuple)
+                flat = itertools.chain.from_iterable(rows)
+                yield np.fromiter(flat, dtype=np.float64, count=len(rows) * width).reshape(-1, width)
+    
+    def archived_periods(self, date_from=None, date_to=None):
+        """Archived months (period, path) overlapping the date range"""
+        from database.archive import PartitionedReader
+        
+        if self.db.db_path == ':memory:':
+            return []
+        return PartitionedReader(self.db).partitions(date_from, date_to)
+    
+    def _archived_chunks(self, period, date_from=None, date_to=None, include_voided=False):
+        """
+        Yield arrays like _chunks for one archived month. Archive files are
+        read-only, so the month is streamed in a single query.
+        """
+        import numpy as np
+        from database.archive import PartitionedReader, month_bounds
+        
+        clauses, params = self._filters(date_from, date_to, include_voided)
+        query = self._query("{transactions}", "{transaction_details}", clauses)
+        width = len(self.COLUMNS)
+        start, _ = month_bounds(period)
+        
+        reader = PartitionedReader(self.db, fetch_size=self.chunk_size)
+        rows = reader.partition_rows(query, [self.tolerance] + params,
+                                     date_from=start, date_to=start, include_hot=False)
+        while True:
+            batch = list(itertools.islice(rows, self.chunk_size))
+            if not batch:
+                return
+            flat = itertools.chain.from_iterable(batch)
+            yield np.fromiter(flat, dtype=np.float64, count=len(batch) * width).reshape(-1, width)
+    
+    def audit_chunk(self, data):
+        """Return [(transaction_id, check, stored, expected, implied_tax_rate)] for one chunk"""
+        import numpy as np
+        
+        ids, subtotal, discount, discount_pct, tax, final, line_sum, bad_lines = data.T
+        
+        # Setiap langkah dihitung dari nilai tersimpan langkah sebelumnya, supaya
+        # satu kesalahan tidak ikut ditandai di semua kolom berikutnya
+        exp_discount = expected_discount(np, subtotal, discount_pct, discount)
+        taxable = subtotal - discount
+        exp_tax = taxable * (self.tax_percentage / 100)
+        exp_final = taxable + tax
+        with np.errstate(divide='ignore', invalid='ignore'):
+            implied_rate = np.where(taxable != 0, tax / taxable * 100, 0.0)
+        
+        # line_subtotal: jumlah baris detail yang subtotal-nya tidak cocok
+        checks = {
+            'line_subtotal': (bad_lines, np.zeros(len(ids))),
+            'subtotal': (subtotal, line_sum),
+            'discount': (discount, exp_discount),
+            'tax': (tax, exp_tax),
+            'final_amount': (final, exp_final),
+        }
+        found = []
+        for check, (stored, expected) in checks.items():
+            bad = np.nonzero(np.abs(stored - expected) > self.tolerance)[0]
+            for i in bad.tolist():
+                found.append((int(ids[i]), check, float(stored[i]), float(expected[i]),
+                              round(float(implied_rate[i]), 4)))
+        return found
+    
+    def _describe(self, found, period=None):
+        """
+        Add transaction_code and created_at to flagged rows (report format),
+        looked up in the hot database or in the archive of `period`.
+        """
+        from database.archive import PartitionedReader, month_bounds
+        
+        ids = sorted({row[0] for row in found})
+        info = {}
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            placeholders = ", ".join("?" for _ in batch)
+            query = (f"SELECT id, transaction_code, created_at FROM {{transactions}} "
+                     f"WHERE id IN ({placeholders})")
+            if period is None:
+                with self.db.read() as conn:
+                    rows = conn.execute(query.format(transactions="transactions"), batch).fetchall()
+            else:
+                month = month_bounds(period)[0]
+                rows = PartitionedReader(self.db).partition_rows(
+                    query, batch, date_from=month, date_to=month, include_hot=False)
+            for tid, code, created_at in rows:
+                info[tid] = (code, created_at)
+        return [(tid, *info.get(tid, (None, None)), check, stored, expected,
+                 stored - expected, rate)
+                for tid, check, stored, expected, rate in found]
+    
+    def _sources(self, date_from, date_to, include_voided, periods):
+        """(chunk, period) for the hot database, then each archived period"""
+        for data in self._chunks(date_from, date_to, include_voided):
+            yield data, None
+        for period in periods:
+            for data in self._archived_chunks(period, date_from, date_to, include_voided):
+                yield data, period
+    
+    def run(self, report_path=None, date_from=None, date_to=None, include_voided=False,
+            progress=None, cancel=None, include_archived=True):
+        """
+        Audit every matching transaction, archived months included unless
+        include_archived is False (they are then listed as skipped in the
+        summary). progress(transactions_done) is called after each chunk;
+        cancel() returning True stops early. Returns a summary dict
+        including transactions per second.
+        """
+        started = time.perf_counter()
+        total = 0
+        counts = dict.fromkeys(CHECKS, 0)
+        flagged = set()
+        periods = [period for period, _ in self.archived_periods(date_from, date_to)]
+        audited = periods if include_archived else []
+        
+        report_file = open(report_path, 'w', newline='', encoding='utf-8') if report_path else None
+        try:
+            writer = csv.writer(report_file) if report_file else None
+            if writer:
+                writer.writerow(REPORT_COLUMNS)
+            for data, period in self._sources(date_from, date_to, include_voided, audited):
+                found = self.audit_chunk(data)
+                total += len(data)
+                for row in found:
+                    counts[row[1]] += 1
+                    flagged.add(row[0])
+                if writer and found:
+                    writer.writerows(self._describe(found, period))
+                if progress:
+                    progress(total)
+                if cancel and cancel():
+                    break
+        finally:
+            if report_file:
+                report_file.close()
+        
+        elapsed = time.perf_counter() - started
+        return {
+            'transactions': total,
+            'flagged_transactions': len(flagged),
+            'discrepancies': counts,
+            'seconds': elapsed,
+            'transactions_per_second': total / elapsed if elapsed else 0.0,
+            'archived_periods': audited,
+            'skipped_periods': [period for period in periods if period not in audited],
+            'report_path': report_path
+        }
+
+
+def main():
+    from database.database import Database
+    
+    parser = argparse.ArgumentParser(description="Audit ulang perhitungan transaksi")
+    parser.add_argument('--db', default="cashier_system.db")
+    parser.add_argument('--report', default="audit_transaksi.csv")
+    parser.add_argument('--from', dest='date_from')
+    parser.add_argument('--to', dest='date_to')
+    parser.add_argument('--tax', type=float, default=10)
+    parser.add_argument('--tolerance', type=float, default=0.5)
+    parser.add_argument('--include-voided', action='store_true')
+    parser.add_argument('--hot-only', action='store_true',
+                        help="lewati bulan yang sudah diarsip")
+    args = parser.parse_args()
+    
+    with Database(args.db) as db:
+        auditor = TransactionAuditor(db, args.tax, args.tolerance)
+        summary = auditor.run(args.report, args.date_from, args.date_to, args.include_voided,
+                              include_archived=not args.hot_only)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# catalog.py
+import sys
+import threading
+from typing import Dict, Optional
+
+# Kolom yang dimuat ke cache; urutannya sama dengan __slots__ CatalogEntry
+CATALOG_COLUMNS = ('id', 'code', 'name', 'category', 'purchase_price',
+                   'selling_price', 'stock', 'min_stock', 'barcode_data')
+
+PRODUCT_PREFIX = "PRODUCT:"
+
+
+def parse_scan(data: str):
+    """
+    Split scanner input into a lookup key.
+    Returns ('code', code) for QRGenerator payloads
+    ("PRODUCT:code|name|price") and ('barcode', data) for anything else.
+    """
+    data = data.strip()
+    if data.startswith(PRODUCT_PREFIX):
+        return 'code', data[len(PRODUCT_PREFIX):].split('|', 1)[0]
+    return 'barcode', data
+
+
+class CatalogEntry:
+    """Compact product record; __slots__ avoids a per-row __dict__"""
+    __slots__ = CATALOG_COLUMNS
+    
+    def __init__(self, row):
+        (self.id, self.code, self.name, category, self.purchase_price,
+         self.selling_price, self.stock, self.min_stock, self.barcode_data) = row
+        # Kategori berulang di banyak produk; simpan satu objek string saja
+        self.category = sys.intern(category) if category else category
+    
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in CATALOG_COLUMNS}
+    
+    def __repr__(self):
+        return f"CatalogEntry(id={self.id}, code={self.code!r})"
+
+
+class ProductCatalog:
+    """
+    In-memory product cache for scan-to-cart lookups.
+    Loads every product once, indexes it by id, code and barcode_data, and
+    refreshes only the affected rows when Database reports product changes.
+    With a ChangeFeed, changes made by other terminals are picked up too.
+    """
+    
+    def __init__(self, db, autoload=True, subscribe=True, feed=None):
+        self.db = db
+        self._lock = threading.Lock()
+        self._by_id: Dict[int, CatalogEntry] = {}
+        self._by_code: Dict[str, CatalogEntry] = {}
+        self._by_barcode: Dict[str, CatalogEntry] = {}
+        
+        self.feed = feed
+        if autoload:
+            self.load()
+        if feed is not None:
+            # Feed sudah mencakup tulisan lokal; listener tidak dipasang supaya tidak dobel
+            feed.subscribe(self.on_products_changed, on_reset=self.load)
+        elif subscribe:
+            db.add_product_listener(self.on_products_changed)
+    
+    def close(self):
+        """Stop receiving change notifications"""
+        if self.feed is not None:
+            self.feed.unsubscribe(self.on_products_changed)
+        self.db.remove_product_listener(self.on_products_changed)
+    
+    def load(self):
+        """(Re)load the whole catalog from the products table"""
+        by_id, by_code, by_barcode = {}, {}, {}
+        for row in self.db.get_product_rows(CATALOG_COLUMNS):
+            entry = CatalogEntry(row)
+            by_id[entry.id] = entry
+            by_code[entry.code] = entry
+            if entry.barcode_data:
+                by_barcode[entry.barcode_data] = entry
+        
+        # Tukar index sekaligus supaya pembaca tidak melihat cache setengah jadi
+        with self._lock:
+            self._by_id, self._by_code, self._by_barcode = by_id, by_code, by_barcode
+    
+    def on_products_changed(self, product_ids):
+        """Refresh the given product ids from the database (listener callback)"""
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        
+        rows = self.db.get_product_rows(CATALOG_COLUMNS, product_ids)
+        
+        with self._lock:
+            found = set()
+            for row in rows:
+                entry = CatalogEntry(row)
+                found.add(entry.id)
+                self._remove(entry.id)
+                self._by_id[entry.id] = entry
+                self._by_code[entry.code] = entry
+                if entry.barcode_data:
+                    self._by_barcode[entry.barcode_data] = entry
+            
+            # Produk yang sudah tidak ada di database
+            for product_id in set(product_ids) - found:
+                self._remove(product_id)
+    
+    def _remove(self, product_id):
+        old = self._by_id.pop(product_id, None)
+        if old is None:
+            return
+        if self._by_code.get(old.code) is old:
+            del self._by_code[old.code]
+        if old.barcode_data and self._by_barcode.get(old.barcode_data) is old:
+            del self._by_barcode[old.barcode_data]
+    
+    def get(self, product_id: int) -> Optional[CatalogEntry]:
+        return self._by_id.get(product_id)
+    
+    def get_by_code(self, code: str) -> Optional[CatalogEntry]:
+        return self._by_code.get(code)
+    
+    def get_by_barcode(self, barcode: str) -> Optional[CatalogEntry]:
+        return self._by_barcode.get(barcode)
+    
+    def resolve(self, scan_data: str) -> Optional[CatalogEntry]:
+        """Resolve raw scanner output to a product entry in O(1)"""
+        kind, key = parse_scan(scan_data)
+        if kind == 'code':
+            return self._by_code.get(key)
+        # Barcode mentah; beberapa label memakai kode produk langsung
+        return self._by_barcode.get(key) or self._by_code.get(key)
+    
+    def __len__(self):
+        return len(self._by_id)
+    
+    def memory_usage(self) -> Dict:
+        """Approximate bytes held by entries, their values and the three indexes"""
+        entries = 0
+        seen = set()
+        for entry in self._by_id.values():
+            entries += sys.getsizeof(entry)
+            for name in CATALOG_COLUMNS:
+                value = getattr(entry, name)
+                # Nilai kecil seperti None dan int kecil dibagi oleh interpreter
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    entries += sys.getsizeof(value)
+        
+        indexes = (sys.getsizeof(self._by_id) + sys.getsizeof(self._by_code)
+                   + sys.getsizeof(self._by_barcode))
+        total = entries + indexes
+        count = len(self._by_id)
+        return {
+            'products': count,
+            'entry_bytes': entries,
+            'index_bytes': indexes,
+            'total_bytes': total,
+            'bytes_per_100k': total / count * 100_000 if count else 0
+        }
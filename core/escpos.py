@@ -0,0 +1,187 @@
+# escpos.py
+import os
+import socket
+import textwrap
+
+# Perintah ESC/POS dasar
+ESC = b'\x1b'
+GS = b'\x1d'
+INIT = ESC + b'@'
+BOLD_ON = ESC + b'E\x01'
+BOLD_OFF = ESC + b'E\x00'
+ALIGN_LEFT = ESC + b'a\x00'
+ALIGN_CENTER = ESC + b'a\x01'
+SIZE_NORMAL = GS + b'!\x00'
+SIZE_DOUBLE = GS + b'!\x11'
+CUT = GS + b'V\x42\x03'   # feed 3 baris lalu partial cut
+
+
+# Nama item lebih sempit dari ini ditaruh di baris sendiri
+MIN_NAME_WIDTH = 8
+
+
+def feed(lines):
+    return ESC + b'd' + bytes([max(0, min(255, lines))])
+
+
+def tax_label(transaction_data):
+    """'Pajak (10%):' from tax_percentage, or derived from tax / (subtotal - discount)"""
+    rate = transaction_data.get('tax_percentage')
+    if rate is None:
+        taxable = transaction_data['subtotal'] - transaction_data['discount']
+        rate = round(transaction_data['tax'] / taxable * 100, 2) if taxable else 0
+    return f"Pajak ({rate:g}%):"
+
+
+class EscPosRenderer:
+    """
+    Render the same transaction_data dict used by ReceiptPrinter.generate_receipt
+    into raw ESC/POS bytes for a thermal printer. 80 mm paper with font A
+    fits 48 characters per line; 58 mm paper fits 32.
+    
+    Item columns are sized per receipt from the widest quantity and amount,
+    each with one separator space. A name that does not fit next to them
+    goes on its own line; amounts are never cut off.
+    """
+    
+    def __init__(self, company_info, width=48, encoding='cp437'):
+        self.company_info = company_info
+        self.width = width
+        self.encoding = encoding
+    
+    def _text(self, text):
+        return text.encode(self.encoding, errors='replace')
+    
+    def _line(self, text=""):
+        return self._text(text[:self.width]) + b'\n'
+    
+    def _wrapped(self, text):
+        """Word-wrap text that may be wider than the paper"""
+        return b''.join(self._line(part) for part in textwrap.wrap(text, self.width) or [""])
+    
+    def _right(self, text):
+        """Right-aligned, never truncated (amounts)"""
+        return self._text(text.rjust(self.width)) + b'\n'
+    
+    def _pair(self, label, value):
+        """Label left, value right; value on its own line if both do not fit"""
+        if len(label) + 1 + len(value) > self.width:
+            return self._line(label) + self._right(value)
+        return self._text(label + value.rjust(self.width - len(label))) + b'\n'
+    
+    def _item_columns(self, items):
+        """(qty, money) column widths: widest value or header plus one separator space"""
+        qty_w = max([len("Qty")] + [len(str(item['quantity'])) for item in items]) + 1
+        money_w = max([len("Harga")] + [len(self.money(item[key]))
+                                         for item in items for key in ('price', 'subtotal')]) + 1
+        return qty_w, money_w
+    
+    def _items(self, items):
+        qty_w, money_w = self._item_columns(items)
+        name_w = self.width - qty_w - 2 * money_w
+        # Kertas terlalu sempit untuk tiga kolom angka: "qty x harga" kiri, total kanan
+        columns = name_w >= 0
+        inline = name_w >= MIN_NAME_WIDTH
+        
+        out = [BOLD_ON]
+        if inline:
+            out.append(self._line(f"{'Item':<{name_w}}{'Qty':>{qty_w}}"
+                                  f"{'Harga':>{money_w}}{'Total':>{money_w}}"))
+        elif columns:
+            out.append(self._line("Item"))
+            out.append(self._right(f"{'Qty':>{qty_w}}{'Harga':>{money_w}}{'Total':>{money_w}}"))
+        else:
+            out.append(self._pair("Item / Qty x Harga", "Total"))
+        out.append(BOLD_OFF)
+        
+        for item in items:
+            name = item['name']
+            numbers = (f"{item['quantity']:>{qty_w}}{self.money(item['price']):>{money_w}}"
+                       f"{self.money(item['subtotal']):>{money_w}}")
+            if inline and len(name) <= name_w:
+                out.append(self._text(f"{name:<{name_w}}{numbers}") + b'\n')
+                continue
+            out.append(self._wrapped(name))
+            if columns:
+                out.append(self._right(numbers))
+            else:
+                out.append(self._pair(f"  {item['quantity']} x {self.money(item['price'])}",
+                                      self.money(item['subtotal'])))
+        return b''.join(out)
+    
+    @staticmethod
+    def money(value):
+        return f"Rp {value:,.0f}"
+    
+    def render(self, transaction_data):
+        info = self.company_info
+        out = [INIT, ALIGN_CENTER, BOLD_ON, SIZE_DOUBLE,
+               self._line(info['name'][:self.width // 2]),
+               SIZE_NORMAL, BOLD_OFF,
+               self._wrapped(info['address']),
+               self._wrapped(info['phone']),
+               ALIGN_LEFT,
+               self._line("=" * self.width),
+               self._line(f"Tanggal: {transaction_data['date']}"),
+               self._line(f"Kasir: {transaction_data['cashier']}"),
+               self._line(f"No. Transaksi: {transaction_data['transaction_code']}"),
+               self._line("-" * self.width)]
+        
+        out.append(self._items(transaction_data['items']))
+        
+        out.append(self._line("-" * self.width))
+        out.append(self._pair("Subtotal:", self.money(transaction_data['subtotal'])))
+        out.append(self._pair("Diskon:", "-" + self.money(transaction_data['discount'])))
+        out.append(self._pair(tax_label(transaction_data), self.money(transaction_data['tax'])))
+        out.append(self._line("=" * self.width))
+        out += [BOLD_ON, self._pair("TOTAL:", self.money(transaction_data['total'])), BOLD_OFF]
+        out.append(self._pair("Tunai:", self.money(transaction_data['cash'])))
+        out.append(self._pair("Kembali:", self.money(transaction_data['change'])))
+        
+        out += [feed(1), ALIGN_CENTER,
+                self._wrapped(info['footer']),
+                self._wrapped("Barang yang sudah dibeli tidak dapat dikembalikan"),
+                ALIGN_LEFT, CUT]
+        return b''.join(out)
+
+
+class FileSink:
+    """Write printer bytes to a regular file (archival, tests)"""
+    
+    def __init__(self, path, append=False):
+        self.path = path
+        self.append = append
+    
+    def write(self, data):
+        with open(self.path, 'ab' if self.append else 'wb') as f:
+            f.write(data)
+
+
+class DeviceSink:
+    """Write straight to a printer device node, e.g. /dev/usb/lp0"""
+    
+    def __init__(self, device="/dev/usb/lp0"):
+        self.device = device
+    
+    def write(self, data):
+        fd = os.open(self.device, os.O_WRONLY)
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        finally:
+            os.close(fd)
+
+
+class SocketSink:
+    """Send bytes to a network printer's raw port (JetDirect, TCP 9100)"""
+    
+    def __init__(self, host, port=9100, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+    
+    def write(self, data):
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+            sock.sendall(data)
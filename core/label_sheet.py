@@ -0,0 +1,208 @@
+# label_sheet.py
+# reportlab dan qrcode di-import saat sheet dibuat supaya startup tetap cepat
+import json
+import os
+from functools import lru_cache
+
+from core.qr_generator import build_payload
+
+# Template kertas label, semua ukuran dalam mm
+LABEL_TEMPLATES = {
+    # A4, 3 x 10 label 70 x 29.7 mm tanpa margin
+    'A4_3x10': {
+        'page_size': (210, 297), 'columns': 3, 'rows': 10,
+        'label_width': 70, 'label_height': 29.7,
+        'margin_left': 0, 'margin_top': 0, 'gap_x': 0, 'gap_y': 0
+    },
+    # A4, 3 x 7 label 63.5 x 38.1 mm (tipe L7160)
+    'A4_3x7': {
+        'page_size': (210, 297), 'columns': 3, 'rows': 7,
+        'label_width': 63.5, 'label_height': 38.1,
+        'margin_left': 7.2, 'margin_top': 15.1, 'gap_x': 2.5, 'gap_y': 0
+    },
+    # A4, 4 x 10 label 48.5 x 25.4 mm
+    'A4_4x10': {
+        'page_size': (210, 297), 'columns': 4, 'rows': 10,
+        'label_width': 48.5, 'label_height': 25.4,
+        'margin_left': 8, 'margin_top': 21.5, 'gap_x': 0, 'gap_y': 0
+    },
+    # Roll printer label thermal, satu label 50 x 30 mm per halaman
+    'roll_50x30': {
+        'page_size': (50, 30), 'columns': 1, 'rows': 1,
+        'label_width': 50, 'label_height': 30,
+        'margin_left': 0, 'margin_top': 0, 'gap_x': 0, 'gap_y': 0
+    },
+}
+
+
+def load_template(template):
+    """Accept a template dict, a LABEL_TEMPLATES name or a path to a JSON file"""
+    if isinstance(template, dict):
+        return template
+    if template in LABEL_TEMPLATES:
+        return LABEL_TEMPLATES[template]
+    if os.path.exists(template):
+        with open(template, encoding='utf-8') as f:
+            return json.load(f)
+    raise ValueError(f"Template label tidak dikenal: {template}")
+
+
+@lru_cache(maxsize=1024)
+def qr_runs(payload):
+    """
+    QR module matrix as horizontal runs of dark modules:
+    (size, [(row, start_col, length), ...]). Merging runs keeps the number
+    of path operators (and the PDF size) small.
+    """
+    import qrcode
+    
+    # Quiet zone 4 modul sesuai spesifikasi QR; template tanpa margin dan
+    # gap menempelkan label, jadi jarak putih harus ada di dalam kode
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L, border=4)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    matrix = qr.get_matrix()
+    
+    runs = []
+    for r, row in enumerate(matrix):
+        c = 0
+        n = len(row)
+        while c < n:
+            if row[c]:
+                start = c
+                while c < n and row[c]:
+                    c += 1
+                runs.append((r, start, c - start))
+            else:
+                c += 1
+    return len(matrix), runs
+
+
+class LabelSheetWriter:
+    """
+    Draw product labels straight into a reportlab canvas as vector QR paths,
+    with no intermediate PNG files. Products are consumed lazily and pages
+    are emitted as they fill; with max_pages_per_file the output rolls over
+    to a new file (name_001.pdf, name_002.pdf, ...) so memory stays bounded
+    on very long runs, since reportlab keeps a file's pages until save().
+    """
+    
+    def __init__(self, output_path, template='A4_3x10', include_caption=True,
+                 max_pages_per_file=None):
+        from reportlab.lib.units import mm
+        
+        self.mm = mm
+        self.output_path = output_path
+        self.template = load_template(template)
+        self.include_caption = include_caption
+        self.max_pages_per_file = max_pages_per_file
+        self.files = []
+        self._canvas = None
+        self._pages_in_file = 0
+        self._slot = 0
+    
+    @property
+    def per_page(self):
+        return self.template['columns'] * self.template['rows']
+    
+    def _open(self):
+        from reportlab.pdfgen import canvas
+        
+        if self.max_pages_per_file:
+            base, ext = os.path.splitext(self.output_path)
+            path = f"{base}_{len(self.files) + 1:03d}{ext or '.pdf'}"
+        else:
+            path = self.output_path
+        width, height = self.template['page_size']
+        self._canvas = canvas.Canvas(path, pagesize=(width * self.mm, height * self.mm),
+                                     pageCompression=1)
+        self._pages_in_file = 0
+        self.files.append(path)
+    
+    def _label_origin(self, slot):
+        t = self.template
+        col = slot % t['columns']
+        row = slot // t['columns']
+        x = t['margin_left'] + col * (t['label_width'] + t['gap_x'])
+        top = t['margin_top'] + row * (t['label_height'] + t['gap_y'])
+        # reportlab: origin kiri bawah
+        y = t['page_size'][1] - top - t['label_height']
+        return x * self.mm, y * self.mm
+    
+    def add(self, product):
+        """Place one product label in the next free slot"""
+        if self._canvas is None:
+            self._open()
+        x, y = self._label_origin(self._slot)
+        self.draw_label(self._canvas, x, y, product)
+        
+        self._slot += 1
+        if self._slot == self.per_page:
+            self._end_page()
+    
+    def _end_page(self):
+        self._canvas.showPage()
+        self._slot = 0
+        self._pages_in_file += 1
+        if self.max_pages_per_file and self._pages_in_file >= self.max_pages_per_file:
+            self._canvas.save()
+            self._canvas = None
+    
+    def draw_label(self, c, x, y, product):
+        mm = self.mm
+        t = self.template
+        width, height = t['label_width'] * mm, t['label_height'] * mm
+        pad = 1.5 * mm
+        
+        # QR persegi di kiri, teks di kanan (atau QR di tengah tanpa caption)
+        qr_size = min(height, width) - 2 * pad
+        size, runs = qr_runs(build_payload(product))
+        module = qr_size / size
+        qr_x = x + pad if self.include_caption else x + (width - qr_size) / 2
+        qr_top = y + height - pad - (height - 2 * pad - qr_size) / 2
+        
+        path = c.beginPath()
+        for row, start, length in runs:
+            path.rect(qr_x + start * module, qr_top - (row + 1) * module,
+                      length * module, module)
+        c.setFillColorRGB(0, 0, 0)
+        c.drawPath(path, stroke=0, fill=1)
+        
+        if self.include_caption:
+            text_x = qr_x + qr_size + pad
+            text_width = x + width - pad - text_x
+            font_size = max(5, min(9, height / mm / 3.5))
+            c.setFont("Helvetica", font_size)
+            name = product['name']
+            while name and c.stringWidth(name, "Helvetica", font_size) > text_width:
+                name = name[:-1]
+            c.drawString(text_x, y + height / 2 + 1 * mm, name)
+            c.setFont("Helvetica-Bold", font_size + 1)
+            c.drawString(text_x, y + height / 2 - font_size - 1 * mm,
+                         f"Rp {product['selling_price']:,.0f}")
+    
+    def close(self):
+        """Finish the last page and save; returns the list of written files"""
+        if self._canvas is not None:
+            if self._slot:
+                self._canvas.showPage()
+            self._canvas.save()
+            self._canvas = None
+        self._slot = 0
+        return self.files
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_label_sheet(products, output_path, template='A4_3x10', copies=1,
+                      include_caption=True, max_pages_per_file=None):
+    """Render `copies` labels for each product (any iterable); returns the PDF paths"""
+    with LabelSheetWriter(output_path, template, include_caption, max_pages_per_file) as writer:
+        for product in products:
+            for _ in range(copies):
+                writer.add(product)
+    return writer.files
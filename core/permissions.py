@@ -0,0 +1,180 @@
+# permissions.py
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join("config", "permissions.json")
+
+# Flag "can_<aksi>" di permissions.json -> bit
+FLAG_ACTIONS = ('void', 'edit_price', 'view_reports', 'manage_users', 'manage_inventory')
+FLAG_BITS = {action: 1 << i for i, action in enumerate(FLAG_ACTIONS)}
+# Aksi tanpa flag: diizinkan kecuali ada aturan persetujuan
+OPEN_ACTIONS = ('discount', 'refund', 'checkout')
+
+# Hasil pemeriksaan
+ALLOWED = 'allowed'
+APPROVAL = 'approval'
+DENIED = 'denied'
+
+# "void_above_500000" -> ('void', 500000); "refund" -> ('refund', None)
+RULE_RE = re.compile(r'^(?P<action>[a-z_]+?)(?:_above_(?P<threshold>\d+(?:\.\d+)?))?$')
+
+
+class PermissionDenied(Exception):
+    def __init__(self, message, action=None, amount=None):
+        super().__init__(message)
+        self.action = action
+        self.amount = amount
+
+
+class ApprovalRequired(PermissionDenied):
+    """The action is allowed once a user whose role permits it approves"""
+
+
+class CompiledRole:
+    """A role as a flag bitmask plus per-action limits and approval thresholds"""
+    
+    __slots__ = ('name', 'mask', 'max_discount', 'approval')
+    
+    def __init__(self, name, definition):
+        self.name = name
+        self.mask = 0
+        for action, bit in FLAG_BITS.items():
+            if definition.get(f"can_{action}"):
+                self.mask |= bit
+        self.max_discount = float(definition.get('max_discount_percentage', 0))
+        
+        # aksi -> ambang (None = selalu butuh persetujuan)
+        self.approval = {}
+        for rule in definition.get('requires_approval_for', []):
+            match = RULE_RE.match(rule)
+            if not match:
+                raise ValueError(f"Aturan persetujuan tidak dikenal untuk {name}: {rule}")
+            action = match.group('action')
+            threshold = match.group('threshold')
+            threshold = float(threshold) if threshold is not None else None
+            current = self.approval.get(action, float('inf'))
+            # Beberapa ambang untuk aksi yang sama: yang terendah berlaku
+            if threshold is None or current is None:
+                self.approval[action] = None
+            else:
+                self.approval[action] = min(current, threshold)
+    
+    def check(self, action, amount=None):
+        bit = FLAG_BITS.get(action)
+        if bit is not None:
+            if not self.mask & bit:
+                return DENIED
+        elif action not in OPEN_ACTIONS:
+            raise ValueError(f"Aksi tidak dikenal: {action}")
+        
+        if action in self.approval:
+            threshold = self.approval[action]
+            if threshold is None or (amount is not None and amount > threshold):
+                return APPROVAL
+        if action == 'discount' and amount is not None and amount > self.max_discount:
+            return DENIED
+        return ALLOWED
+
+
+def load_permissions_file(path):
+    """Parse permissions.json; leading '#' comment lines (e.g. '#permissions.json') are skipped"""
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    while lines and lines[0].lstrip().startswith('#'):
+        lines.pop(0)
+    return json.loads("\n".join(lines))
+
+
+class PermissionService:
+    """
+    Role permissions from config/permissions.json, compiled once into
+    CompiledRole objects so can()/check() are a dict lookup plus a bit test.
+    The file is re-read only when its mtime changes, and the mtime itself is
+    looked at no more than once per `reload_interval` seconds, so checks on
+    the checkout path do no file I/O. A broken edit keeps the last good
+    rules in place.
+    """
+    
+    def __init__(self, path=DEFAULT_PATH, reload_interval=2.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.roles = {}
+        self._mtime = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+    
+    def reload(self):
+        """Load and compile the file now"""
+        mtime = os.stat(self.path).st_mtime_ns
+        definitions = load_permissions_file(self.path)
+        roles = {name: CompiledRole(name, definition) for name, definition in definitions.items()}
+        with self._lock:
+            self.roles = roles
+            self._mtime = mtime
+        logger.info("Permission dimuat: %s", ", ".join(sorted(roles)))
+    
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.reload_interval
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime != self._mtime:
+                # Catat mtime dulu supaya file rusak tidak dicoba (dan di-log) terus
+                self._mtime = mtime
+                self.reload()
+        except (OSError, ValueError):
+            logger.exception("Gagal memuat ulang %s; aturan lama tetap dipakai", self.path)
+    
+    def role(self, user):
+        """CompiledRole for a user dict (or role name)"""
+        self._maybe_reload()
+        name = user if isinstance(user, str) else user['role']
+        role = self.roles.get(name)
+        if role is None:
+            raise PermissionDenied(f"Role tidak dikenal: {name}")
+        return role
+    
+    def check(self, user, action, amount=None):
+        """ALLOWED, APPROVAL or DENIED"""
+        return self.role(user).check(action, amount)
+    
+    def can(self, user, action, amount=None):
+        """True if the user may do this without approval"""
+        return self.check(user, action, amount) == ALLOWED
+    
+    def require(self, user, action, amount=None, approver=None):
+        """
+        Raise PermissionDenied / ApprovalRequired unless allowed. An approver
+        (user dict) whose own role allows the action satisfies an approval rule.
+        """
+        result = self.check(user, action, amount)
+        if result == ALLOWED:
+            return
+        if result == APPROVAL:
+            if approver is not None and self.can(approver, action, amount):
+                return
+            raise ApprovalRequired(f"Aksi {action} butuh persetujuan supervisor", action, amount)
+        raise PermissionDenied(f"Role {self.role(user).name} tidak boleh melakukan {action}",
+                               action, amount)
+
+
+_default_service = None
+_default_lock = threading.Lock()
+
+
+def get_permission_service(path=DEFAULT_PATH):
+    """Process-wide PermissionService for the default permissions file"""
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            _default_service = PermissionService(path)
+        return _default_service
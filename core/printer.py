@@ -1,23 +1,27 @@
 #printer.py
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4, mm
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, Spacer
-from reportlab.lib import colors
+# reportlab di-import di dalam method supaya tidak memperlambat startup
 from datetime import datetime
 import os
+from core.escpos import EscPosRenderer, tax_label
 
 class ReceiptPrinter:
-    def __init__(self, company_info=None):
+    # Style sheet reportlab dibangun sekali lalu dipakai ulang oleh semua struk
+    _styles = None
+    
+    def __init__(self, company_info=None, paper_chars=48):
         self.company_info = company_info or {
             'name': 'TOKO XYZ',
             'address': 'Jl. Contoh No. 123',
             'phone': '(021) 12345678',
             'footer': 'Terima kasih telah berbelanja'
         }
+        self.escpos = EscPosRenderer(self.company_info, width=paper_chars)
         
     def generate_receipt(self, transaction_data, output_file="receipt.pdf"):
         """Generate precise receipt with proper formatting"""
+        from reportlab.lib.units import mm
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, Spacer
+        from reportlab.lib import colors
         
         doc = SimpleDocTemplate(
             output_file,
@@ -79,7 +83,7 @@ class ReceiptPrinter:
         summary_data = [
             ['Subtotal:', f"Rp {transaction_data['subtotal']:,.0f}"],
             ['Diskon:', f"-Rp {transaction_data['discount']:,.0f}"],
-            ['Pajak (10%):', f"Rp {transaction_data['tax']:,.0f}"],
+            [tax_label(transaction_data), f"Rp {transaction_data['tax']:,.0f}"],
             ['', ''],
             ['TOTAL:', f"Rp {transaction_data['total']:,.0f}"],
             ['Tunai:', f"Rp {transaction_data['cash']:,.0f}"],
@@ -108,8 +112,34 @@ class ReceiptPrinter:
         
         return output_file
     
-    def print_receipt(self, receipt_file, printer_name=None):
+    def render_raw(self, transaction_data):
+        """Render the receipt as ESC/POS bytes (fast path, no PDF layout)"""
+        return self.escpos.render(transaction_data)
+    
+    def print_receipt_raw(self, transaction_data, sink):
+        """
+        Send the receipt straight to a thermal printer.
+        sink: FileSink, DeviceSink or SocketSink from core.escpos
+        """
+        data = self.render_raw(transaction_data)
+        sink.write(data)
+        return len(data)
+    
+    def print_receipt_async(self, transaction_data, spooler, printer, callback=None):
+        """
+        Queue the ESC/POS receipt on a PrintSpooler and return the PrintJob
+        immediately, so the cashier can start the next sale while it prints.
+        """
+        return spooler.submit(printer, data=self.render_raw(transaction_data),
+                              callback=callback,
+                              name=transaction_data.get('transaction_code'))
+    
+    def print_receipt(self, receipt_file, printer_name=None, spooler=None):
         """Print receipt to thermal printer"""
+        if spooler is not None:
+            # Lewat antrian spooler; printer_name adalah nama printer di spooler
+            return spooler.submit(printer_name, path=receipt_file)
+        
         import win32api  # For Windows
         import win32print
         
@@ -136,6 +166,12 @@ class ReceiptPrinter:
     
     def get_styles(self):
         """Define styles for receipt"""
+        if ReceiptPrinter._styles is not None:
+            return ReceiptPrinter._styles
+        
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib import colors
+        
         styles = getSampleStyleSheet()
         
         custom_styles = {
@@ -162,4 +198,5 @@ class ReceiptPrinter:
             )
         }
         
+        ReceiptPrinter._styles = custom_styles
         return custom_styles
\ No newline at end of file
@@ -0,0 +1,207 @@
+# promotions.py
+import json
+from datetime import date
+
+# Jenis promo yang didukung
+BUY_N_GET_M = 'buy_n_get_m'
+BUNDLE_PRICE = 'bundle_price'
+TIERED_PERCENTAGE = 'tiered_percentage'
+
+
+def parse_buy_n_get_m(rule):
+    """'3:1' -> (3, 1): buy 3 get 1 free"""
+    n, m = map(int, str(rule).split(':'))
+    if n <= 0 or m <= 0:
+        raise ValueError(f"Aturan buy N get M tidak valid: {rule}")
+    return n, m
+
+
+def buy_n_get_m_discount(price, quantity, n, m):
+    """Value of the free units: every n + m units, m are free"""
+    return (quantity // (n + m)) * m * price
+
+
+class PromotionRule:
+    """
+    One compiled promotion. Targets are product codes and/or categories;
+    the rule only ever looks at the cart lines it targets (`members`).
+    Amounts are integer rupiah.
+    """
+    
+    __slots__ = ('name', 'type', 'products', 'categories', 'params', 'members', 'discount')
+    
+    def __init__(self, name, rule_type, products=(), categories=(), **params):
+        if rule_type not in EVALUATORS:
+            raise ValueError(f"Jenis promo tidak dikenal: {rule_type}")
+        if not products and not categories:
+            raise ValueError(f"Promo {name} tidak punya produk atau kategori")
+        self.name = name
+        self.type = rule_type
+        self.products = frozenset(products)
+        self.categories = frozenset(categories)
+        self.params = self._compile(rule_type, params)
+        self.members = {}    # product_id -> (harga, jumlah)
+        self.discount = 0
+    
+    @staticmethod
+    def _compile(rule_type, params):
+        if rule_type == BUY_N_GET_M:
+            if 'rule' in params:
+                n, m = parse_buy_n_get_m(params['rule'])
+            else:
+                n, m = int(params['n']), int(params['m'])
+            if n <= 0 or m <= 0:
+                raise ValueError("n dan m harus lebih dari 0")
+            return {'n': n, 'm': m}
+        if rule_type == BUNDLE_PRICE:
+            quantity, price = int(params['quantity']), int(params['price'])
+            if quantity <= 0 or price < 0:
+                raise ValueError("Bundle butuh quantity > 0 dan price >= 0")
+            return {'quantity': quantity, 'price': price}
+        # Tier: [(jumlah minimum, persen)], persen disimpan dalam basis poin
+        tiers = sorted((int(min_qty), round(float(pct) * 100)) for min_qty, pct in params['tiers'])
+        if any(not 0 <= bp <= 10000 for _, bp in tiers):
+            raise ValueError("Persentase tier harus antara 0-100")
+        return {'tiers': tiers}
+    
+    def update(self, product_id, price, quantity):
+        """Update one member line and re-evaluate; returns the change in discount"""
+        if quantity > 0:
+            self.members[product_id] = (price, quantity)
+        else:
+            self.members.pop(product_id, None)
+        previous = self.discount
+        self.discount = EVALUATORS[self.type](self.params, self.members.values())
+        return self.discount - previous
+
+
+def _eval_buy_n_get_m(params, members):
+    n, m = params['n'], params['m']
+    return sum(buy_n_get_m_discount(price, quantity, n, m) for price, quantity in members)
+
+
+def _eval_bundle_price(params, members):
+    """`quantity` target units (may be mixed) for `price`; bundles take the dearest units"""
+    size, bundle_price = params['quantity'], params['price']
+    units = sum(quantity for _, quantity in members)
+    bundles = units // size
+    if not bundles:
+        return 0
+    remaining = bundles * size
+    regular = 0
+    for price, quantity in sorted(members, reverse=True):
+        take = min(quantity, remaining)
+        regular += take * price
+        remaining -= take
+        if not remaining:
+            break
+    return max(0, regular - bundles * bundle_price)
+
+
+def _eval_tiered_percentage(params, members):
+    """Percentage of the targeted subtotal, by total targeted quantity"""
+    units = 0
+    subtotal = 0
+    for price, quantity in members:
+        units += quantity
+        subtotal += price * quantity
+    bp = 0
+    for min_qty, tier_bp in params['tiers']:
+        if units >= min_qty:
+            bp = tier_bp
+    # Pembulatan half-up ke rupiah, tetap integer
+    return (subtotal * bp + 5000) // 10000
+
+
+EVALUATORS = {
+    BUY_N_GET_M: _eval_buy_n_get_m,
+    BUNDLE_PRICE: _eval_bundle_price,
+    TIERED_PERCENTAGE: _eval_tiered_percentage,
+}
+
+
+def _active(definition, today):
+    start, end = definition.get('start'), definition.get('end')
+    today = today.isoformat()
+    return (not start or start <= today) and (not end or today <= end)
+
+
+class PromotionEngine:
+    """
+    Rules are compiled into lookups by product code and by category, so a
+    cart change only re-evaluates the rules that target the changed line.
+    The engine keeps a running total of all rule discounts.
+    
+    Overlapping rules stack: a line targeted by two rules gets both.
+    """
+    
+    def __init__(self, definitions=(), today=None):
+        today = today or date.today()
+        self.rules = []
+        self.by_code = {}
+        self.by_category = {}
+        for definition in definitions:
+            if not definition.get('active', True) or not _active(definition, today):
+                continue
+            definition = dict(definition)
+            rule = PromotionRule(definition.pop('name'), definition.pop('type'),
+                                 definition.pop('products', ()), definition.pop('categories', ()),
+                                 **{k: v for k, v in definition.items()
+                                    if k not in ('start', 'end', 'active')})
+            self.rules.append(rule)
+            for code in rule.products:
+                self.by_code.setdefault(code, []).append(rule)
+            for category in rule.categories:
+                self.by_category.setdefault(category, []).append(rule)
+        self.discount = 0
+        self.evaluations = 0
+    
+    @classmethod
+    def from_file(cls, path, today=None):
+        """Load a JSON list of rule definitions"""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f), today)
+    
+    @classmethod
+    def from_db(cls, db, today=None):
+        """Load active rules from the promotions table"""
+        return cls(db.get_promotions(), today)
+    
+    def rules_for(self, code, category):
+        rules = self.by_code.get(code, [])
+        if category in self.by_category:
+            # Satu rule bisa menarget kode dan kategori sekaligus
+            rules = list(dict.fromkeys(rules + self.by_category[category]))
+        return rules
+    
+    def update_line(self, product_id, code, category, price, quantity):
+        """Cart line changed (quantity 0 = removed); returns the new total discount"""
+        for rule in self.rules_for(code, category):
+            self.discount += rule.update(product_id, price, quantity)
+            self.evaluations += 1
+        return self.discount
+    
+    def reset(self):
+        for rule in self.rules:
+            rule.members.clear()
+            rule.discount = 0
+        self.discount = 0
+    
+    def applied(self):
+        """[(rule name, discount)] for rules currently giving a discount (e.g. on receipts)"""
+        return [(rule.name, rule.discount) for rule in self.rules if rule.discount]
+    
+    def evaluate(self, lines):
+        """Full evaluation of a list of cart lines from scratch (reference / batch use)"""
+        self.reset()
+        merged = {}
+        for line in lines:
+            key = line['product_id']
+            if key in merged:
+                merged[key]['quantity'] += line['quantity']
+            else:
+                merged[key] = dict(line)
+        for line in merged.values():
+            self.update_line(line['product_id'], line.get('code'), line.get('category'),
+                             line['price'], line['quantity'])
+        return self.discount
@@ -1,9 +1,115 @@
 # qr_generator.py
-import qrcode
-from PIL import Image, ImageDraw, ImageFont
+# qrcode dan PIL di-import saat dipakai supaya startup tetap cepat
+import csv
+import hashlib
 import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import pandas as pd
+
+# Opsi render yang ikut menentukan isi gambar. Ubah RENDER_VERSION bila
+# tampilan label berubah supaya semua label lama dianggap kotor.
+RENDER_VERSION = 1
+RENDER_OPTIONS = "v{version}|box=10|border=4|ec=L|canvas=300x350|font=16".format(version=RENDER_VERSION)
+
+# Nama file cache: <hash>.png
+LABEL_FILE_RE = re.compile(r'^[0-9a-f]{20}\.png$')
+# Kolom produk yang menentukan label
+LABEL_COLUMNS = ('id', 'code', 'name', 'selling_price', 'qr_code_path')
+
+# Resource yang dipakai ulang per proses: font dan kanvas label kosong
+_FONTS = {}
+_LABEL_TEMPLATE = None
+
+
+def _get_font(size=16):
+    """Load the caption font once per process"""
+    font = _FONTS.get(size)
+    if font is None:
+        from PIL import ImageFont
+        
+        # Load font (use default if not available)
+        try:
+            font = ImageFont.truetype("arial.ttf", size)
+        except:
+            font = ImageFont.load_default()
+        _FONTS[size] = font
+    return font
+
+
+def _blank_label():
+    global _LABEL_TEMPLATE
+    if _LABEL_TEMPLATE is None:
+        from PIL import Image
+        _LABEL_TEMPLATE = Image.new('RGB', (300, 350), 'white')
+    return _LABEL_TEMPLATE.copy()
+
+
+def build_payload(product_data):
+    """QR payload string, e.g. PRODUCT:code|name|price"""
+    return f"PRODUCT:{product_data['code']}|{product_data['name']}|{product_data['selling_price']}"
+
+
+def render_label(product_data, include_price=True):
+    """Render a product label (QR plus optional name/price caption) as a PIL image"""
+    import qrcode
+    from PIL import ImageDraw
+    
+    # Generate QR
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(build_payload(product_data))
+    qr.make(fit=True)
+    
+    # Create image
+    qr_img = qr.make_image(fill_color="black", back_color="white")
+    
+    # Add text below QR if needed
+    if not include_price:
+        return qr_img
+    
+    canvas = _blank_label()
+    canvas.paste(qr_img, (50, 20))
+    
+    # Add text
+    draw = ImageDraw.Draw(canvas)
+    font = _get_font(16)
+    
+    # Product name
+    draw.text((10, 280), product_data['name'][:30], fill="black", font=font)
+    
+    # Price
+    price_text = f"Rp {product_data['selling_price']:,.0f}"
+    draw.text((10, 310), price_text, fill="green", font=font)
+    
+    return canvas
+
+
+def label_key(product_data, include_price=True):
+    """Content hash of everything that affects the label image"""
+    content = f"{build_payload(product_data)}\0{include_price}\0{RENDER_OPTIONS}"
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()[:20]
+
+
+def _render_to_file(job):
+    """Worker entry point (must be module-level to be picklable)"""
+    product_data, include_price, filepath = job
+    # Tulis ke file sementara lalu rename, supaya cache tidak pernah berisi file setengah jadi
+    tmp_path = f"{filepath[:-4]}.{os.getpid()}.tmp.png"
+    render_label(product_data, include_price).save(tmp_path)
+    os.replace(tmp_path, filepath)
+    return filepath
+
+
+def _same_path(path):
+    """Normalized absolute path, for comparing stored and cached label paths"""
+    return os.path.normcase(os.path.abspath(path))
+
 
 class QRGenerator:
     def __init__(self, output_dir="qrcodes"):
@@ -12,86 +118,176 @@ class QRGenerator:
             os.makedirs(output_dir)
     
     def generate_single_qr(self, product_data, include_price=True):
-        """Generate single QR code with product information"""
-        # Prepare data
-        qr_data = {
-            'code': product_data['code'],
-            'name': product_data['name'],
-            'price': product_data['selling_price']
-        }
-        
-        # Convert to string
-        data_string = f"PRODUCT:{qr_data['code']}|{qr_data['name']}|{qr_data['price']}"
-        
-        # Generate QR
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(data_string)
-        qr.make(fit=True)
-        
-        # Create image
-        qr_img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Add text below QR if needed
-        if include_price:
-            # Create larger canvas
-            canvas = Image.new('RGB', (300, 350), 'white')
-            canvas.paste(qr_img, (50, 20))
-            
-            # Add text
-            draw = ImageDraw.Draw(canvas)
-            
-            # Load font (use default if not available)
-            try:
-                font = ImageFont.truetype("arial.ttf", 16)
-            except:
-                font = ImageFont.load_default()
-            
-            # Product name
-            draw.text((10, 280), product_data['name'][:30], fill="black", font=font)
-            
-            # Price
-            price_text = f"Rp {product_data['selling_price']:,.0f}"
-            draw.text((10, 310), price_text, fill="green", font=font)
-            
-            final_image = canvas
-        else:
-            final_image = qr_img
-        
-        # Save file
-        filename = f"{product_data['code']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        filepath = os.path.join(self.output_dir, filename)
-        final_image.save(filepath)
-        
-        return filepath
+        """Generate single QR code with product information (cached by content hash)"""
+        filepath = self._label_path(product_data, include_price)
+        if os.path.exists(filepath):
+            return filepath
+        return _render_to_file((product_data, include_price, filepath))
     
-    def generate_bulk_qr(self, products_data, quantity_per_product=1):
-        """Generate multiple QR codes in bulk"""
-        generated_files = []
+    def _label_path(self, product_data, include_price=True):
+        return os.path.join(self.output_dir, f"{label_key(product_data, include_price)}.png")
+    
+    def generate_bulk_qr(self, products_data, quantity_per_product=1, workers=None,
+                         include_price=True, db=None):
+        """
+        Generate multiple QR codes in bulk.
+        
+        Identical payloads are rendered once and every copy points at the same
+        file. Rendering is spread over a process pool (`workers`, default CPU
+        count; 1 renders in-process). The summary CSV is written row by row.
+        With `db`, products that have an id get their qr_code_path stored, so
+        collect_garbage() keeps the labels.
+        """
+        products_data = list(products_data)
         
+        # Satu render per label unik; salinan memakai file yang sama dan
+        # label yang sudah ada di cache tidak dirender ulang
+        unique = {}
         for product in products_data:
-            for i in range(quantity_per_product):
-                filepath = self.generate_single_qr(product)
-                generated_files.append({
-                    'product_code': product['code'],
-                    'product_name': product['name'],
-                    'file_path': filepath,
-                    'sequence': i + 1
-                })
-        
-        # Create summary CSV
+            key = label_key(product, include_price)
+            if key not in unique:
+                unique[key] = (product, self._label_path(product, include_price))
+        jobs = [(product, include_price, filepath) for product, filepath in unique.values()
+                if not os.path.exists(filepath)]
+        pending = {filepath for _, _, filepath in jobs}
+        
         summary_path = os.path.join(self.output_dir, 
                                   f"summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
-        df = pd.DataFrame(generated_files)
-        df.to_csv(summary_path, index=False)
+        generated_files = []
         
+        with open(summary_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['product_code', 'product_name', 'file_path', 'sequence'])
+            
+            # Hasil render datang berurutan sesuai kemunculan pertama tiap label
+            rendered = self._render_all(jobs, workers)
+            for product in products_data:
+                filepath = unique[label_key(product, include_price)][1]
+                if filepath in pending:
+                    next(rendered)
+                    pending.discard(filepath)
+                
+                for i in range(quantity_per_product):
+                    row = {
+                        'product_code': product['code'],
+                        'product_name': product['name'],
+                        'file_path': filepath,
+                        'sequence': i + 1
+                    }
+                    generated_files.append(row)
+                    writer.writerow(row.values())
+            
+            # Habiskan generator supaya process pool ditutup dengan rapi
+            for _ in rendered:
+                pass
+        
+        if db is not None:
+            db.update_qr_code_paths([(unique[label_key(product, include_price)][1], product['id'])
+                                     for product in products_data if product.get('id')])
         return generated_files, summary_path
     
-    def print_qr_codes(self, filepaths, printer_name=None):
+    def _render_all(self, jobs, workers):
+        """Yield (product, include_price, filepath) as each job finishes, in order"""
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(jobs) < 2:
+            for job in jobs:
+                _render_to_file(job)
+                yield job
+            return
+        
+        # Chunk besar mengurangi overhead pickling per label
+        chunksize = max(1, len(jobs) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for job, _ in zip(jobs, pool.map(_render_to_file, jobs, chunksize=chunksize)):
+                yield job
+    
+    def dirty_labels(self, db, include_price=True):
+        """
+        Products whose stored qr_code_path does not match their current label
+        key (new product, price/name change, render change) or whose file is gone.
+        """
+        dirty = []
+        # get_product_rows juga ada di DatabaseClient, jadi terminal mode server ikut bisa
+        for row in db.get_product_rows(LABEL_COLUMNS):
+            product = dict(zip(LABEL_COLUMNS, row))
+            expected = self._label_path(product, include_price)
+            current = product['qr_code_path']
+            if current is None or _same_path(current) != _same_path(expected) \
+                    or not os.path.exists(current):
+                dirty.append(product)
+        return dirty
+    
+    def regenerate_dirty(self, db, workers=None, include_price=True):
+        """Render only the dirty labels and store their paths; returns the product ids updated"""
+        dirty = self.dirty_labels(db, include_price)
+        if not dirty:
+            return []
+        
+        unique = {}
+        for product in dirty:
+            filepath = self._label_path(product, include_price)
+            unique.setdefault(filepath, product)
+        jobs = [(product, include_price, filepath) for filepath, product in unique.items()
+                if not os.path.exists(filepath)]
+        for _ in self._render_all(jobs, workers):
+            pass
+        
+        db.update_qr_code_paths([(self._label_path(p, include_price), p['id']) for p in dirty])
+        return [p['id'] for p in dirty]
+    
+    def collect_garbage(self, db, max_age_days=None, max_bytes=None):
+        """
+        Delete cached label images no product in `db` references any more.
+        With max_age_days, only orphans older than that are removed; with
+        max_bytes, oldest orphans are removed until the cache fits. Without
+        either limit every orphan is removed. Returns (files_removed, bytes_freed).
+        """
+        if db is None:
+            # Tanpa daftar produk semua label akan dianggap yatim
+            raise ValueError("collect_garbage butuh database untuk daftar label yang dipakai")
+        referenced = {_same_path(path) for (path,) in db.get_product_rows(('qr_code_path',))
+                      if path is not None}
+        
+        now = time.time()
+        total = 0
+        orphans = []
+        for entry in os.scandir(self.output_dir):
+            if not entry.is_file() or not LABEL_FILE_RE.match(entry.name):
+                continue
+            stat = entry.stat()
+            total += stat.st_size
+            if _same_path(entry.path) not in referenced:
+                orphans.append((stat.st_mtime, stat.st_size, entry.path))
+        orphans.sort()
+        
+        doomed = []
+        if max_age_days is None and max_bytes is None:
+            doomed = orphans
+        else:
+            if max_age_days is not None:
+                cutoff = now - max_age_days * 86400
+                doomed = [o for o in orphans if o[0] < cutoff]
+            if max_bytes is not None:
+                remaining = total - sum(size for _, size, _ in doomed)
+                chosen = {path for _, _, path in doomed}
+                for orphan in orphans:
+                    if remaining <= max_bytes:
+                        break
+                    if orphan[2] not in chosen:
+                        doomed.append(orphan)
+                        chosen.add(orphan[2])
+                        remaining -= orphan[1]
+        
+        freed = 0
+        for _, size, path in doomed:
+            try:
+                os.remove(path)
+                freed += size
+            except FileNotFoundError:
+                pass
+        return len(doomed), freed
+    
+    def print_qr_codes(self, filepaths, printer_name=None, spooler=None):
         """Print QR codes to printer"""
         from reportlab.pdfgen import canvas
         from reportlab.lib.pagesizes import A4, inch
@@ -103,28 +299,26 @@ class QRGenerator:
         
         width, height = A4
         
-        # Layout: 3 columns, 10 rows
+        # Layout: 3 kolom, jumlah baris sebanyak yang muat di A4
         x_margin = 15 * mm
         y_margin = 15 * mm
         qr_width = 60 * mm
         qr_height = 40 * mm
+        gap = 5 * mm
         
-        x_positions = [x_margin, x_margin + qr_width + 5*mm, x_margin + 2*(qr_width + 5*mm)]
-        y_positions = []
-        
-        current_y = height - y_margin
-        for i in range(10):
-            y_positions.append(current_y)
-            current_y -= (qr_height + 5*mm)
+        x_positions = [x_margin, x_margin + qr_width + gap, x_margin + 2*(qr_width + gap)]
+        rows = int((height - 2 * y_margin + gap) // (qr_height + gap))
+        y_positions = [height - y_margin - i * (qr_height + gap) for i in range(rows)]
+        per_page = len(x_positions) * rows
         
         # Place QR codes
         for idx, filepath in enumerate(filepaths):
-            if idx >= 30:  # Max per page
+            slot = idx % per_page
+            if slot == 0 and idx > 0:
                 c.showPage()
-                idx = 0
             
-            col = idx % 3
-            row = idx // 3
+            col = slot % 3
+            row = slot // 3
             
             x = x_positions[col]
             y = y_positions[row]
@@ -135,7 +329,36 @@ class QRGenerator:
         c.save()
         
         # Print PDF
-        if printer_name:
+        if spooler is not None:
+            # Antrian spooler: tidak menunggu printer dan tidak bergantung os.startfile
+            spooler.submit(printer_name, path=pdf_path)
+        elif printer_name:
             os.startfile(pdf_path, "print")
         
-        return pdf_path
\ No newline at end of file
+        return pdf_path
+    
+    def print_label_sheet(self, products, template='A4_3x10', quantity_per_product=1,
+                          include_price=True, printer_name=None, spooler=None,
+                          max_pages_per_file=100):
+        """
+        Print labels straight from product data as vector QR codes (no PNG
+        files); products may be any iterable, e.g. a database cursor.
+        Output rolls over to a new PDF every max_pages_per_file pages so
+        memory stays bounded on long runs. Returns the list of PDF paths.
+        """
+        from core.label_sheet import write_label_sheet
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        pdf_path = os.path.join(self.output_dir, f"labels_{timestamp}.pdf")
+        pdf_paths = write_label_sheet(products, pdf_path, template=template,
+                                      copies=quantity_per_product,
+                                      include_caption=include_price,
+                                      max_pages_per_file=max_pages_per_file)
+        
+        for path in pdf_paths:
+            if spooler is not None:
+                spooler.submit(printer_name, path=path)
+            elif printer_name:
+                os.startfile(path, "print")
+        
+        return pdf_paths
@@ -0,0 +1,330 @@
+# reports.py
+"""
+Laporan penjualan, laba dan inventory yang di-stream dari SQLite. Baris
+dibaca per fetchmany, diagregasi dalam satu lintasan (memori sebanding
+jumlah hari/produk, bukan jumlah baris) dan ditulis bertahap ke CSV,
+XLSX (openpyxl write-only) atau Parquet (pyarrow). Bulan yang sudah
+diarsip (database/archive.py) ikut terbaca.
+
+    python -m core.reports profit --from 2024-01-01 --to 2024-12-31 --output laba.csv
+"""
+import argparse
+import csv
+import json
+import os
+import time
+
+# Kolom produk untuk melengkapi laporan per produk
+PRODUCT_COLUMNS = ('id', 'code', 'name', 'category', 'purchase_price', 'stock')
+
+
+class ReportCancelled(Exception):
+    """Raised inside the engine when cancel() returns True"""
+
+
+def _date_params(date_from, date_to):
+    # date('9999-12-31', '+1 day') di query bernilai NULL, jadi batas atas terbuka 9999-12-30
+    return (date_from or '0000-01-01', date_to or '9999-12-30')
+
+
+def _products(db, product_ids):
+    """{id: row dict} for the given ids, fetched in batches"""
+    found = {}
+    product_ids = list(product_ids)
+    for start in range(0, len(product_ids), 500):
+        for row in db.get_product_rows(PRODUCT_COLUMNS, product_ids[start:start + 500]):
+            found[row[0]] = dict(zip(PRODUCT_COLUMNS, row))
+    return found
+
+
+def transactions_report(rows, db):
+    """Every transaction as one row, passed straight through"""
+    yield from rows
+
+
+def daily_sales_report(rows, db):
+    """Totals per day; state is one entry per day in the range"""
+    days = {}
+    for day, total, discount, tax, final, status in rows:
+        entry = days.get(day)
+        if entry is None:
+            entry = days[day] = [0, 0.0, 0.0, 0.0, 0.0, 0]
+        if status == 'completed':
+            entry[0] += 1
+            entry[1] += total or 0
+            entry[2] += discount or 0
+            entry[3] += tax or 0
+            entry[4] += final or 0
+        else:
+            entry[5] += 1
+    for day in sorted(days):
+        count, gross, discount, tax, final, voids = days[day]
+        yield (day, count, gross, discount, tax, final, final / count if count else 0.0, voids)
+
+
+def profit_report(rows, db):
+    """
+    Quantity, revenue, cost and profit per product. Cost uses the
+    product's current purchase_price; transaction-level discounts are not
+    spread over the lines.
+    """
+    totals = {}
+    for product_id, quantity, subtotal in rows:
+        entry = totals.get(product_id)
+        if entry is None:
+            entry = totals[product_id] = [0, 0.0]
+        entry[0] += quantity
+        entry[1] += subtotal or 0
+    products = _products(db, totals)
+    for product_id in sorted(totals, key=lambda pid: -totals[pid][1]):
+        quantity, revenue = totals[product_id]
+        product = products.get(product_id, {})
+        cost = quantity * (product.get('purchase_price') or 0)
+        yield (product_id, product.get('code'), product.get('name'), product.get('category'),
+               quantity, revenue, cost, revenue - cost)
+
+
+def inventory_report(rows, db):
+    """Stock movements per product by action, with the current stock"""
+    totals = {}
+    for product_id, action, change in rows:
+        entry = totals.get(product_id)
+        if entry is None:
+            entry = totals[product_id] = {'sale': 0, 'void': 0, 'restock': 0, 'other': 0}
+        key = action if action in ('sale', 'void') else ('restock' if change > 0 else 'other')
+        entry[key] += change
+    products = _products(db, totals)
+    for product_id in sorted(totals):
+        entry = totals[product_id]
+        product = products.get(product_id, {})
+        yield (product_id, product.get('code'), product.get('name'), -entry['sale'],
+               entry['void'], entry['restock'], entry['other'], sum(entry.values()),
+               product.get('stock'))
+
+
+# nama -> (kolom, query per partisi, fungsi agregasi). Placeholder tabel diisi
+# dengan tabel aktif atau tabel arsip (PartitionedReader.partition_rows)
+REPORTS = {
+    'transactions': (
+        ('id', 'transaction_code', 'created_at', 'user_id', 'total_amount', 'discount_amount',
+         'tax_amount', 'final_amount', 'payment_method', 'status'),
+        '''
+        SELECT id, transaction_code, created_at, user_id, total_amount, discount_amount,
+               tax_amount, final_amount, payment_method, status
+        FROM {transactions}
+        WHERE created_at >= ? AND created_at < date(?, '+1 day')
+        ORDER BY created_at, id
+        ''',
+        transactions_report),
+    'sales': (
+        ('day', 'transaction_count', 'gross_sales', 'discount', 'tax', 'total_sales',
+         'avg_transaction', 'void_count'),
+        '''
+        SELECT substr(created_at, 1, 10), total_amount, discount_amount, tax_amount,
+               final_amount, status
+        FROM {transactions}
+        WHERE created_at >= ? AND created_at < date(?, '+1 day')
+        ''',
+        daily_sales_report),
+    'profit': (
+        ('product_id', 'code', 'name', 'category', 'quantity', 'revenue', 'cost', 'profit'),
+        '''
+        SELECT d.product_id, d.quantity, d.subtotal
+        FROM {transactions} t
+        JOIN {transaction_details} d ON d.transaction_id = t.id
+        WHERE t.created_at >= ? AND t.created_at < date(?, '+1 day') AND t.status = 'completed'
+        ''',
+        profit_report),
+    'inventory': (
+        ('product_id', 'code', 'name', 'sold', 'voided', 'restocked', 'adjusted', 'net_change',
+         'current_stock'),
+        '''
+        SELECT product_id, action, quantity_change
+        FROM {inventory_logs}
+        WHERE created_at >= ? AND created_at < date(?, '+1 day')
+        ''',
+        inventory_report),
+}
+
+
+class CsvReportWriter:
+    def __init__(self, path, columns):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+    
+    def write(self, row):
+        self._writer.writerow(row)
+    
+    def close(self):
+        self._file.close()
+
+
+class XlsxReportWriter:
+    """openpyxl write-only workbook: rows are streamed to disk, not kept as cells"""
+    
+    def __init__(self, path, columns):
+        from openpyxl import Workbook
+        
+        self.path = path
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Laporan")
+        self._sheet.append(list(columns))
+    
+    def write(self, row):
+        self._sheet.append(list(row))
+    
+    def close(self):
+        self._workbook.save(self.path)
+
+
+class ParquetReportWriter:
+    """pyarrow ParquetWriter; rows are buffered into row groups of `batch_size`"""
+    
+    def __init__(self, path, columns, batch_size=50_000):
+        self.path = path
+        self.columns = columns
+        self.batch_size = batch_size
+        self._rows = []
+        self._writer = None
+    
+    def write(self, row):
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+    
+    def _flush(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        if not self._rows:
+            return
+        table = pa.Table.from_arrays([pa.array(list(column)) for column in zip(*self._rows)],
+                                     names=list(self.columns))
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        elif table.schema != self._writer.schema:
+            # Tipe kolom ditentukan oleh row group pertama
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+        self._rows = []
+    
+    def close(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        self._flush()
+        if self._writer is None:
+            # Tanpa baris: tetap tulis file dengan kolom saja
+            empty = pa.table({column: pa.array([], pa.null()) for column in self.columns})
+            self._writer = pq.ParquetWriter(self.path, empty.schema)
+        self._writer.close()
+
+
+WRITERS = {'.csv': CsvReportWriter, '.xlsx': XlsxReportWriter, '.parquet': ParquetReportWriter}
+
+
+class ReportEngine:
+    """
+    Runs a report from REPORTS into a file in one pass. Source rows are
+    read with fetchmany in batches of `fetch_size` (hot database plus any
+    archived months in the range) and fed through the report's aggregator
+    straight into the writer, so memory does not grow with the date range.
+    progress(rows_read) is called once per batch; cancel() returning True
+    stops the run and removes the partial file.
+    """
+    
+    def __init__(self, db, fetch_size=2000):
+        self.db = db
+        self.fetch_size = fetch_size
+    
+    def _source(self, query, params, date_from, date_to):
+        if self.db.db_path != ':memory:':
+            from database.archive import PartitionedReader
+            
+            reader = PartitionedReader(self.db, self.fetch_size)
+            yield from reader.partition_rows(query, params, date_from, date_to)
+            return
+        
+        # Database in-memory: tanpa arsip, langsung dari koneksi pool
+        tables = {name: name for name in ('transactions', 'transaction_details',
+                                          'void_transactions', 'inventory_logs')}
+        with self.db.read() as conn:
+            cursor = conn.execute(query.format(**tables), params)
+            while True:
+                batch = cursor.fetchmany(self.fetch_size)
+                if not batch:
+                    break
+                yield from batch
+    
+    def _counted(self, rows, stats, progress, cancel):
+        count = 0
+        for row in rows:
+            yield row
+            count += 1
+            if count % self.fetch_size == 0:
+                stats['rows_read'] = count
+                if progress:
+                    progress(count)
+                if cancel and cancel():
+                    raise ReportCancelled()
+        stats['rows_read'] = count
+        if progress:
+            progress(count)
+    
+    def run(self, report, output_path, date_from=None, date_to=None, progress=None, cancel=None):
+        """Write `report` to output_path (format from the extension); returns a summary dict"""
+        if report not in REPORTS:
+            raise ValueError(f"Laporan tidak dikenal: {report}")
+        extension = os.path.splitext(output_path)[1].lower()
+        if extension not in WRITERS:
+            raise ValueError(f"Format laporan tidak didukung: {extension}")
+        columns, query, aggregate = REPORTS[report]
+        params = _date_params(date_from, date_to)
+        
+        started = time.perf_counter()
+        stats = {'rows_read': 0}
+        written = 0
+        cancelled = False
+        writer = WRITERS[extension](output_path, columns)
+        try:
+            source = self._counted(self._source(query, params, date_from, date_to),
+                                   stats, progress, cancel)
+            for row in aggregate(source, self.db):
+                writer.write(row)
+                written += 1
+        except ReportCancelled:
+            cancelled = True
+        finally:
+            writer.close()
+        if cancelled and os.path.exists(output_path):
+            os.remove(output_path)
+        
+        return {
+            'report': report,
+            'rows_read': stats['rows_read'],
+            'rows_written': written,
+            'seconds': time.perf_counter() - started,
+            'path': None if cancelled else output_path,
+            'cancelled': cancelled
+        }
+
+
+def main():
+    from database.database import Database
+    
+    parser = argparse.ArgumentParser(description="Ekspor laporan secara streaming")
+    parser.add_argument('report', choices=sorted(REPORTS))
+    parser.add_argument('--db', default="cashier_system.db")
+    parser.add_argument('--from', dest='date_from')
+    parser.add_argument('--to', dest='date_to')
+    parser.add_argument('--output', required=True, help=".csv, .xlsx atau .parquet")
+    args = parser.parse_args()
+    
+    with Database(args.db) as db:
+        summary = ReportEngine(db).run(args.report, args.output, args.date_from, args.date_to)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
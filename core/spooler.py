@@ -0,0 +1,322 @@
+# spooler.py
+import collections
+import heapq
+import itertools
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+from core.escpos import DeviceSink, SocketSink
+
+logger = logging.getLogger(__name__)
+
+# Status job
+QUEUED = 'queued'
+PRINTING = 'printing'
+RETRYING = 'retrying'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class SpoolerFull(Exception):
+    """Raised by submit(block=False) when the printer's queue is full"""
+
+
+class PrintJob:
+    _ids = itertools.count(1)
+    
+    def __init__(self, printer, data=None, path=None, callback=None, name=None):
+        if (data is None) == (path is None):
+            raise ValueError("Isi salah satu: data (bytes) atau path (file)")
+        self.id = next(PrintJob._ids)
+        self.printer = printer
+        self.data = data
+        self.path = path
+        self.name = name or f"job{self.id}"
+        self.callback = callback
+        self.status = QUEUED
+        self.attempts = 0
+        self.error = None
+        self._done = threading.Event()
+    
+    def payload_bytes(self):
+        if self.data is not None:
+            return self.data
+        with open(self.path, 'rb') as f:
+            return f.read()
+    
+    def wait(self, timeout=None):
+        """Block until the job is done or failed; returns True if it finished"""
+        return self._done.wait(timeout)
+    
+    def __repr__(self):
+        return f"PrintJob(id={self.id}, printer={self.printer!r}, status={self.status})"
+
+
+class CupsBackend:
+    """Print through CUPS `lp` (Linux/macOS); raw mode for ESC/POS bytes"""
+    
+    def __init__(self, printer=None, raw=True, lp_command="lp"):
+        self.printer = printer
+        self.raw = raw
+        self.lp_command = lp_command
+    
+    def send(self, job):
+        cmd = [self.lp_command, "-t", job.name]
+        if self.printer:
+            cmd += ["-d", self.printer]
+        if self.raw and job.data is not None:
+            cmd += ["-o", "raw"]
+        if job.path is not None:
+            subprocess.run(cmd + [job.path], check=True, capture_output=True)
+        else:
+            subprocess.run(cmd + ["-"], input=job.data, check=True, capture_output=True)
+
+
+class DeviceBackend:
+    """Raw writes to a device node such as /dev/usb/lp0"""
+    
+    def __init__(self, device="/dev/usb/lp0"):
+        self.sink = DeviceSink(device)
+    
+    def send(self, job):
+        self.sink.write(job.payload_bytes())
+
+
+class TcpBackend:
+    """Raw TCP (port 9100) network printer"""
+    
+    def __init__(self, host, port=9100, timeout=5.0):
+        self.sink = SocketSink(host, port, timeout)
+    
+    def send(self, job):
+        self.sink.write(job.payload_bytes())
+
+
+class FileSinkBackend:
+    """Write each job to <directory>/<job id>.bin; stand-in printer for tests"""
+    
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+    
+    def send(self, job):
+        ext = os.path.splitext(job.path)[1] if job.path else ".bin"
+        target = os.path.join(self.directory, f"{job.id:08d}{ext}")
+        with open(target, 'wb') as f:
+            f.write(job.payload_bytes())
+
+
+class Win32Backend:
+    """Windows shell printing (the original ShellExecute behaviour); files only"""
+    
+    def __init__(self, printer=None):
+        self.printer = printer
+    
+    def send(self, job):
+        import win32api
+        
+        if job.path is None:
+            raise ValueError("Win32Backend hanya mencetak file")
+        params = f'/d:"{self.printer}"' if self.printer else None
+        win32api.ShellExecute(0, "print", job.path, params, ".", 0)
+
+
+def default_backend(printer=None):
+    """Platform default: ShellExecute on Windows, CUPS lp elsewhere"""
+    if sys.platform == "win32":
+        return Win32Backend(printer)
+    return CupsBackend(printer)
+
+
+class PrintSpooler:
+    """
+    Background print queue so checkout never waits on a printer.
+    
+    Each printer is pinned to one worker thread with its own bounded queue,
+    so jobs for the same printer print in submission order while different
+    printers print in parallel. Failed sends are rescheduled with
+    exponential backoff; while a job waits for its retry, later jobs for
+    the same printer are held behind it and other printers on the same
+    worker keep printing. callback(job) is called from the worker thread on
+    every status change; GUI code should hand it to the Tk thread (e.g.
+    root.after). submit(None, ...) goes to `default_printer`, or to the
+    first printer registered when none is given.
+    """
+    
+    def __init__(self, backends, workers=2, max_queue=100, max_retries=3,
+                 backoff=0.5, backoff_max=10.0, default_printer=None):
+        self.backends = dict(backends)   # nama printer -> backend
+        self.default_printer = default_printer or next(iter(self.backends), None)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self._queues = [queue.Queue(maxsize=max_queue) for _ in range(workers)]
+        self._assignment = {}
+        self._next_worker = itertools.cycle(range(workers))
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()   # submit() ditolak
+        self._stop = threading.Event()       # worker berhenti
+        self._idle = threading.Condition()
+        self._pending = 0                    # job yang belum DONE/FAILED
+        self._threads = []
+        for index, q in enumerate(self._queues):
+            thread = threading.Thread(target=self._worker, args=(q,),
+                                      name=f"print-spooler-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def add_printer(self, name, backend):
+        self.backends[name] = backend
+        if self.default_printer is None:
+            self.default_printer = name
+    
+    def _queue_for(self, printer):
+        with self._lock:
+            if printer not in self._assignment:
+                self._assignment[printer] = next(self._next_worker)
+            return self._queues[self._assignment[printer]]
+    
+    def submit(self, printer, data=None, path=None, callback=None, name=None,
+               block=True, timeout=None):
+        """
+        Queue raw bytes or a file for `printer` (None: the default printer);
+        returns the PrintJob
+        """
+        if printer is None:
+            printer = self.default_printer
+        if printer not in self.backends:
+            raise KeyError(f"Printer tidak dikenal: {printer}")
+        
+        job = PrintJob(printer, data=data, path=path, callback=callback, name=name)
+        # Dicek di bawah lock yang sama dengan shutdown(), supaya job tidak
+        # masuk sesudah join() selesai dan membuat _pending tidak pernah nol
+        with self._idle:
+            if self._stopping.is_set():
+                raise RuntimeError("Spooler sudah dihentikan")
+            self._pending += 1
+        # Callback 'queued' dipanggil sebelum worker bisa mengambil job
+        self._notify(job)
+        try:
+            self._queue_for(printer).put(job, block=block, timeout=timeout)
+        except queue.Full:
+            job.error = SpoolerFull(f"Antrian printer {printer} penuh")
+            self._set_status(job, FAILED)
+            raise job.error
+        return job
+    
+    def _notify(self, job):
+        if job.callback:
+            try:
+                job.callback(job)
+            except Exception:
+                logger.exception("Callback print job gagal")
+    
+    def _set_status(self, job, status):
+        job.status = status
+        if status in (DONE, FAILED):
+            job._done.set()
+            with self._idle:
+                self._pending -= 1
+                self._idle.notify_all()
+        self._notify(job)
+    
+    def _worker(self, q):
+        retries = []   # heap (jatuh tempo, job id, job)
+        held = {}      # printer -> job yang menunggu di belakang retry
+        while not self._stop.is_set():
+            timeout = None
+            if retries:
+                timeout = max(0.0, retries[0][0] - time.monotonic())
+            try:
+                job = q.get(timeout=timeout)
+            except queue.Empty:
+                job = None
+            if job is not None:
+                if job.printer in held:
+                    held[job.printer].append(job)
+                else:
+                    self._print(job, retries, held)
+            while retries and retries[0][0] <= time.monotonic() and not self._stop.is_set():
+                _, _, job = heapq.heappop(retries)
+                self._print(job, retries, held)
+        
+        # Dihentikan tanpa menunggu: job yang belum tercetak digagalkan
+        leftovers = [job for _, _, job in sorted(retries)]
+        leftovers += [job for waiting in held.values() for job in waiting]
+        while True:
+            try:
+                job = q.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                leftovers.append(job)
+        for job in leftovers:
+            job.error = job.error or RuntimeError("Spooler dihentikan sebelum job dicetak")
+            self._set_status(job, FAILED)
+    
+    def _print(self, job, retries, held):
+        """Print job, then the jobs for its printer that were held behind it"""
+        printer = job.printer
+        while True:
+            if not self._attempt(job, retries):
+                held.setdefault(printer, collections.deque())
+                return
+            waiting = held.get(printer)
+            if not waiting or self._stop.is_set():
+                if not waiting:
+                    held.pop(printer, None)
+                return
+            job = waiting.popleft()
+    
+    def _attempt(self, job, retries):
+        """Send once; returns False if the job was rescheduled for a retry"""
+        backend = self.backends[job.printer]
+        job.attempts += 1
+        self._set_status(job, PRINTING)
+        try:
+            backend.send(job)
+        except Exception as e:
+            job.error = e
+            if job.attempts > self.max_retries or self._stop.is_set():
+                self._set_status(job, FAILED)
+                return True
+            self._set_status(job, RETRYING)
+            # Backoff eksponensial tanpa sleep: worker lanjut ke printer lain
+            delay = min(self.backoff * 2 ** (job.attempts - 1), self.backoff_max)
+            heapq.heappush(retries, (time.monotonic() + delay, job.id, job))
+            return False
+        job.error = None
+        self._set_status(job, DONE)
+        return True
+    
+    def join(self):
+        """Wait until every queued job has finished"""
+        with self._idle:
+            while self._pending:
+                self._idle.wait()
+    
+    def shutdown(self, wait=True):
+        """
+        Stop the workers. With wait=True, queued jobs are printed first;
+        with wait=False, jobs not yet printing are marked FAILED.
+        """
+        with self._idle:
+            self._stopping.set()
+        if wait:
+            self.join()
+        self._stop.set()
+        for q in self._queues:
+            # Bangunkan worker yang menunggu di get(); antrian penuh berarti
+            # worker sedang sibuk dan akan melihat _stop sendiri
+            try:
+                q.put_nowait(None)
+            except queue.Full:
+                pass
+        if wait:
+            for thread in self._threads:
+                thread.join()
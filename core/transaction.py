@@ -1,9 +1,11 @@
 # transaction.py
+from core.promotions import buy_n_get_m_discount, parse_buy_n_get_m
+
 class TransactionCalculator:
     def __init__(self):
         pass
     
-    def calculate_discount(self, subtotal, discount_type, discount_value):
+    def calculate_discount(self, subtotal, discount_type, discount_value, items=None):
         """
         Calculate discount with various types:
         - percentage: discount_value is percentage (0-100)
@@ -18,24 +20,28 @@ class TransactionCalculator:
             discount_amount = min(discount_value, subtotal)
         elif discount_type == 'buy_n_get_m':
             # Special logic for buy N get M free
-            discount_amount = self.calculate_buy_n_get_m(subtotal, discount_value)
+            discount_amount = self.calculate_buy_n_get_m(subtotal, discount_value, items)
         else:
             discount_amount = 0
         
         return discount_amount
     
-    def calculate_buy_n_get_m(self, subtotal, promotion_rule):
+    def calculate_buy_n_get_m(self, subtotal, promotion_rule, items=None):
         """
         Calculate buy N get M free discount
         promotion_rule format: "3:1" means buy 3 get 1 free
+        Applied per line: every N + M units of a product, M are free.
+        Per-product or per-category promotions: see core.promotions.
         """
         try:
-            n, m = map(int, promotion_rule.split(':'))
-            # Logic for this promotion
-            # This would need actual cart items to calculate properly
-            return 0  # Placeholder
-        except:
+            n, m = parse_buy_n_get_m(promotion_rule)
+        except ValueError:
             return 0
+        if not items:
+            return 0
+        discount = sum(buy_n_get_m_discount(item['price'], item['quantity'], n, m)
+                       for item in items)
+        return min(discount, subtotal)
     
     def calculate_tax(self, subtotal, tax_percentage=10):
         """Calculate tax (PPN)"""
@@ -48,7 +54,7 @@ class TransactionCalculator:
         subtotal = sum(item['price'] * item['quantity'] for item in items)
         
         # Apply discount
-        discount_amount = self.calculate_discount(subtotal, discount_type, discount_value)
+        discount_amount = self.calculate_discount(subtotal, discount_type, discount_value, items)
         
         # Calculate taxable amount
         taxable_amount = subtotal - discount_amount
@@ -65,4 +71,233 @@ class TransactionCalculator:
             'taxable_amount': taxable_amount,
             'tax_amount': tax_amount,
             'final_amount': final_amount
-        }
\ No newline at end of file
+        }
+
+def percent_of(amount, percentage):
+    """
+    percentage % of an integer rupiah amount as integer rupiah. The
+    percentage is taken in basis points (0.01%) and the result is rounded
+    half up, the same rule the promotion tiers use.
+    """
+    bp = round(percentage * 100)
+    return (amount * bp + 5000) // 10000
+
+
+def to_rupiah(value):
+    """Convert a price to integer rupiah; fractional rupiah are rejected"""
+    rupiah = int(value)
+    if rupiah != value:
+        raise ValueError(f"Harga harus dalam rupiah bulat: {value}")
+    return rupiah
+
+
+class Cart:
+    """
+    Shopping cart with running totals. Prices and line subtotals are kept
+    as integer rupiah and the subtotal is updated by the line delta on
+    every change, so totals() is O(1) however long the basket is. Discount
+    and tax are integer rupiah too, each rounded half up once (percent_of),
+    so totals() has no float drift; it differs from the float
+    calculate_final_amount(cart.items(), ...) only by that rounding.
+    
+    With a PromotionEngine, each line change also updates the promotions
+    targeting that line; their total is added to discount_amount (and
+    reported separately as promotion_amount).
+    
+    With a PermissionService and the cashier's user dict, manual discounts
+    and checkout are checked against the cashier's role.
+    """
+    
+    def __init__(self, calculator=None, tax_percentage=10, promotions=None,
+                 permissions=None, user=None):
+        self.calculator = calculator or TransactionCalculator()
+        self.tax_percentage = tax_percentage
+        self.promotions = promotions
+        self.permissions = permissions
+        self.user = user
+        self.discount_approver = None
+        self.lines = {}          # product_id -> line dict (urutan scan)
+        self.subtotal = 0
+        self.discount_type = None
+        self.discount_value = 0
+        self._history = []       # (product_id, line sebelum perubahan atau None)
+    
+    def __len__(self):
+        return len(self.lines)
+    
+    def __contains__(self, product_id):
+        return product_id in self.lines
+    
+    def _replace_line(self, product_id, line):
+        """Swap a line (None removes it), keeping subtotal in step"""
+        old = self.lines.get(product_id)
+        if old is not None:
+            self.subtotal -= old['subtotal']
+        if line is None:
+            self.lines.pop(product_id, None)
+        else:
+            self.subtotal += line['subtotal']
+            self.lines[product_id] = line
+        
+        if self.promotions is not None:
+            current = line or old
+            if current is not None:
+                self.promotions.update_line(product_id, current['code'], current['category'],
+                                            current['price'], line['quantity'] if line else 0)
+    
+    def _change(self, product_id, line):
+        previous = self.lines.get(product_id)
+        self._history.append((product_id, dict(previous) if previous else None))
+        self._replace_line(product_id, line)
+    
+    def add(self, product, quantity=1):
+        """Scan a product (dict with id, name, selling_price); repeats add to the line"""
+        if quantity <= 0:
+            raise ValueError("Jumlah harus lebih dari 0")
+        product_id = product['id']
+        line = self.lines.get(product_id)
+        if line is None:
+            price = to_rupiah(product['selling_price'])
+            line = {'product_id': product_id, 'code': product.get('code'),
+                    'category': product.get('category'), 'name': product['name'],
+                    'price': price, 'quantity': 0, 'subtotal': 0}
+        else:
+            line = dict(line)
+        line['quantity'] += quantity
+        line['subtotal'] = line['price'] * line['quantity']
+        self._change(product_id, line)
+        return line
+    
+    def set_quantity(self, product_id, quantity):
+        """Change a line's quantity; 0 removes the line"""
+        if product_id not in self.lines:
+            raise KeyError(f"Produk {product_id} tidak ada di keranjang")
+        if quantity < 0:
+            raise ValueError("Jumlah tidak boleh negatif")
+        if quantity == 0:
+            return self.remove(product_id)
+        line = dict(self.lines[product_id])
+        line['quantity'] = quantity
+        line['subtotal'] = line['price'] * quantity
+        self._change(product_id, line)
+        return line
+    
+    def remove(self, product_id):
+        if product_id not in self.lines:
+            raise KeyError(f"Produk {product_id} tidak ada di keranjang")
+        self._change(product_id, None)
+    
+    def undo(self):
+        """Revert the last add/set_quantity/remove; returns False if nothing to undo"""
+        if not self._history:
+            return False
+        product_id, previous = self._history.pop()
+        self._replace_line(product_id, previous)
+        return True
+    
+    def set_discount(self, discount_type=None, discount_value=0, approver=None):
+        """
+        Set the cart-wide discount. With permissions, raises PermissionDenied
+        or ApprovalRequired (pass the approving user as approver) and leaves
+        the previous discount in place.
+        """
+        if discount_type == 'percentage' and not 0 <= discount_value <= 100:
+            raise ValueError("Persentase diskon harus antara 0-100")
+        previous = self.discount_type, self.discount_value
+        self.discount_type = discount_type
+        self.discount_value = discount_value
+        if self.permissions is not None:
+            try:
+                self.permissions.require(self.user, 'discount', self.discount_percentage(),
+                                         approver)
+            except Exception:
+                self.discount_type, self.discount_value = previous
+                raise
+        self.discount_approver = approver
+    
+    def discount_percentage(self):
+        """Manual (non-promotion) discount as a percentage of the discountable amount"""
+        if self.discount_type is None:
+            return 0
+        if self.discount_type == 'percentage':
+            return self.discount_value
+        totals = self.totals()
+        promotion_amount = totals.get('promotion_amount', 0)
+        base = totals['subtotal'] - promotion_amount
+        manual = totals['discount_amount'] - promotion_amount
+        return manual / base * 100 if base else 0
+    
+    def clear(self):
+        self.lines.clear()
+        self.subtotal = 0
+        self.discount_type = None
+        self.discount_value = 0
+        self.discount_approver = None
+        self._history.clear()
+        if self.promotions is not None:
+            self.promotions.reset()
+    
+    def items(self):
+        return list(self.lines.values())
+    
+    def manual_discount(self, base):
+        """Cart-wide discount on `base` integer rupiah, rounded half up"""
+        if self.discount_type == 'percentage':
+            return percent_of(base, self.discount_value)
+        if self.discount_type == 'fixed':
+            # Nominal tetap dibulatkan half up ke rupiah
+            return min(int(self.discount_value + 0.5), base)
+        if self.discount_type == 'buy_n_get_m':
+            # Harga baris sudah integer, jadi hasilnya juga integer
+            return self.calculator.calculate_buy_n_get_m(base, self.discount_value,
+                                                         list(self.lines.values()))
+        return 0
+    
+    def totals(self):
+        """Same keys as TransactionCalculator.calculate_final_amount, in integer rupiah"""
+        subtotal = self.subtotal
+        if self.promotions is None:
+            discount_amount = self.manual_discount(subtotal)
+        else:
+            # Diskon keranjang dihitung setelah promo per produk
+            promotion_amount = min(self.promotions.discount, subtotal)
+            discount_amount = promotion_amount + self.manual_discount(subtotal - promotion_amount)
+        
+        taxable_amount = subtotal - discount_amount
+        tax_amount = percent_of(taxable_amount, self.tax_percentage)
+        totals = {
+            'subtotal': subtotal,
+            'discount_amount': discount_amount,
+            'taxable_amount': taxable_amount,
+            'tax_amount': tax_amount,
+            'final_amount': taxable_amount + tax_amount
+        }
+        if self.promotions is not None:
+            totals['promotion_amount'] = promotion_amount
+        return totals
+    
+    def to_sale(self, user_id):
+        """Cart dict for Database.record_sale"""
+        if self.permissions is not None:
+            # Diskon nominal bisa naik persentasenya setelah baris dihapus: cek ulang
+            self.permissions.require(self.user, 'checkout')
+            self.permissions.require(self.user, 'discount', self.discount_percentage(),
+                                     self.discount_approver)
+        totals = self.totals()
+        sale = {
+            'user_id': user_id,
+            'items': [{'product_id': line['product_id'], 'quantity': line['quantity'],
+                       'price': line['price'], 'subtotal': line['subtotal']}
+                      for line in self.lines.values()],
+            'subtotal': totals['subtotal'],
+            'discount_amount': totals['discount_amount'],
+            'tax_amount': totals['tax_amount'],
+            'final_amount': totals['final_amount']
+        }
+        if self.discount_type is not None:
+            # Dipakai sales server untuk menghitung ulang diskon manual
+            sale['discount'] = {'type': self.discount_type, 'value': self.discount_value}
+        # Persentase hanya disimpan bila diskon = persen x subtotal (audit memeriksanya)
+        if self.discount_type == 'percentage' and not totals.get('promotion_amount'):
+            sale['discount_percentage'] = self.discount_value
+        return sale
@@ -0,0 +1,388 @@
+# archive.py
+"""
+Arsip bulanan transaksi. Bulan yang sudah tutup dipindah dari
+cashier_system.db ke file arsip per bulan (archive/cashier_YYYY_MM.db)
+sehingga database aktif tetap kecil. Laporan lintas periode memakai
+PartitionedReader yang meng-ATTACH file arsip dan menggabungkannya
+(UNION ALL) dengan tabel aktif.
+
+Rollup sales_daily/sales_hourly tidak ikut diarsip, jadi ringkasan
+dashboard tetap lengkap tanpa membuka arsip.
+
+    python -m database.archive archive --keep-months 12 --vacuum
+    python -m database.archive restore 2024-01
+    python -m database.archive list
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from datetime import date
+
+from database.database import local_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Tabel yang dipartisi per bulan, urutan salin
+ARCHIVE_TABLES = ('transactions', 'transaction_details', 'void_transactions', 'inventory_logs')
+# Detail dan void dihapus sebelum transaksinya (filternya memakai id transaksi)
+DELETE_ORDER = ('transaction_details', 'void_transactions', 'transactions', 'inventory_logs')
+
+# Index di file arsip untuk query laporan
+ARCHIVE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS {alias}.idx_transactions_created_at ON transactions(created_at)",
+    "CREATE INDEX IF NOT EXISTS {alias}.idx_transaction_details_transaction "
+    "ON transaction_details(transaction_id)",
+    "CREATE INDEX IF NOT EXISTS {alias}.idx_transaction_details_product "
+    "ON transaction_details(product_id)",
+    "CREATE INDEX IF NOT EXISTS {alias}.idx_inventory_logs_created_at ON inventory_logs(created_at)",
+)
+
+PERIOD_RE = re.compile(r'^\d{4}-\d{2}$')
+
+
+def month_bounds(period):
+    """'2024-01' -> ('2024-01-01', '2024-02-01')"""
+    if not PERIOD_RE.match(period):
+        raise ValueError(f"Periode harus YYYY-MM: {period}")
+    year, month = map(int, period.split('-'))
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01", f"{next_year:04d}-{next_month:02d}-01"
+
+
+def period_alias(period):
+    return "p_" + period.replace('-', '_')
+
+
+def partition_filters(schema, start, end):
+    """WHERE clause per table selecting one month in `schema`"""
+    in_period = (f"SELECT id FROM {schema}.transactions "
+                 f"WHERE created_at >= '{start}' AND created_at < '{end}'")
+    return {
+        'transactions': f"created_at >= '{start}' AND created_at < '{end}'",
+        'transaction_details': f"transaction_id IN ({in_period})",
+        'void_transactions': f"original_transaction_id IN ({in_period})",
+        'inventory_logs': f"created_at >= '{start}' AND created_at < '{end}'",
+    }
+
+
+def table_columns(conn, table, schema='main'):
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def missing_columns(conn, table, schema):
+    """(name, type) of hot-table columns an older archive file does not have"""
+    archived = set(table_columns(conn, table, schema))
+    return [(row[1], row[2]) for row in conn.execute(f"PRAGMA main.table_info({table})")
+            if row[1] not in archived]
+
+
+class Archiver:
+    """
+    Moves closed months out of the hot database. Each month is copied into
+    its own archive file and committed there first, then deleted from the
+    hot database in a second transaction that also records the partition.
+    (With WAL, a transaction spanning attached files is not atomic across
+    them, hence two steps.) Copies use INSERT OR REPLACE with the original
+    ids, so a run interrupted between the steps is simply repeated.
+    """
+    
+    def __init__(self, db, archive_dir="archive", keep_months=12):
+        if db.db_path == ':memory:':
+            raise ValueError("Arsip butuh database berbentuk file")
+        self.db = db
+        self.archive_dir = archive_dir
+        self.keep_months = keep_months
+    
+    def archive_path(self, period):
+        return os.path.join(self.archive_dir, f"cashier_{period.replace('-', '_')}.db")
+    
+    def partitions(self):
+        """Archived months as dicts, oldest first"""
+        with self.db.read() as conn:
+            rows = conn.execute("SELECT * FROM archive_partitions ORDER BY period").fetchall()
+        return [dict(row) for row in rows]
+    
+    def cutoff(self, today=None):
+        """First day of the oldest month that stays in the hot database"""
+        today = today or date.today()
+        months = today.year * 12 + today.month - 1 - self.keep_months
+        return f"{months // 12:04d}-{months % 12 + 1:02d}-01"
+    
+    def closed_periods(self, today=None):
+        """Months older than keep_months that still have rows in the hot database"""
+        cutoff = self.cutoff(today)
+        with self.db.read() as conn:
+            rows = conn.execute('''
+                SELECT DISTINCT substr(created_at, 1, 7) FROM transactions WHERE created_at < ?
+                UNION
+                SELECT DISTINCT substr(created_at, 1, 7) FROM inventory_logs WHERE created_at < ?
+            ''', (cutoff, cutoff)).fetchall()
+        return sorted(row[0] for row in rows if row[0])
+    
+    def _create_tables(self, conn, alias):
+        for table in ARCHIVE_TABLES:
+            sql = conn.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?",
+                               (table,)).fetchone()[0]
+            # Skema sama persis dengan tabel aktif, hanya dibuat di database arsip
+            sql = re.sub(r'^CREATE TABLE\s+(IF NOT EXISTS\s+)?"?' + table + r'"?',
+                         f"CREATE TABLE IF NOT EXISTS {alias}.{table}", sql, count=1)
+            conn.execute(sql)
+            # File arsip dari skema lama (mis. sebelum unit_cost, migrasi 7)
+            for name, type_ in missing_columns(conn, table, alias):
+                conn.execute(f"ALTER TABLE {alias}.{table} ADD COLUMN {name} {type_}")
+        for statement in ARCHIVE_INDEXES:
+            conn.execute(statement.format(alias=alias))
+    
+    def archive_period(self, period):
+        """Move one month to its archive file; returns row counts and seconds"""
+        start, end = month_bounds(period)
+        alias = period_alias(period)
+        path = self.archive_path(period)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        started = time.perf_counter()
+        
+        with self.db.pool.attached(path, alias) as conn:
+            self._create_tables(conn, alias)
+            hot = partition_filters('main', start, end)
+            
+            # Langkah 1: salin ke arsip dan commit di sana
+            with self.db.transaction():
+                for table in ARCHIVE_TABLES:
+                    columns = ", ".join(table_columns(conn, table))
+                    conn.execute(f"INSERT OR REPLACE INTO {alias}.{table} ({columns}) "
+                                 f"SELECT {columns} FROM main.{table} WHERE {hot[table]}")
+            
+            # Langkah 2: pastikan arsip lengkap, hapus dari database aktif, catat partisi
+            archived = partition_filters(alias, start, end)
+            counts = {}
+            with self.db.transaction():
+                for table in ARCHIVE_TABLES:
+                    in_hot = conn.execute(f"SELECT COUNT(*) FROM main.{table} "
+                                          f"WHERE {hot[table]}").fetchone()[0]
+                    in_archive = conn.execute(f"SELECT COUNT(*) FROM {alias}.{table} "
+                                              f"WHERE {archived[table]}").fetchone()[0]
+                    if in_archive < in_hot:
+                        raise ValueError(f"Arsip {period} tidak lengkap untuk {table}: "
+                                         f"{in_archive} dari {in_hot} baris")
+                    counts[table] = in_archive
+                for table in DELETE_ORDER:
+                    conn.execute(f"DELETE FROM main.{table} WHERE {hot[table]}")
+                conn.execute('''
+                    INSERT OR REPLACE INTO archive_partitions
+                        (period, path, transactions, transaction_details, void_transactions,
+                         inventory_logs, archived_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (period, path, counts['transactions'], counts['transaction_details'],
+                      counts['void_transactions'], counts['inventory_logs'], local_timestamp()))
+        
+        seconds = time.perf_counter() - started
+        logger.info("Periode %s diarsip ke %s (%d transaksi, %.2f detik)",
+                    period, path, counts['transactions'], seconds)
+        return {'period': period, 'path': path, **counts, 'seconds': seconds}
+    
+    def archive_closed(self, today=None, vacuum=False):
+        """Archive every closed month; optionally VACUUM the hot database afterwards"""
+        results = [self.archive_period(period) for period in self.closed_periods(today)]
+        if results and vacuum:
+            self.vacuum()
+        return results
+    
+    def restore_period(self, period, remove_file=True):
+        """Copy an archived month back into the hot database"""
+        start, end = month_bounds(period)
+        alias = period_alias(period)
+        with self.db.read() as conn:
+            row = conn.execute("SELECT path FROM archive_partitions WHERE period = ?",
+                               (period,)).fetchone()
+        if row is None:
+            raise ValueError(f"Periode {period} tidak ada di arsip")
+        path = row[0]
+        started = time.perf_counter()
+        
+        counts = {}
+        with self.db.pool.attached(path, alias) as conn:
+            archived = partition_filters(alias, start, end)
+            with self.db.transaction():
+                for table in ARCHIVE_TABLES:
+                    # Kolom yang tidak ada di arsip lama dibiarkan NULL
+                    hot_columns = table_columns(conn, table)
+                    columns = ", ".join(column for column in table_columns(conn, table, alias)
+                                        if column in hot_columns)
+                    counts[table] = conn.execute(
+                        f"INSERT OR REPLACE INTO main.{table} ({columns}) "
+                        f"SELECT {columns} FROM {alias}.{table} WHERE {archived[table]}").rowcount
+                conn.execute("DELETE FROM archive_partitions WHERE period = ?", (period,))
+        
+        if remove_file:
+            os.remove(path)
+        seconds = time.perf_counter() - started
+        logger.info("Periode %s dikembalikan dari %s (%.2f detik)", period, path, seconds)
+        return {'period': period, 'path': path, **counts, 'seconds': seconds}
+    
+    def vacuum(self):
+        """Rebuild the hot database file so archived space is returned to the OS"""
+        self.db.pool.vacuum()
+
+
+class PartitionedReader:
+    """
+    Report queries over the hot database plus archived months. A query is
+    written with {transactions}, {transaction_details}, {void_transactions}
+    and {inventory_logs} placeholders; each becomes a UNION ALL of the hot
+    table and the same table in every archive overlapping the date range.
+    SQLite attaches at most ~10 files per connection, so longer ranges run
+    as several groups and rows() yields the groups' rows one after another
+    (aggregates must then be merged by the caller, see monthly_sales).
+    """
+    
+    def __init__(self, db, fetch_size=1000):
+        if db.db_path == ':memory:':
+            raise ValueError("PartitionedReader butuh database berbentuk file")
+        self.db = db
+        self.fetch_size = fetch_size
+    
+    def partitions(self, date_from=None, date_to=None):
+        """(period, path) of archived months overlapping [date_from, date_to]"""
+        with self.db.read() as conn:
+            rows = conn.execute("SELECT period, path FROM archive_partitions ORDER BY period").fetchall()
+        found = []
+        for period, path in rows:
+            start, end = month_bounds(period)
+            if date_from and end <= date_from[:10]:
+                continue
+            if date_to and start > date_to[:10]:
+                continue
+            found.append((period, path))
+        return found
+    
+    def _connect(self):
+        conn = sqlite3.connect(f"file:{os.path.abspath(self.db.db_path)}?mode=ro", uri=True)
+        conn.execute("PRAGMA query_only=ON")
+        return conn
+    
+    def _groups(self, partitions, max_attached):
+        if not partitions:
+            return [[]]
+        return [partitions[i:i + max_attached] for i in range(0, len(partitions), max_attached)]
+    
+    def _union_sql(self, conn, schemas):
+        tables = {}
+        for table in ARCHIVE_TABLES:
+            parts = []
+            for schema in schemas:
+                # Arsip dari skema lama: kolom yang belum ada diisi NULL
+                missing = {name for name, _ in missing_columns(conn, table, schema)}
+                columns = ", ".join(f"NULL AS {column}" if column in missing else column
+                                    for column in table_columns(conn, table))
+                parts.append(f"SELECT {columns} FROM {schema}.{table}")
+            tables[table] = "(" + " UNION ALL ".join(parts) + ")"
+        return tables
+    
+    def rows(self, template, params=(), date_from=None, date_to=None, include_hot=True):
+        """Yield result rows of `template` across hot and archived partitions"""
+        partitions = self.partitions(date_from, date_to)
+        with closing(self._connect()) as conn:
+            max_attached = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+            for index, group in enumerate(self._groups(partitions, max_attached)):
+                schemas = ['main'] if include_hot and index == 0 else []
+                for period, path in group:
+                    alias = period_alias(period)
+                    conn.execute(f"ATTACH DATABASE ? AS {alias}",
+                                 (f"file:{os.path.abspath(path)}?mode=ro",))
+                    schemas.append(alias)
+                cursor = None
+                try:
+                    if not schemas:
+                        continue
+                    cursor = conn.execute(template.format(**self._union_sql(conn, schemas)), params)
+                    while True:
+                        batch = cursor.fetchmany(self.fetch_size)
+                        if not batch:
+                            break
+                        yield from batch
+                finally:
+                    # Cursor yang masih terbuka (mis. laporan dibatalkan) mengunci DETACH
+                    if cursor is not None:
+                        cursor.close()
+                    for period, _ in group:
+                        conn.execute(f"DETACH DATABASE {period_alias(period)}")
+    
+    def partition_rows(self, template, params=(), date_from=None, date_to=None, include_hot=True):
+        """
+        Yield rows of `template` run once per partition (hot first, then
+        each archive attached on its own), with each placeholder replaced by
+        that partition's table. Joins then use the partition's indexes;
+        callers aggregate across partitions.
+        """
+        with closing(self._connect()) as conn:
+            schemas = [('main', None)] if include_hot else []
+            schemas += [(period_alias(period), path)
+                        for period, path in self.partitions(date_from, date_to)]
+            for schema, path in schemas:
+                if path is not None:
+                    conn.execute(f"ATTACH DATABASE ? AS {schema}",
+                                 (f"file:{os.path.abspath(path)}?mode=ro",))
+                tables = {table: f"{schema}.{table}" for table in ARCHIVE_TABLES}
+                cursor = conn.execute(template.format(**tables), params)
+                try:
+                    while True:
+                        batch = cursor.fetchmany(self.fetch_size)
+                        if not batch:
+                            break
+                        yield from batch
+                finally:
+                    cursor.close()
+                    if path is not None:
+                        conn.execute(f"DETACH DATABASE {schema}")
+    
+    def monthly_sales(self, date_from, date_to):
+        """Cross-partition report: completed sales per month between two dates"""
+        totals = {}
+        for month, count, total in self.rows('''
+                SELECT substr(created_at, 1, 7), COUNT(*), SUM(final_amount)
+                FROM {transactions}
+                WHERE created_at >= ? AND created_at < date(?, '+1 day') AND status = 'completed'
+                GROUP BY 1
+                ''', (date_from, date_to), date_from, date_to):
+            # Bulan yang sama bisa muncul di lebih dari satu kelompok ATTACH
+            previous = totals.get(month, (0, 0.0))
+            totals[month] = (previous[0] + count, previous[1] + (total or 0.0))
+        return [{'month': month, 'transaction_count': count, 'total_sales': total}
+                for month, (count, total) in sorted(totals.items())]
+
+
+def main():
+    from database.database import Database
+    
+    parser = argparse.ArgumentParser(description="Arsip bulanan transaksi")
+    parser.add_argument('command', choices=['archive', 'restore', 'list', 'report'])
+    parser.add_argument('period', nargs='?', help="YYYY-MM (restore) atau tanggal awal (report)")
+    parser.add_argument('--to', help="Tanggal akhir laporan (report)")
+    parser.add_argument('--db', default="cashier_system.db")
+    parser.add_argument('--archive-dir', default="archive")
+    parser.add_argument('--keep-months', type=int, default=12)
+    parser.add_argument('--vacuum', action='store_true')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    with Database(args.db) as db:
+        archiver = Archiver(db, args.archive_dir, args.keep_months)
+        if args.command == 'archive':
+            result = archiver.archive_closed(vacuum=args.vacuum)
+        elif args.command == 'restore':
+            result = archiver.restore_period(args.period)
+        elif args.command == 'report':
+            result = PartitionedReader(db).monthly_sales(args.period or '2000-01-01',
+                                                         args.to or date.today().isoformat())
+        else:
+            result = archiver.partitions()
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
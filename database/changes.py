@@ -0,0 +1,83 @@
+# changes.py
+"""
+Feed perubahan produk berbasis kursor. Trigger di tabel products menulis
+ke product_changes dengan nomor urut (seq) yang selalu naik; pelanggan
+cukup menanyakan "apa yang berubah setelah seq X" tanpa scan tabel.
+Bekerja untuk Database lokal maupun DatabaseClient (perubahan dari semua
+terminal ikut terlihat).
+"""
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeFeed:
+    """
+    Polls Database.get_product_changes from a background thread and calls
+    each subscriber with the changed product ids. When the cursor has fallen
+    behind the pruned change log, subscribers' on_reset() is called instead
+    so they reload in full.
+    """
+    
+    def __init__(self, db, interval_ms=500, batch_size=1000):
+        self.db = db
+        self.interval = interval_ms / 1000
+        self.batch_size = batch_size
+        # Mulai dari posisi sekarang: pelanggan memuat data awal sendiri
+        self.cursor = db.get_change_sequence()
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def subscribe(self, callback, on_reset=None):
+        """callback(product_ids) after changes; on_reset() when a full reload is needed"""
+        with self._lock:
+            self._subscribers.append((callback, on_reset))
+    
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s[0] != callback]
+    
+    def poll(self):
+        """Deliver every change after the cursor; returns the number of product ids seen"""
+        seen = 0
+        while True:
+            changes = self.db.get_product_changes(self.cursor, self.batch_size)
+            self.cursor = changes['seq']
+            with self._lock:
+                subscribers = list(self._subscribers)
+            
+            for callback, on_reset in subscribers:
+                try:
+                    if changes['reset']:
+                        if on_reset:
+                            on_reset()
+                    elif changes['product_ids']:
+                        callback(changes['product_ids'])
+                except Exception:
+                    logger.exception("Pelanggan feed perubahan gagal")
+            
+            seen += len(changes['product_ids'])
+            if not changes['more']:
+                return seen
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Polling feed perubahan gagal")
+    
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,177 @@
+# connection.py
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+}
+
+
+class ConnectionPool:
+    """
+    Pool koneksi SQLite: satu koneksi writer (dilindungi lock) dan
+    koneksi reader per-thread. Semua koneksi memakai profil PRAGMA yang sama
+    dan cache prepared statement bawaan sqlite3 (kunci: teks SQL).
+    """
+    
+    def __init__(self, db_path, cache_size_kb=16384, mmap_size=64 * 1024 * 1024,
+                 busy_timeout_ms=5000, statement_cache_size=256, max_readers=8):
+        self.db_path = db_path
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.statement_cache_size = statement_cache_size
+        self.max_readers = max_readers
+        
+        # Database in-memory tidak bisa dibagi antar koneksi, jadi reader
+        # memakai koneksi writer
+        self.shared_memory = db_path == ':memory:'
+        
+        self._writer_lock = threading.RLock()
+        self._readers_lock = threading.Lock()
+        self._readers: Dict[int, sqlite3.Connection] = {}
+        self._local = threading.local()
+        self._writer = self._connect()
+        self._closed = False
+    
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: transaksi dikelola manual lewat transaction()
+        conn = sqlite3.connect(
+            self.db_path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size,
+            timeout=self.busy_timeout_ms / 1000,
+        )
+        conn.row_factory = sqlite3.Row
+        pragmas = dict(DEFAULT_PRAGMAS)
+        pragmas['cache_size'] = -int(self.cache_size_kb)
+        pragmas['mmap_size'] = int(self.mmap_size)
+        pragmas['busy_timeout'] = int(self.busy_timeout_ms)
+        if self.shared_memory:
+            pragmas.pop('journal_mode')
+        for name, value in pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+    
+    @property
+    def writer(self) -> sqlite3.Connection:
+        return self._writer
+    
+    def reader(self) -> sqlite3.Connection:
+        """Return the calling thread's reader connection, opening it on first use"""
+        if self.shared_memory:
+            return self._writer
+        
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        
+        with self._readers_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection pool sudah ditutup")
+            # Buang koneksi milik thread yang sudah selesai sebelum menambah baru
+            alive = {t.ident for t in threading.enumerate()}
+            for ident in [i for i in self._readers if i not in alive]:
+                self._readers.pop(ident).close()
+            if len(self._readers) >= self.max_readers:
+                # Pool penuh: baca lewat writer (diserialisasi oleh lock)
+                return None
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")
+            stale = self._readers.pop(threading.get_ident(), None)
+            if stale is not None:
+                stale.close()
+            self._readers[threading.get_ident()] = conn
+        
+        self._local.conn = conn
+        return conn
+    
+    @contextmanager
+    def read(self):
+        """Context manager yielding a connection for read-only queries"""
+        conn = self.reader()
+        if conn is None or conn is self._writer:
+            with self._writer_lock:
+                yield self._writer
+        else:
+            yield conn
+    
+    @contextmanager
+    def transaction(self, mode='IMMEDIATE'):
+        """
+        Run a block inside one write transaction on the writer connection.
+        Commits on success, rolls back on any exception. Nested use from the
+        same thread joins the outer transaction through a savepoint.
+        """
+        with self._writer_lock:
+            conn = self._writer
+            if conn.in_transaction:
+                conn.execute("SAVEPOINT nested")
+                try:
+                    yield conn
+                except BaseException:
+                    conn.execute("ROLLBACK TO nested")
+                    conn.execute("RELEASE nested")
+                    raise
+                else:
+                    conn.execute("RELEASE nested")
+                return
+            
+            conn.execute(f"BEGIN {mode}")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                conn.execute("COMMIT")
+    
+    @contextmanager
+    def attached(self, path, alias):
+        """
+        ATTACH another database file to the writer for the duration of the
+        block (ATTACH is not allowed inside a transaction, so the writer
+        lock is held without one; transaction() can be used inside).
+        """
+        with self._writer_lock:
+            self._writer.execute("ATTACH DATABASE ? AS " + alias, (path,))
+            try:
+                yield self._writer
+            finally:
+                if self._writer.in_transaction:
+                    self._writer.execute("ROLLBACK")
+                self._writer.execute("DETACH DATABASE " + alias)
+    
+    def checkpoint(self, mode='FULL'):
+        """
+        Copy the WAL into the database file. With synchronous=NORMAL this is
+        the point where committed data is known to be on disk. Returns True
+        if every WAL frame was checkpointed.
+        """
+        with self._writer_lock:
+            busy, log_frames, checkpointed = self._writer.execute(
+                f"PRAGMA wal_checkpoint({mode})").fetchone()
+        return busy == 0 and log_frames == checkpointed
+    
+    def vacuum(self):
+        """Rebuild the database file, returning free pages to the OS"""
+        with self._writer_lock:
+            self._writer.execute("VACUUM")
+    
+    def close(self):
+        """Close every pooled connection"""
+        with self._readers_lock:
+            self._closed = True
+            for conn in self._readers.values():
+                conn.close()
+            self._readers.clear()
+        with self._writer_lock:
+            if self._writer.in_transaction:
+                self._writer.execute("ROLLBACK")
+            self._writer.close()
@@ -1,19 +1,83 @@
 # database/database.py
 import sqlite3
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Tuple
 import hashlib
+import logging
+import uuid
+from database.connection import ConnectionPool
+from database.migrations import run_migrations
+from database.rollups import apply_delta, rebuild_rollups
+
+logger = logging.getLogger(__name__)
+
+
+def local_timestamp(now=None):
+    """
+    Local wall-clock time as stored in every created_at/updated_at column.
+    SQLite's CURRENT_TIMESTAMP is UTC, so it is never used for writes.
+    """
+    return (now or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class InsufficientStockError(ValueError):
+    """Raised when a sale would take a product's stock below zero"""
+    
+    def __init__(self, shortages):
+        # shortages: list of (product_id, requested, available)
+        self.shortages = shortages
+        detail = ", ".join(f"produk {pid}: diminta {req}, tersedia {avail}"
+                           for pid, req, avail in shortages)
+        super().__init__(f"Stok tidak mencukupi ({detail})")
+
 
 class Database:
-    def __init__(self, db_path="cashier_system.db"):
+    def __init__(self, db_path="cashier_system.db", cache_size_kb=16384,
+                 mmap_size=64 * 1024 * 1024, max_readers=8):
         self.db_path = db_path
+        self.pool = ConnectionPool(db_path,
+                                   cache_size_kb=cache_size_kb,
+                                   mmap_size=mmap_size,
+                                   max_readers=max_readers)
+        self._product_listeners = []
         self.init_database()
     
+    def transaction(self):
+        """Context manager for one write transaction on the shared writer connection"""
+        return self.pool.transaction()
+    
+    def read(self):
+        """Context manager yielding this thread's pooled read connection"""
+        return self.pool.read()
+    
+    def close(self):
+        """Close all pooled connections"""
+        self.pool.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def init_database(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.transaction() as conn:
+            self._create_tables(conn.cursor())
         
+        # Tabel sementara milik koneksi writer untuk update stok berbasis set
+        self.pool.writer.execute('''
+            CREATE TEMP TABLE IF NOT EXISTS sale_lines (
+                product_id INTEGER PRIMARY KEY,
+                quantity INTEGER NOT NULL
+            )
+        ''')
+        
+        # Index dan perubahan skema berikutnya dikelola lewat migrasi berversi
+        run_migrations(self.pool)
+        self.prune_product_changes()
+    
+    def _create_tables(self, cursor):
         # Tabel Users dengan role-based permissions
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -115,27 +179,594 @@ class Database:
         if cursor.fetchone()[0] == 0:
             admin_hash = hashlib.sha256("admin123".encode()).hexdigest()
             cursor.execute('''
-                INSERT INTO users (username, password_hash, full_name, role)
+                INSERT INTO users (username, password_hash, full_name, role, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', ('admin', admin_hash, 'Administrator', 'admin', local_timestamp()))
+    
+    def authenticate_user(self, username: str, password: str) -> Optional[Dict]:
+        password_hash = hashlib.sha256(password.encode()).hexdigest()
+        with self.read() as conn:
+            user = conn.execute('''
+                SELECT * FROM users 
+                WHERE username = ? AND password_hash = ? AND is_active = 1
+            ''', (username, password_hash)).fetchone()
+        
+        return dict(user) if user else None
+    
+    def request_approval(self, username: str, password: str, action: str,
+                         amount=None) -> Optional[Dict]:
+        """
+        Supervisor approval: the user if the credentials are valid and their
+        role allows `action` at `amount`, else None. Same call as
+        DatabaseClient.request_approval, which also returns a single-use token.
+        """
+        from core.permissions import get_permission_service
+        
+        approver = self.authenticate_user(username, password)
+        if approver is None or not get_permission_service().can(approver, action, amount):
+            return None
+        return approver
+    
+    @staticmethod
+    def generate_transaction_code(now=None):
+        """Generate a unique transaction code, e.g. TRX20240101123000A1B2C3"""
+        now = now or datetime.now()
+        return f"TRX{now.strftime('%Y%m%d%H%M%S')}{uuid.uuid4().hex[:6].upper()}"
+    
+    def record_sale(self, cart: Dict, payment: Dict) -> Dict:
+        """
+        Persist a complete sale in a single BEGIN IMMEDIATE transaction.
+        
+        cart: {'user_id', 'items': [{'product_id', 'quantity', 'price',
+               'discount' (opsional)}], 'subtotal', 'discount_amount',
+               'discount_percentage' (opsional), 'tax_amount', 'final_amount',
+               'transaction_code' (opsional)}
+        payment: {'method', 'cash_paid'}
+        
+        Raises InsufficientStockError (and writes nothing) if any product
+        would go below zero stock.
+        """
+        with self.transaction() as conn:
+            result = self._write_sale(conn, cart, payment)
+        
+        self._notify_products({item['product_id'] for item in cart['items']})
+        return result
+    
+    def record_sales(self, sales: List[Tuple[Dict, Dict]], allow_oversell=False,
+                     skip_existing=False) -> List:
+        """
+        Group commit: persist many (cart, payment) sales in one transaction,
+        each inside its own savepoint. A sale that fails (e.g. insufficient
+        stock) is rolled back alone; its slot in the returned list holds the
+        exception instead of the record_sale() result.
+        
+        For replaying sales that already happened: allow_oversell lets stock
+        go negative instead of raising, and skip_existing returns None for a
+        sale whose transaction_code is already stored.
+        """
+        results = []
+        product_ids = set()
+        with self.transaction() as conn:
+            for cart, payment in sales:
+                if skip_existing and conn.execute(
+                        "SELECT 1 FROM transactions WHERE transaction_code = ?",
+                        (cart.get('transaction_code'),)).fetchone():
+                    results.append(None)
+                    continue
+                try:
+                    with self.transaction():
+                        results.append(self._write_sale(conn, cart, payment, allow_oversell))
+                except Exception as e:
+                    results.append(e)
+                else:
+                    product_ids.update(item['product_id'] for item in cart['items'])
+        
+        if product_ids:
+            self._notify_products(product_ids)
+        return results
+    
+    def _write_sale(self, conn, cart, payment, allow_oversell=False):
+        """Write one sale on a connection that is already inside a transaction"""
+        items = cart['items']
+        if not items:
+            raise ValueError("Keranjang kosong")
+        
+        now = datetime.now()
+        # Penjualan dari journal membawa waktu aslinya
+        created_at = cart.get('created_at') or local_timestamp(now)
+        transaction_code = cart.get('transaction_code') or self.generate_transaction_code(now)
+        user_id = cart['user_id']
+        
+        # Gabungkan baris dengan produk yang sama untuk update stok
+        quantities = {}
+        for item in items:
+            quantities[item['product_id']] = quantities.get(item['product_id'], 0) + item['quantity']
+        
+        conn.execute("DELETE FROM temp.sale_lines")
+        conn.executemany("INSERT INTO temp.sale_lines (product_id, quantity) VALUES (?, ?)",
+                         quantities.items())
+        
+        # Cek oversell, ambil stok awal dan harga beli dalam satu query
+        rows = conn.execute('''
+            SELECT s.product_id, s.quantity, p.stock, p.purchase_price
+            FROM temp.sale_lines s
+            LEFT JOIN products p ON p.id = s.product_id
+        ''').fetchall()
+        shortages = [(pid, qty, stock or 0) for pid, qty, stock, _ in rows
+                     if stock is None or stock < qty]
+        if any(row[2] is None for row in rows):
+            # Produk tidak ada: tidak bisa dicatat, juga saat replay
+            raise InsufficientStockError(shortages)
+        if shortages and not allow_oversell:
+            raise InsufficientStockError(shortages)
+        if shortages:
+            logger.warning("Penjualan %s membuat stok minus: %s", transaction_code, shortages)
+        previous_stock = {pid: stock for pid, _, stock, _ in rows}
+        unit_cost = {pid: purchase_price for pid, _, _, purchase_price in rows}
+        cost = sum(qty * purchase_price for _, qty, _, purchase_price in rows)
+        
+        # Satu statement untuk semua pengurangan stok
+        conn.execute('''
+            UPDATE products
+            SET stock = stock - (SELECT quantity FROM temp.sale_lines
+                                 WHERE product_id = products.id),
+                updated_at = ?
+            WHERE id IN (SELECT product_id FROM temp.sale_lines)
+        ''', (created_at,))
+        
+        cash_paid = payment.get('cash_paid')
+        final_amount = cart['final_amount']
+        change_amount = cash_paid - final_amount if cash_paid is not None else None
+        
+        cursor = conn.execute('''
+            INSERT INTO transactions (transaction_code, user_id, total_amount,
+                                      discount_amount, discount_percentage,
+                                      tax_amount, final_amount, payment_method,
+                                      cash_paid, change_amount, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'completed', ?)
+        ''', (transaction_code, user_id, cart['subtotal'],
+              cart.get('discount_amount', 0), cart.get('discount_percentage', 0),
+              cart.get('tax_amount', 0), final_amount, payment.get('method', 'cash'),
+              cash_paid, change_amount, created_at))
+        transaction_id = cursor.lastrowid
+        
+        conn.executemany('''
+            INSERT INTO transaction_details (transaction_id, product_id, quantity,
+                                             unit_price, discount, subtotal, unit_cost)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [(transaction_id, item['product_id'], item['quantity'], item['price'],
+               item.get('discount', 0),
+               item.get('subtotal', item['price'] * item['quantity'] - item.get('discount', 0)),
+               unit_cost[item['product_id']])
+              for item in items])
+        
+        conn.executemany('''
+            INSERT INTO inventory_logs (product_id, user_id, action, quantity_change,
+                                        previous_stock, new_stock, notes, created_at)
+            VALUES (?, ?, 'sale', ?, ?, ?, ?, ?)
+        ''', [(pid, user_id, -qty, previous_stock[pid], previous_stock[pid] - qty,
+               transaction_code, created_at)
+              for pid, qty in quantities.items()])
+        
+        apply_delta(conn, created_at, user_id, {
+            'transaction_count': 1,
+            'items_sold': sum(quantities.values()),
+            'gross_sales': cart['subtotal'],
+            'discount': cart.get('discount_amount', 0),
+            'tax': cart.get('tax_amount', 0),
+            'total_sales': final_amount,
+            'cost': cost
+        })
+        
+        return {
+            'transaction_id': transaction_id,
+            'transaction_code': transaction_code,
+            'change_amount': change_amount,
+            'created_at': created_at
+        }
+    
+    def void_transaction(self, transaction_id: int, voided_by: int, reason: str,
+                         approver: Dict = None) -> Dict:
+        """
+        Void a completed transaction: restore stock, log the movement, record
+        the void and subtract the sale from the rollups, all in one transaction.
+        A supervisor who approved the void is recorded with the reason.
+        """
+        if approver is not None:
+            reason = f"{reason} (disetujui: {approver['username']})"
+        with self.transaction() as conn:
+            trans = conn.execute('''
+                SELECT id, transaction_code, user_id, total_amount, discount_amount,
+                       tax_amount, final_amount, status, created_at
+                FROM transactions WHERE id = ?
+            ''', (transaction_id,)).fetchone()
+            if trans is None:
+                raise ValueError(f"Transaksi {transaction_id} tidak ditemukan")
+            if trans['status'] != 'completed':
+                raise ValueError(f"Transaksi {trans['transaction_code']} sudah dibatalkan")
+            
+            # Biaya dikurangi dengan harga beli yang dicatat saat penjualan
+            rows = conn.execute('''
+                SELECT d.product_id, SUM(d.quantity), p.stock,
+                       SUM(d.quantity * IFNULL(d.unit_cost, p.purchase_price))
+                FROM transaction_details d
+                LEFT JOIN products p ON p.id = d.product_id
+                WHERE d.transaction_id = ?
+                GROUP BY d.product_id
+            ''', (transaction_id,)).fetchall()
+            
+            now = local_timestamp()
+            conn.execute("DELETE FROM temp.sale_lines")
+            conn.executemany("INSERT INTO temp.sale_lines (product_id, quantity) VALUES (?, ?)",
+                             [(pid, qty) for pid, qty, _, _ in rows])
+            conn.execute('''
+                UPDATE products
+                SET stock = stock + (SELECT quantity FROM temp.sale_lines
+                                     WHERE product_id = products.id),
+                    updated_at = ?
+                WHERE id IN (SELECT product_id FROM temp.sale_lines)
+            ''', (now,))
+            conn.executemany('''
+                INSERT INTO inventory_logs (product_id, user_id, action, quantity_change,
+                                            previous_stock, new_stock, notes, created_at)
+                VALUES (?, ?, 'void', ?, ?, ?, ?, ?)
+            ''', [(pid, voided_by, qty, stock, stock + qty, trans['transaction_code'], now)
+                  for pid, qty, stock, _ in rows if stock is not None])
+            
+            conn.execute("UPDATE transactions SET status = 'voided' WHERE id = ?",
+                         (transaction_id,))
+            conn.execute('''
+                INSERT INTO void_transactions (original_transaction_id, voided_by, reason, created_at)
                 VALUES (?, ?, ?, ?)
-            ''', ('admin', admin_hash, 'Administrator', 'admin'))
+            ''', (transaction_id, voided_by, reason, now))
+            
+            # Rollup dikoreksi pada hari/jam penjualan aslinya
+            apply_delta(conn, trans['created_at'], trans['user_id'], {
+                'transaction_count': -1,
+                'items_sold': -sum(qty for _, qty, _, _ in rows),
+                'gross_sales': -trans['total_amount'],
+                'discount': -trans['discount_amount'],
+                'tax': -trans['tax_amount'],
+                'total_sales': -trans['final_amount'],
+                'cost': -sum(cost or 0 for _, _, _, cost in rows),
+                'void_count': 1
+            })
         
-        conn.commit()
-        conn.close()
+        self._notify_products([pid for pid, _, _, _ in rows])
+        return {'transaction_id': transaction_id,
+                'transaction_code': trans['transaction_code']}
     
-    def authenticate_user(self, username: str, password: str) -> Optional[Dict]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def rebuild_rollups(self) -> int:
+        """Backfill sales_hourly/sales_daily from history; returns the number of days"""
+        with self.transaction() as conn:
+            rebuild_rollups(conn)
+            return conn.execute("SELECT COUNT(DISTINCT day) FROM sales_daily").fetchone()[0]
+    
+    def get_sales_summary(self, date_from: str, date_to: str, user_id: int = None) -> Dict:
+        """Aggregate the daily rollups between two 'YYYY-MM-DD' dates (inclusive)"""
+        query = '''
+            SELECT IFNULL(SUM(transaction_count), 0), IFNULL(SUM(items_sold), 0),
+                   IFNULL(SUM(gross_sales), 0), IFNULL(SUM(discount), 0),
+                   IFNULL(SUM(tax), 0), IFNULL(SUM(total_sales), 0),
+                   IFNULL(SUM(cost), 0), IFNULL(SUM(void_count), 0)
+            FROM sales_daily
+            WHERE day BETWEEN ? AND ?
+        '''
+        params = [date_from, date_to]
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params.append(user_id)
         
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
-        cursor.execute('''
-            SELECT * FROM users 
-            WHERE username = ? AND password_hash = ? AND is_active = 1
-        ''', (username, password_hash))
+        with self.read() as conn:
+            row = conn.execute(query, params).fetchone()
         
-        user = cursor.fetchone()
-        conn.close()
+        summary = dict(zip(('transaction_count', 'items_sold', 'gross_sales', 'discount',
+                            'tax', 'total_sales', 'cost', 'void_count'), row))
+        # Profit = penjualan bersih sebelum pajak dikurangi harga pokok
+        summary['profit'] = summary['gross_sales'] - summary['discount'] - summary['cost']
+        return summary
+    
+    def get_today_stats(self) -> Dict:
+        """Dashboard cards: today's sales from the rollups plus low-stock count"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        summary = self.get_sales_summary(today, today)
         
-        return dict(user) if user else None
+        # Counter dijaga trigger (migrasi 4), tanpa scan tabel products
+        with self.read() as conn:
+            row = conn.execute(
+                "SELECT value FROM stock_counters WHERE name = 'low_stock'").fetchone()
+        low_stock = row[0] if row else 0
+        
+        count = summary['transaction_count']
+        return {
+            'total_sales': summary['total_sales'],
+            'transaction_count': count,
+            'items_sold': summary['items_sold'],
+            'avg_transaction': summary['total_sales'] / count if count else 0,
+            'low_stock': low_stock,
+            'profit': summary['profit']
+        }
+    
+    def get_sales_series(self, days: int = 7) -> List[Tuple[str, float, int]]:
+        """(day, total_sales, transaction_count) for the last `days` days, oldest first"""
+        today = datetime.now().date()
+        start = (today - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        
+        with self.read() as conn:
+            rows = conn.execute('''
+                SELECT day, SUM(total_sales), SUM(transaction_count)
+                FROM sales_daily
+                WHERE day >= ?
+                GROUP BY day
+            ''', (start,)).fetchall()
+        
+        by_day = {day: (total, count) for day, total, count in rows}
+        series = []
+        for offset in range(days - 1, -1, -1):
+            day = (today - timedelta(days=offset)).strftime('%Y-%m-%d')
+            total, count = by_day.get(day, (0, 0))
+            series.append((day, total, count))
+        return series
+    
+    def _transaction_filters(self, code_prefix=None, date_from=None, date_to=None,
+                             user_id=None):
+        """WHERE clauses + params shared by the transaction search queries"""
+        clauses, params = [], []
+        if code_prefix:
+            # Range pada index UNIQUE transaction_code, bukan LIKE
+            clauses.append("t.transaction_code >= ? AND t.transaction_code < ?")
+            params += [code_prefix, code_prefix[:-1] + chr(ord(code_prefix[-1]) + 1)]
+        if date_from:
+            clauses.append("t.created_at >= ?")
+            params.append(date_from)
+        if date_to:
+            # date_to inklusif sampai akhir hari
+            clauses.append("t.created_at < date(?, '+1 day')")
+            params.append(date_to)
+        if user_id is not None:
+            clauses.append("t.user_id = ?")
+            params.append(user_id)
+        return clauses, params
+    
+    def search_transactions(self, code_prefix=None, date_from=None, date_to=None,
+                            user_id=None, after=None, limit=100) -> List[Dict]:
+        """
+        Newest-first page of transactions using keyset pagination.
+        `after` is the (created_at, id) of the last row of the previous page;
+        each page costs O(limit) regardless of how deep the user has scrolled.
+        """
+        clauses, params = self._transaction_filters(code_prefix, date_from, date_to, user_id)
+        if after is not None:
+            clauses.append("(t.created_at, t.id) < (?, ?)")
+            params += list(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        with self.read() as conn:
+            rows = conn.execute(f'''
+                SELECT t.id, t.transaction_code, t.created_at, t.final_amount,
+                       t.status, t.user_id, u.full_name AS cashier
+                FROM transactions t
+                LEFT JOIN users u ON u.id = t.user_id
+                {where}
+                ORDER BY t.created_at DESC, t.id DESC
+                LIMIT ?
+            ''', params + [limit]).fetchall()
+        return [dict(row) for row in rows]
+    
+    def count_transactions(self, code_prefix=None, date_from=None, date_to=None,
+                           user_id=None) -> int:
+        clauses, params = self._transaction_filters(code_prefix, date_from, date_to, user_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.read() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM transactions t {where}",
+                                params).fetchone()[0]
+    
+    def transaction_cursor_at(self, offset, code_prefix=None, date_from=None,
+                              date_to=None, user_id=None):
+        """
+        (created_at, id) of the row at `offset` in newest-first order.
+        Uses OFFSET, so it is only meant for jumping far (e.g. dragging the
+        scrollbar); normal scrolling continues with keyset pages from there.
+        """
+        clauses, params = self._transaction_filters(code_prefix, date_from, date_to, user_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.read() as conn:
+            row = conn.execute(f'''
+                SELECT t.created_at, t.id FROM transactions t
+                {where}
+                ORDER BY t.created_at DESC, t.id DESC
+                LIMIT 1 OFFSET ?
+            ''', params + [offset]).fetchone()
+        return tuple(row) if row else None
+    
+    def get_users(self, active_only=True) -> List[Dict]:
+        query = "SELECT id, username, full_name, role FROM users"
+        if active_only:
+            query += " WHERE is_active = 1"
+        with self.read() as conn:
+            return [dict(row) for row in conn.execute(query + " ORDER BY full_name")]
+    
+    def get_promotions(self, active_only=True) -> List[Dict]:
+        """Promotion rule definitions in the format PromotionEngine expects"""
+        query = '''
+            SELECT name, promo_type, products, categories, params, start_date, end_date
+            FROM promotions
+        '''
+        if active_only:
+            query += " WHERE is_active = 1"
+        with self.read() as conn:
+            rows = conn.execute(query + " ORDER BY id").fetchall()
+        
+        definitions = []
+        for row in rows:
+            definition = json.loads(row['params'] or '{}')
+            definition.update({
+                'name': row['name'],
+                'type': row['promo_type'],
+                'products': [c.strip() for c in (row['products'] or '').split(',') if c.strip()],
+                'categories': [c.strip() for c in (row['categories'] or '').split(',') if c.strip()],
+                'start': row['start_date'],
+                'end': row['end_date']
+            })
+            definitions.append(definition)
+        return definitions
+    
+    # Kolom produk yang boleh diubah lewat update_product
+    PRODUCT_FIELDS = ('code', 'name', 'category', 'purchase_price', 'selling_price',
+                      'stock', 'min_stock', 'barcode_data', 'qr_code_path')
+    
+    def add_product_listener(self, callback):
+        """Register callback(product_ids) invoked after product rows are committed"""
+        self._product_listeners.append(callback)
+    
+    def remove_product_listener(self, callback):
+        if callback in self._product_listeners:
+            self._product_listeners.remove(callback)
+    
+    def _notify_products(self, product_ids):
+        product_ids = list(product_ids)
+        for callback in list(self._product_listeners):
+            try:
+                callback(product_ids)
+            except Exception:
+                # Data sudah di-commit; listener yang gagal tidak boleh membatalkan operasi
+                logger.exception("Product listener gagal")
+    
+    def get_low_stock(self) -> List[Dict]:
+        """Products at or below min_stock, from the trigger-maintained low_stock table"""
+        with self.read() as conn:
+            rows = conn.execute('''
+                SELECT p.id, p.code, p.name, p.category, l.stock, l.min_stock, l.since
+                FROM low_stock l
+                JOIN products p ON p.id = l.product_id
+                ORDER BY l.stock - l.min_stock, p.name
+            ''').fetchall()
+        return [dict(row) for row in rows]
+    
+    def get_change_sequence(self) -> int:
+        """Latest product change sequence number (0 if none yet)"""
+        with self.read() as conn:
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'product_changes'").fetchone()
+        return row[0] if row else 0
+    
+    def get_product_changes(self, after_seq: int, limit: int = 1000) -> Dict:
+        """
+        Product ids changed after `after_seq`: {'seq', 'product_ids', 'more',
+        'reset'}. Pass the returned seq back as the next cursor. reset=True
+        means the cursor is older than the pruned log and the caller must
+        reload everything.
+        """
+        with self.read() as conn:
+            oldest = conn.execute("SELECT MIN(seq) FROM product_changes").fetchone()[0]
+            if oldest is not None and after_seq < oldest - 1:
+                latest = conn.execute("SELECT MAX(seq) FROM product_changes").fetchone()[0]
+                return {'seq': latest, 'product_ids': [], 'more': False, 'reset': True}
+            rows = conn.execute('''
+                SELECT seq, product_id FROM product_changes
+                WHERE seq > ?
+                ORDER BY seq
+                LIMIT ?
+            ''', (after_seq, limit)).fetchall()
+        
+        return {
+            'seq': rows[-1][0] if rows else after_seq,
+            'product_ids': sorted({row[1] for row in rows}),
+            'more': len(rows) == limit,
+            'reset': False
+        }
+    
+    def prune_product_changes(self, keep: int = 100_000) -> int:
+        """Drop all but the newest `keep` change rows; returns rows deleted"""
+        with self.transaction() as conn:
+            return conn.execute('''
+                DELETE FROM product_changes
+                WHERE seq <= (SELECT MAX(seq) FROM product_changes) - ?
+            ''', (max(int(keep), 1),)).rowcount
+    
+    def get_product(self, product_id: int) -> Optional[Dict]:
+        with self.read() as conn:
+            row = conn.execute("SELECT * FROM products WHERE id = ?", (product_id,)).fetchone()
+        return dict(row) if row else None
+    
+    def get_product_rows(self, columns, product_ids=None) -> List[Tuple]:
+        """Product rows as tuples of `columns`; all products, or only product_ids"""
+        allowed = ('id',) + self.PRODUCT_FIELDS
+        if any(column not in allowed for column in columns):
+            raise ValueError(f"Kolom produk tidak dikenal: {columns}")
+        select = f"SELECT {', '.join(columns)} FROM products"
+        
+        with self.read() as conn:
+            if product_ids is None:
+                return [tuple(row) for row in conn.execute(select)]
+            rows = []
+            product_ids = list(product_ids)
+            # Batasi jumlah parameter per query (SQLITE_MAX_VARIABLE_NUMBER)
+            for start in range(0, len(product_ids), 500):
+                chunk = product_ids[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows.extend(tuple(row) for row in conn.execute(
+                    f"{select} WHERE id IN ({placeholders})", chunk))
+            return rows
+    
+    def add_product(self, product: Dict) -> int:
+        """Insert a product and return its id"""
+        fields = [f for f in self.PRODUCT_FIELDS if f in product]
+        placeholders = ", ".join("?" for _ in fields)
+        now = local_timestamp()
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO products ({', '.join(fields)}, created_at, updated_at) "
+                f"VALUES ({placeholders}, ?, ?)",
+                [product[f] for f in fields] + [now, now])
+            product_id = cursor.lastrowid
+        
+        self._notify_products([product_id])
+        return product_id
+    
+    def update_product(self, product_id: int, changes: Dict):
+        """Update whitelisted product columns"""
+        fields = [f for f in self.PRODUCT_FIELDS if f in changes]
+        if not fields:
+            return
+        assignments = ", ".join(f"{f} = ?" for f in fields)
+        with self.transaction() as conn:
+            conn.execute(
+                f"UPDATE products SET {assignments}, updated_at = ? WHERE id = ?",
+                [changes[f] for f in fields] + [local_timestamp(), product_id])
+        
+        self._notify_products([product_id])
+    
+    def update_qr_code_paths(self, pairs):
+        """Bulk-set products.qr_code_path from (path, product_id) pairs"""
+        pairs = list(pairs)
+        with self.transaction() as conn:
+            conn.executemany("UPDATE products SET qr_code_path = ? WHERE id = ?", pairs)
+        
+        self._notify_products([product_id for _, product_id in pairs])
+    
+    def adjust_stock(self, product_id: int, quantity_change: int, user_id: int,
+                     action: str = 'adjustment', notes: str = None) -> int:
+        """Change a product's stock and log the movement; returns the new stock"""
+        with self.transaction() as conn:
+            row = conn.execute("SELECT stock FROM products WHERE id = ?", (product_id,)).fetchone()
+            if row is None:
+                raise ValueError(f"Produk {product_id} tidak ditemukan")
+            previous_stock = row[0]
+            new_stock = previous_stock + quantity_change
+            if new_stock < 0:
+                raise InsufficientStockError([(product_id, -quantity_change, previous_stock)])
+            
+            now = local_timestamp()
+            conn.execute("UPDATE products SET stock = ?, updated_at = ? WHERE id = ?",
+                         (new_stock, now, product_id))
+            conn.execute('''
+                INSERT INTO inventory_logs (product_id, user_id, action, quantity_change,
+                                            previous_stock, new_stock, notes, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (product_id, user_id, action, quantity_change, previous_stock,
+                  new_stock, notes, now))
+        
+        self._notify_products([product_id])
+        return new_stock
     
     # ... tambahkan method lainnya untuk CRUD operations
\ No newline at end of file
@@ -0,0 +1,361 @@
+# journal.py
+"""
+Journal penjualan append-only. Penjualan ditulis ke file lokal (dengan
+fsync berkelompok) sebelum kasir mencetak struk; applier di background
+memasukkannya ke tabel transactions. Setelah crash, isi journal yang belum
+masuk SQLite diputar ulang saat startup. Penjualan yang gagal diterapkan
+dipindah ke file dead-letter (<journal>.failed) sebelum journal dipadatkan,
+jadi tidak ada penjualan yang sudah dibayar yang hilang.
+
+Format record: [panjang u32][crc32 u32][JSON utf-8], little-endian.
+"""
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+
+from database.database import Database
+
+logger = logging.getLogger(__name__)
+
+HEADER = struct.Struct('<II')
+# Batas wajar satu record; panjang lebih besar berarti header rusak
+MAX_RECORD_BYTES = 16 * 1024 * 1024
+
+
+def encode_record(payload):
+    """Length-prefixed, checksummed bytes for one JSON payload"""
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return HEADER.pack(len(body), zlib.crc32(body)) + body
+
+
+def iter_records(data, offset=0):
+    """
+    Yield (payload, end_offset) for each intact record in `data` starting
+    at `offset`. Stops at the first short or corrupt record (torn tail).
+    """
+    while offset + HEADER.size <= len(data):
+        length, crc = HEADER.unpack_from(data, offset)
+        start = offset + HEADER.size
+        end = start + length
+        if length > MAX_RECORD_BYTES or end > len(data):
+            return
+        body = bytes(data[start:end])
+        if zlib.crc32(body) != crc:
+            return
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return
+        offset = end
+        yield payload, offset
+
+
+class SaleJournal:
+    """
+    Append-only journal file. append() returns once the record is fsynced.
+    Appends from several threads share fsyncs: whichever thread gets the
+    sync lock first waits `fsync_window_ms` (0: no wait, the group is what
+    was written during the previous fsync), then one fsync covers every
+    record written by then, so the other threads return without their own.
+    """
+    
+    def __init__(self, path, fsync_window_ms=0):
+        self.path = path
+        self.fsync_window = fsync_window_ms / 1000
+        self._write_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        
+        created = not os.path.exists(path)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0),
+                           0o644)
+        if created:
+            self._sync_directory()
+        self._written = self.recover()
+        self._synced = self._written
+        self.fsyncs = 0
+    
+    def _sync_directory(self):
+        # Entri file baru juga harus tahan mati listrik (POSIX)
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    
+    def read_all(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+    
+    def recover(self):
+        """Cut a torn or corrupt tail off the file; return the valid length"""
+        with self._write_lock:
+            data = self.read_all()
+            valid = 0
+            for _, end in iter_records(data):
+                valid = end
+            if valid < len(data):
+                logger.warning("Journal %s: %d byte rusak di akhir file dibuang",
+                               self.path, len(data) - valid)
+                os.ftruncate(self._fd, valid)
+                os.fsync(self._fd)
+            return valid
+    
+    def append(self, payload):
+        """Write one record and wait until it is durable; returns its end offset"""
+        record = encode_record(payload)
+        with self._write_lock:
+            os.write(self._fd, record)
+            self._written += len(record)
+            end = self._written
+        self._sync(end)
+        return end
+    
+    def _sync(self, end):
+        with self._sync_lock:
+            if self._synced >= end:
+                return
+            if self.fsync_window:
+                # Beri thread lain kesempatan menulis sebelum fsync bersama
+                time.sleep(self.fsync_window)
+            with self._write_lock:
+                target = self._written
+            os.fsync(self._fd)
+            self.fsyncs += 1
+            self._synced = target
+    
+    @property
+    def synced(self):
+        """Offset up to which the journal is known to be on disk"""
+        return self._synced
+    
+    def records(self, offset=0, limit=None):
+        """[(payload, end_offset)] of durable records after `offset`"""
+        synced = self._synced
+        if offset >= synced:
+            return []
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(synced - offset)
+        found = []
+        for payload, end in iter_records(data):
+            found.append((payload, offset + end))
+            if limit and len(found) >= limit:
+                break
+        return found
+    
+    def reset(self, expected_end):
+        """
+        Empty the journal if nothing was written past `expected_end` (the
+        offset the caller has applied). Returns False if new records arrived.
+        """
+        # Urutan lock sama dengan _sync: sync lalu write
+        with self._sync_lock, self._write_lock:
+            if self._written != expected_end:
+                return False
+            os.ftruncate(self._fd, 0)
+            os.fsync(self._fd)
+            self._written = self._synced = 0
+            return True
+    
+    def close(self):
+        with self._write_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+class JournalApplier:
+    """
+    Replays journal records into the normalized tables with
+    Database.record_sales in batches. Replay is idempotent: a sale whose
+    transaction_code is already stored is skipped, so records applied just
+    before a crash are safe to apply again. Sales already happened at the
+    till, so stock is allowed to go negative instead of rejecting them.
+    """
+    
+    def __init__(self, db, journal, batch_size=256, interval_ms=50, dead_letter=None,
+                 after_apply=None):
+        self.db = db
+        self.journal = journal
+        self.batch_size = batch_size
+        self.interval = interval_ms / 1000
+        # SaleJournal untuk record yang gagal; tanpa dead-letter, applier
+        # berhenti di record gagal pertama dan mencobanya lagi
+        self.dead_letter = dead_letter
+        # Dipanggil thread applier setelah setiap putaran (mis. compact)
+        self.after_apply = after_apply
+        self.offset = 0
+        self.applied = 0
+        self.skipped = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def apply_pending(self):
+        """
+        Apply every durable record past the current offset; returns how many
+        were new. A record that fails is written (and fsynced) to the
+        dead-letter journal before the offset moves past it; without a
+        dead-letter journal the offset stops at that record.
+        """
+        applied = 0
+        with self.lock:
+            blocked = False
+            while not blocked:
+                batch = self.journal.records(self.offset, self.batch_size)
+                if not batch:
+                    break
+                sales = [(record['cart'], record['payment']) for record, _ in batch]
+                results = self.db.record_sales(sales, allow_oversell=True, skip_existing=True)
+                offset = self.offset
+                for (record, end), result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        code = record['cart'].get('transaction_code')
+                        if self.dead_letter is None:
+                            # Offset tetap di record ini; yang sesudahnya diterapkan
+                            # ulang nanti dan dilewati karena transaction_code sudah ada
+                            logger.error("Penjualan %s dari journal gagal diterapkan, "
+                                         "dicoba lagi: %s", code, result)
+                            blocked = True
+                            break
+                        self.dead_letter.append(dict(record, error=str(result),
+                                                     failed_at=datetime.now().strftime(
+                                                         '%Y-%m-%d %H:%M:%S')))
+                        self.failed += 1
+                        logger.error("Penjualan %s dari journal gagal diterapkan, dipindah ke "
+                                     "%s: %s", code, self.dead_letter.path, result)
+                    elif result is None:
+                        self.skipped += 1
+                    else:
+                        applied += 1
+                    offset = end
+                self.offset = offset
+        self.applied += applied
+        return applied
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.apply_pending()
+                if self.after_apply:
+                    self.after_apply()
+            except Exception:
+                logger.exception("Applier journal gagal; dicoba lagi")
+    
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="journal-applier", daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+
+class JournaledSales:
+    """
+    record_sale() front end that writes to the journal instead of SQLite.
+    The checkout waits only for the grouped journal fsync; the applier
+    thread writes the sale to the database shortly after. On startup any
+    sale left in the journal by a crash is applied before new sales are
+    taken, and the journal is emptied once SQLite has checkpointed it: at
+    open and close, and by the applier whenever the applied part of the
+    journal has grown past `compact_bytes`.
+    
+    Stock is not checked here: the caller checks it against the catalog
+    before taking payment, as a sale that was paid for is always recorded.
+    """
+    
+    def __init__(self, db, path="sales.journal", fsync_window_ms=0, batch_size=256,
+                 interval_ms=50, autostart=True, compact_bytes=4 * 1024 * 1024):
+        self.db = db
+        self.compact_bytes = compact_bytes
+        self.journal = SaleJournal(path, fsync_window_ms)
+        self.dead_letter = SaleJournal(path + ".failed")
+        if self.dead_letter.synced:
+            logger.warning("Ada penjualan gagal di %s yang perlu diperiksa", self.dead_letter.path)
+        self.applier = JournalApplier(db, self.journal, batch_size, interval_ms,
+                                      self.dead_letter, self._maybe_compact)
+        self.recovered = self.recover()
+        if autostart:
+            self.applier.start()
+    
+    def recover(self):
+        """Apply everything left in the journal, then empty it; returns sales applied"""
+        applied = self.applier.apply_pending()
+        if applied or self.applier.skipped:
+            logger.info("Journal dipulihkan: %d penjualan diterapkan, %d sudah ada",
+                        applied, self.applier.skipped)
+        self.compact()
+        return applied
+    
+    def compact(self):
+        """Empty the journal if every record is applied and durable in SQLite"""
+        with self.applier.lock:
+            offset = self.applier.offset
+            if offset != self.journal.synced or not self.db.pool.checkpoint():
+                return False
+            if not self.journal.reset(offset):
+                return False
+            self.applier.offset = 0
+            return True
+    
+    def _maybe_compact(self):
+        # Dicoba setiap putaran applier setelah ambang terlewati; berhasil begitu
+        # semua record sudah diterapkan (jeda antar penjualan di kasir)
+        if self.applier.offset >= self.compact_bytes:
+            self.compact()
+    
+    def record_sale(self, cart, payment):
+        """
+        Journal a sale and return once it is durable. transaction_id is None
+        until the applier has written the sale to the database.
+        """
+        if not cart['items']:
+            raise ValueError("Keranjang kosong")
+        
+        now = datetime.now()
+        cart = dict(cart)
+        cart.setdefault('created_at', now.strftime('%Y-%m-%d %H:%M:%S'))
+        if not cart.get('transaction_code'):
+            cart['transaction_code'] = Database.generate_transaction_code(now)
+        
+        cash_paid = payment.get('cash_paid')
+        self.journal.append({'cart': cart, 'payment': payment})
+        return {
+            'transaction_id': None,
+            'transaction_code': cart['transaction_code'],
+            'change_amount': cash_paid - cart['final_amount'] if cash_paid is not None else None,
+            'created_at': cart['created_at']
+        }
+    
+    def flush(self):
+        """Apply every journaled sale now"""
+        return self.applier.apply_pending()
+    
+    def close(self):
+        self.applier.stop()
+        self.applier.apply_pending()
+        self.compact()
+        self.journal.close()
+        self.dead_letter.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
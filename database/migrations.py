@@ -0,0 +1,267 @@
+# migrations.py
+"""
+Migrasi skema berversi. Versi disimpan di PRAGMA user_version; setiap
+langkah dijalankan sekali, berurutan, dalam satu transaksi per langkah.
+"""
+from database.rollups import rebuild_rollups
+
+# Setiap entri: (versi, deskripsi, daftar langkah). Langkah berupa statement
+# SQL atau callable(conn) untuk backfill data
+MIGRATIONS = [
+    (1, "Index untuk query dashboard, detail transaksi, inventory dan void", [
+        # Statistik harian dan grafik 7 hari; juga dipakai untuk urutan (created_at, id)
+        "CREATE INDEX IF NOT EXISTS idx_transactions_created_at "
+        "ON transactions(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_user_created "
+        "ON transactions(user_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_transaction_details_transaction "
+        "ON transaction_details(transaction_id)",
+        "CREATE INDEX IF NOT EXISTS idx_transaction_details_product "
+        "ON transaction_details(product_id)",
+        "CREATE INDEX IF NOT EXISTS idx_inventory_logs_product_created "
+        "ON inventory_logs(product_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_inventory_logs_created_at "
+        "ON inventory_logs(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_void_transactions_original "
+        "ON void_transactions(original_transaction_id)",
+        # Partial index: hanya produk dengan stok rendah yang masuk index
+        "CREATE INDEX IF NOT EXISTS idx_products_low_stock "
+        "ON products(stock, min_stock) WHERE stock <= min_stock",
+        "CREATE INDEX IF NOT EXISTS idx_products_barcode "
+        "ON products(barcode_data) WHERE barcode_data IS NOT NULL",
+        "CREATE INDEX IF NOT EXISTS idx_products_category "
+        "ON products(category) WHERE category IS NOT NULL",
+    ]),
+    (2, "Tabel rollup penjualan per hari/jam/kasir", [
+        '''
+        CREATE TABLE IF NOT EXISTS sales_hourly (
+            day TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            transaction_count INTEGER NOT NULL DEFAULT 0,
+            items_sold INTEGER NOT NULL DEFAULT 0,
+            gross_sales REAL NOT NULL DEFAULT 0,
+            discount REAL NOT NULL DEFAULT 0,
+            tax REAL NOT NULL DEFAULT 0,
+            total_sales REAL NOT NULL DEFAULT 0,
+            cost REAL NOT NULL DEFAULT 0,
+            void_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, hour, user_id)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS sales_daily (
+            day TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            transaction_count INTEGER NOT NULL DEFAULT 0,
+            items_sold INTEGER NOT NULL DEFAULT 0,
+            gross_sales REAL NOT NULL DEFAULT 0,
+            discount REAL NOT NULL DEFAULT 0,
+            tax REAL NOT NULL DEFAULT 0,
+            total_sales REAL NOT NULL DEFAULT 0,
+            cost REAL NOT NULL DEFAULT 0,
+            void_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, user_id)
+        ) WITHOUT ROWID
+        ''',
+        # Isi rollup dari riwayat transaksi yang sudah ada
+        rebuild_rollups,
+    ]),
+    (3, "Tabel promosi per produk/kategori", [
+        # products/categories: daftar dipisah koma; params: JSON sesuai jenis promo
+        '''
+        CREATE TABLE IF NOT EXISTS promotions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            promo_type TEXT NOT NULL,
+            products TEXT,
+            categories TEXT,
+            params TEXT NOT NULL DEFAULT '{}',
+            start_date DATE,
+            end_date DATE,
+            is_active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    (4, "Tabel stok rendah, counter dan log perubahan produk lewat trigger", [
+        '''
+        CREATE TABLE IF NOT EXISTS low_stock (
+            product_id INTEGER PRIMARY KEY,
+            stock INTEGER NOT NULL,
+            min_stock INTEGER NOT NULL,
+            since TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS stock_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        ''',
+        # AUTOINCREMENT: seq tidak pernah dipakai ulang setelah baris lama dihapus,
+        # jadi kursor pelanggan selalu maju
+        '''
+        CREATE TABLE IF NOT EXISTS product_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_id INTEGER NOT NULL,
+            change TEXT NOT NULL,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        # Isi awal sebelum trigger dibuat
+        "INSERT OR IGNORE INTO low_stock (product_id, stock, min_stock) "
+        "SELECT id, stock, min_stock FROM products WHERE stock <= min_stock",
+        "INSERT OR REPLACE INTO stock_counters (name, value) "
+        "SELECT 'low_stock', COUNT(*) FROM low_stock",
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_products_insert AFTER INSERT ON products
+        BEGIN
+            INSERT INTO product_changes (product_id, change) VALUES (NEW.id, 'insert');
+            INSERT INTO low_stock (product_id, stock, min_stock)
+            SELECT NEW.id, NEW.stock, NEW.min_stock WHERE NEW.stock <= NEW.min_stock;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_products_update AFTER UPDATE ON products
+        BEGIN
+            INSERT INTO product_changes (product_id, change) VALUES (NEW.id, 'update');
+            DELETE FROM low_stock
+            WHERE product_id = NEW.id AND NOT IFNULL(NEW.stock <= NEW.min_stock, 0);
+            INSERT INTO low_stock (product_id, stock, min_stock)
+            SELECT NEW.id, NEW.stock, NEW.min_stock WHERE NEW.stock <= NEW.min_stock
+            ON CONFLICT(product_id) DO UPDATE
+            SET stock = excluded.stock, min_stock = excluded.min_stock;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_products_delete AFTER DELETE ON products
+        BEGIN
+            INSERT INTO product_changes (product_id, change) VALUES (OLD.id, 'delete');
+            DELETE FROM low_stock WHERE product_id = OLD.id;
+        END
+        ''',
+        # Counter hanya berubah saat produk masuk/keluar daftar stok rendah
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_low_stock_insert AFTER INSERT ON low_stock
+        BEGIN
+            UPDATE stock_counters SET value = value + 1 WHERE name = 'low_stock';
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_low_stock_delete AFTER DELETE ON low_stock
+        BEGIN
+            UPDATE stock_counters SET value = value - 1 WHERE name = 'low_stock';
+        END
+        ''',
+    ]),
+    (5, "Daftar partisi arsip bulanan", [
+        # Satu baris per bulan yang sudah dipindah ke file arsip (database/archive.py)
+        '''
+        CREATE TABLE IF NOT EXISTS archive_partitions (
+            period TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            transactions INTEGER NOT NULL DEFAULT 0,
+            transaction_details INTEGER NOT NULL DEFAULT 0,
+            void_transactions INTEGER NOT NULL DEFAULT 0,
+            inventory_logs INTEGER NOT NULL DEFAULT 0,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+        ''',
+    ]),
+    (6, "Trigger produk mencatat waktu lokal, sama dengan transaksi", [
+        # Default CURRENT_TIMESTAMP adalah UTC; semua kolom waktu lain ditulis
+        # dengan jam lokal (database.local_timestamp). Baris yang sudah ada
+        # (termasuk isi awal migrasi 4) dikonversi sekali ke jam lokal.
+        "UPDATE low_stock SET since = datetime(since, 'localtime') WHERE since IS NOT NULL",
+        "UPDATE product_changes SET changed_at = datetime(changed_at, 'localtime') "
+        "WHERE changed_at IS NOT NULL",
+        "DROP TRIGGER IF EXISTS trg_products_insert",
+        "DROP TRIGGER IF EXISTS trg_products_update",
+        "DROP TRIGGER IF EXISTS trg_products_delete",
+        '''
+        CREATE TRIGGER trg_products_insert AFTER INSERT ON products
+        BEGIN
+            INSERT INTO product_changes (product_id, change, changed_at)
+            VALUES (NEW.id, 'insert', datetime('now', 'localtime'));
+            INSERT INTO low_stock (product_id, stock, min_stock, since)
+            SELECT NEW.id, NEW.stock, NEW.min_stock, datetime('now', 'localtime')
+            WHERE NEW.stock <= NEW.min_stock;
+        END
+        ''',
+        '''
+        CREATE TRIGGER trg_products_update AFTER UPDATE ON products
+        BEGIN
+            INSERT INTO product_changes (product_id, change, changed_at)
+            VALUES (NEW.id, 'update', datetime('now', 'localtime'));
+            DELETE FROM low_stock
+            WHERE product_id = NEW.id AND NOT IFNULL(NEW.stock <= NEW.min_stock, 0);
+            INSERT INTO low_stock (product_id, stock, min_stock, since)
+            SELECT NEW.id, NEW.stock, NEW.min_stock, datetime('now', 'localtime')
+            WHERE NEW.stock <= NEW.min_stock
+            ON CONFLICT(product_id) DO UPDATE
+            SET stock = excluded.stock, min_stock = excluded.min_stock;
+        END
+        ''',
+        '''
+        CREATE TRIGGER trg_products_delete AFTER DELETE ON products
+        BEGIN
+            INSERT INTO product_changes (product_id, change, changed_at)
+            VALUES (OLD.id, 'delete', datetime('now', 'localtime'));
+            DELETE FROM low_stock WHERE product_id = OLD.id;
+        END
+        ''',
+    ]),
+    (7, "Harga beli per baris detail transaksi", [
+        # Rollup, void dan rebuild memakai harga beli saat penjualan, bukan harga
+        # produk sekarang. Baris lama diisi harga sekarang, sama dengan yang
+        # sudah tercatat di rollup-nya.
+        "ALTER TABLE transaction_details ADD COLUMN unit_cost REAL",
+        '''
+        UPDATE transaction_details
+        SET unit_cost = (SELECT purchase_price FROM products p
+                         WHERE p.id = transaction_details.product_id)
+        ''',
+    ]),
+]
+
+
+def get_version(conn):
+    """Return the schema version stored in PRAGMA user_version"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(pool, migrations=None):
+    """
+    Apply every migration newer than the database's user_version, in order.
+    Runs ANALYZE afterwards so the query planner picks up new indexes.
+    Returns the list of versions applied.
+    """
+    migrations = sorted(migrations or MIGRATIONS, key=lambda m: m[0])
+    
+    with pool.read() as conn:
+        current = get_version(conn)
+    
+    applied = []
+    for version, description, statements in migrations:
+        if version <= current:
+            continue
+        
+        with pool.transaction() as conn:
+            # Cek ulang di dalam transaksi; terminal lain mungkin sudah migrasi
+            if get_version(conn) >= version:
+                continue
+            for statement in statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(statement)
+            # PRAGMA tidak menerima parameter, versi selalu int dari daftar di atas
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+        applied.append(version)
+    
+    if applied:
+        with pool.transaction() as conn:
+            conn.execute("ANALYZE")
+    
+    return applied
@@ -0,0 +1,127 @@
+# rollups.py
+"""
+Rollup penjualan per hari/jam/kasir. Diperbarui dalam transaksi yang sama
+dengan setiap penjualan dan void, sehingga dashboard dan laporan cukup
+membaca O(hari) baris, bukan O(transaksi).
+
+    python -m database.rollups --rebuild --db cashier_system.db
+"""
+import argparse
+
+ROLLUP_COLUMNS = ('transaction_count', 'items_sold', 'gross_sales', 'discount',
+                  'tax', 'total_sales', 'cost', 'void_count')
+
+_ASSIGNMENTS = ", ".join(f"{col} = {col} + excluded.{col}" for col in ROLLUP_COLUMNS)
+_PLACEHOLDERS = ", ".join("?" for _ in ROLLUP_COLUMNS)
+
+UPSERT_HOURLY = f'''
+    INSERT INTO sales_hourly (day, hour, user_id, {', '.join(ROLLUP_COLUMNS)})
+    VALUES (?, ?, ?, {_PLACEHOLDERS})
+    ON CONFLICT (day, hour, user_id) DO UPDATE SET {_ASSIGNMENTS}
+'''
+
+UPSERT_DAILY = f'''
+    INSERT INTO sales_daily (day, user_id, {', '.join(ROLLUP_COLUMNS)})
+    VALUES (?, ?, {_PLACEHOLDERS})
+    ON CONFLICT (day, user_id) DO UPDATE SET {_ASSIGNMENTS}
+'''
+
+# Agregasi ulang dari transaksi mentah; transaksi void hanya menambah void_count.
+# Biaya memakai unit_cost (harga beli saat penjualan, migrasi 7) seperti
+# record_sale; baris tanpa unit_cost memakai harga beli produk sekarang
+UNIT_COST = "IFNULL(td.unit_cost, IFNULL(p.purchase_price, 0))"
+REBUILD_HOURLY = f'''
+    INSERT INTO sales_hourly (day, hour, user_id, {', '.join(ROLLUP_COLUMNS)})
+    SELECT date(t.created_at),
+           CAST(strftime('%H', t.created_at) AS INTEGER),
+           t.user_id,
+           SUM(t.status = 'completed'),
+           SUM(CASE WHEN t.status = 'completed' THEN IFNULL(d.items, 0) ELSE 0 END),
+           SUM(CASE WHEN t.status = 'completed' THEN t.total_amount ELSE 0 END),
+           SUM(CASE WHEN t.status = 'completed' THEN t.discount_amount ELSE 0 END),
+           SUM(CASE WHEN t.status = 'completed' THEN t.tax_amount ELSE 0 END),
+           SUM(CASE WHEN t.status = 'completed' THEN t.final_amount ELSE 0 END),
+           SUM(CASE WHEN t.status = 'completed' THEN IFNULL(d.cost, 0) ELSE 0 END),
+           SUM(t.status = 'voided')
+    FROM transactions t
+    LEFT JOIN (
+        SELECT td.transaction_id,
+               SUM(td.quantity) AS items,
+               SUM(td.quantity * {{cost}}) AS cost
+        FROM transaction_details td
+        LEFT JOIN products p ON p.id = td.product_id
+        GROUP BY td.transaction_id
+    ) d ON d.transaction_id = t.id
+    {{where}}
+    GROUP BY 1, 2, 3
+'''
+
+REBUILD_DAILY = f'''
+    INSERT INTO sales_daily (day, user_id, {', '.join(ROLLUP_COLUMNS)})
+    SELECT day, user_id, {', '.join(f"SUM({col})" for col in ROLLUP_COLUMNS)}
+    FROM sales_hourly
+    {{where}}
+    GROUP BY day, user_id
+'''
+
+# Bulan yang sudah dipindah ke file arsip (migrasi 5): transaksinya tidak ada lagi
+# di tabel aktif, jadi rollup bulan itu dipertahankan, bukan dihitung ulang
+ARCHIVED_MONTHS = "SELECT period FROM archive_partitions"
+
+
+def apply_delta(conn, created_at, user_id, delta):
+    """
+    Add `delta` (a dict keyed by ROLLUP_COLUMNS, missing keys = 0) to the
+    hourly and daily rollup rows of a transaction. created_at is the
+    'YYYY-MM-DD HH:MM:SS' timestamp stored on the transaction.
+    """
+    day = created_at[:10]
+    hour = int(created_at[11:13])
+    values = [delta.get(col, 0) for col in ROLLUP_COLUMNS]
+    conn.execute(UPSERT_HOURLY, [day, hour, user_id] + values)
+    conn.execute(UPSERT_DAILY, [day, user_id] + values)
+
+
+def rebuild_rollups(conn):
+    """
+    Recompute the rollup rows from transactions and transaction_details.
+    Days in archived months are left as they are, since their
+    transactions are no longer in the hot tables.
+    """
+    archived = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' "
+                            "AND name = 'archive_partitions'").fetchone()
+    if archived:
+        keep = f"WHERE substr(day, 1, 7) NOT IN ({ARCHIVED_MONTHS})"
+        keep_hot = f"WHERE substr(t.created_at, 1, 7) NOT IN ({ARCHIVED_MONTHS})"
+    else:
+        # Dipanggil dari migrasi 2, sebelum tabel arsip ada
+        keep = keep_hot = ""
+    # Sebelum migrasi 7 belum ada unit_cost
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(transaction_details)")]
+    cost = UNIT_COST if 'unit_cost' in columns else "IFNULL(p.purchase_price, 0)"
+    conn.execute(f"DELETE FROM sales_hourly {keep}")
+    conn.execute(f"DELETE FROM sales_daily {keep}")
+    conn.execute(REBUILD_HOURLY.format(where=keep_hot, cost=cost))
+    conn.execute(REBUILD_DAILY.format(where=keep))
+
+
+def main():
+    from database.database import Database
+    
+    parser = argparse.ArgumentParser(description="Kelola tabel rollup penjualan")
+    parser.add_argument('--db', default="cashier_system.db")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="hitung ulang rollup dari riwayat transaksi (bulan yang diarsip tetap)")
+    args = parser.parse_args()
+    
+    if not args.rebuild:
+        parser.print_help()
+        return
+    
+    with Database(args.db) as db:
+        days = db.rebuild_rollups()
+    print(f"Rollup dibangun ulang: {days} hari")
+
+
+if __name__ == "__main__":
+    main()
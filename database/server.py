@@ -0,0 +1,591 @@
+# server.py
+"""
+Mode server untuk beberapa terminal kasir pada satu cashier_system.db.
+Satu proses memegang koneksi writer; terminal memakai DatabaseClient.
+Setiap request selain login butuh token sesi dari authenticate_user; user id
+dan hak akses untuk tulisan diambil dari sesi di server, bukan dari klien.
+Sesi berakhir setelah lama tidak dipakai; persetujuan supervisor memakai
+token sekali pakai untuk satu aksi dan nominal, bukan sesi penuh. Total
+penjualan dihitung ulang di server dari harga katalog dan promo aktif.
+Protokolnya teks biasa tanpa enkripsi, jadi default hanya mendengarkan di
+localhost; buka ke LAN (--host 0.0.0.0) hanya di jaringan toko yang tertutup.
+
+    python -m database.server --db cashier_system.db --port 8765
+    python main.py --server 127.0.0.1:8765
+"""
+import argparse
+import asyncio
+import json
+import inspect
+import ipaddress
+import logging
+import secrets
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.permissions import ApprovalRequired, PermissionDenied, get_permission_service
+from core.promotions import PromotionEngine
+from core.transaction import Cart, to_rupiah
+from database.database import Database, InsufficientStockError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Sesi terminal berakhir setelah tidak dipakai selama ini (detik)
+SESSION_IDLE_SECONDS = 2 * 60 * 60
+# Token persetujuan supervisor: sekali pakai, berlaku sebentar
+APPROVAL_TTL_SECONDS = 120
+# Kolom total yang harus sama persis dengan hitungan server
+SALE_TOTALS = ('subtotal', 'discount_amount', 'tax_amount', 'final_amount')
+
+# Method Database yang boleh dipanggil lewat jaringan. Pemeliharaan
+# (rebuild_rollups, prune_product_changes) hanya lewat CLI di mesin server
+WRITE_METHODS = ('void_transaction', 'adjust_stock', 'add_product', 'update_product',
+                 'update_qr_code_paths')
+READ_METHODS = ('get_sales_summary', 'get_today_stats',
+                'get_sales_series', 'search_transactions', 'count_transactions',
+                'transaction_cursor_at', 'get_users', 'get_product', 'get_product_rows',
+                'get_promotions', 'get_low_stock', 'get_change_sequence', 'get_product_changes')
+# Aksi permission yang dicek server per method tulis (void dicek terpisah, per nominal)
+METHOD_ACTIONS = {'adjust_stock': 'manage_inventory', 'add_product': 'manage_inventory',
+                  'update_product': 'manage_inventory', 'update_qr_code_paths': 'manage_inventory'}
+PRICE_FIELDS = ('selling_price', 'purchase_price')
+# Argumen user id yang selalu diisi dari sesi, apa pun yang dikirim klien
+SESSION_USER_ARGS = {'void_transaction': 'voided_by', 'adjust_stock': 'user_id'}
+# Hasil yang aslinya tuple (JSON mengubahnya jadi list)
+TUPLE_RESULTS = {'transaction_cursor_at': 'value', 'get_sales_series': 'items',
+                 'get_product_rows': 'items'}
+
+
+def _error_payload(exc):
+    payload = {'type': type(exc).__name__, 'message': str(exc)}
+    if isinstance(exc, PermissionDenied):
+        payload['action'] = exc.action
+        payload['amount'] = exc.amount
+    if isinstance(exc, InsufficientStockError):
+        payload['shortages'] = exc.shortages
+    return payload
+
+
+def _is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class SalesServer:
+    """
+    Asyncio server that owns the database writer. record_sale calls from
+    all terminals are queued and written in group commits (one transaction,
+    one savepoint per sale) by a single writer thread, so terminals never
+    contend for the SQLite write lock. Other writes run on the same writer
+    thread; reads run on a separate thread pool with their own reader
+    connections, so a long report does not hold up checkouts.
+    
+    Protocol: one JSON object per line, {"id", "method", "args", "kwargs",
+    "token", "approver"} -> {"id", "result"} or {"id", "error": {"type",
+    "message"}}. authenticate_user is the only call without a token; it
+    returns the user with a "session" token, which expires after
+    session_idle seconds without use. Writes are checked against the
+    session user's role (core/permissions.py) on the server, and the
+    acting user id (voided_by, user_id, cart user_id) comes from the
+    session. record_sale totals are recomputed from catalog prices and
+    active promotions, and any mismatch is rejected. "approver" is a token
+    from request_approval: single use, for one action up to one amount,
+    valid for APPROVAL_TTL_SECONDS.
+    """
+    
+    def __init__(self, db_path="cashier_system.db", host=DEFAULT_HOST, port=DEFAULT_PORT,
+                 max_batch=64, batch_window_ms=0, read_workers=4, db=None,
+                 session_idle=SESSION_IDLE_SECONDS, approval_ttl=APPROVAL_TTL_SECONDS):
+        self.db = db or Database(db_path)
+        self.host = host
+        self.port = port
+        self.max_batch = max_batch
+        self.batch_window = batch_window_ms / 1000
+        self._writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._read_executor = ThreadPoolExecutor(max_workers=read_workers,
+                                                 thread_name_prefix="db-reader")
+        self.permissions = get_permission_service()
+        self.session_idle = session_idle
+        self.approval_ttl = approval_ttl
+        self._sessions = {}      # token -> [user, terakhir dipakai (monotonic)]
+        self._approvals = {}     # token -> (approver, aksi, nominal, kedaluwarsa)
+        self._approvals_lock = threading.Lock()   # dipakai juga dari thread writer/reader
+        self._sales = None
+        self._server = None
+        self._batcher = None
+        self.batches = 0
+        self.sales = 0
+    
+    async def start(self):
+        self._sales = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batch_loop())
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        # Port 0: pakai port yang dipilih OS
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Sales server di %s:%s", self.host, self.port)
+        if not _is_loopback(self.host):
+            logger.warning("Sales server terbuka di %s tanpa enkripsi; pastikan jaringan "
+                           "toko tertutup", self.host)
+    
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+    
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+        self._writer_executor.shutdown(wait=True)
+        self._read_executor.shutdown(wait=True)
+    
+    async def _handle_client(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                # Request dari satu terminal boleh dikirim beruntun (pipelining)
+                task = asyncio.create_task(self._respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+    
+    async def _respond(self, line, writer):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            result = await self.dispatch(request['method'], request.get('args') or [],
+                                         request.get('kwargs') or {}, request.get('token'),
+                                         request.get('approver'))
+            response = {'id': request_id, 'result': result}
+        except Exception as e:
+            if not isinstance(e, (ValueError, KeyError, PermissionDenied)):
+                logger.exception("Request gagal")
+            response = {'id': request_id, 'error': _error_payload(e)}
+        writer.write(json.dumps(response, default=str).encode() + b"\n")
+        await writer.drain()
+    
+    async def dispatch(self, method, args, kwargs, token=None, approver=None):
+        loop = asyncio.get_running_loop()
+        if method == 'authenticate_user':
+            return await self._login(args, kwargs)
+        if method == 'logout':
+            self._sessions.pop(token, None)
+            return None
+        user = self._session_user(token)
+        if user is None:
+            raise PermissionDenied("Sesi tidak valid atau kedaluwarsa, silakan login ulang")
+        if method == 'request_approval':
+            return await self._issue_approval(user, args, kwargs)
+        
+        if method == 'record_sale':
+            params = dict(zip(('cart', 'payment'), args), **kwargs)
+            cart = await loop.run_in_executor(
+                self._read_executor, lambda: self._checked_sale(user, params['cart'], approver))
+            future = loop.create_future()
+            await self._sales.put((cart, params['payment'], future))
+            return await future
+        if method in WRITE_METHODS:
+            call = getattr(self.db, method)
+            bound = inspect.signature(call).bind_partial(*args, **kwargs)
+            if method in SESSION_USER_ARGS:
+                bound.arguments[SESSION_USER_ARGS[method]] = user['id']
+            if method == 'void_transaction':
+                return await loop.run_in_executor(
+                    self._writer_executor, lambda: self._void(user, approver, bound.arguments))
+            self._check_write(user, method, bound.arguments)
+            return await loop.run_in_executor(
+                self._writer_executor, lambda: call(*bound.args, **bound.kwargs))
+        if method in READ_METHODS:
+            call = getattr(self.db, method)
+            return await loop.run_in_executor(self._read_executor, lambda: call(*args, **kwargs))
+        raise ValueError(f"Method tidak dikenal: {method}")
+    
+    async def _authenticate(self, args, kwargs):
+        loop = asyncio.get_running_loop()
+        user = await loop.run_in_executor(self._read_executor,
+                                          lambda: self.db.authenticate_user(*args, **kwargs))
+        if user is None:
+            return None
+        return {key: value for key, value in user.items() if key != 'password_hash'}
+    
+    def _expire(self):
+        """Drop idle sessions and stale approvals, so neither dict grows without bound"""
+        now = time.monotonic()
+        for token in [t for t, (_, seen) in self._sessions.items()
+                      if now - seen > self.session_idle]:
+            del self._sessions[token]
+        with self._approvals_lock:
+            for token in [t for t, entry in self._approvals.items() if entry[3] < now]:
+                del self._approvals[token]
+    
+    async def _login(self, args, kwargs):
+        user = await self._authenticate(args, kwargs)
+        if user is None:
+            return None
+        self._expire()
+        token = secrets.token_urlsafe(32)
+        self._sessions[token] = [user, time.monotonic()]
+        return dict(user, session=token)
+    
+    def _session_user(self, token):
+        entry = self._sessions.get(token)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if now - entry[1] > self.session_idle:
+            del self._sessions[token]
+            return None
+        entry[1] = now
+        return entry[0]
+    
+    async def _issue_approval(self, user, args, kwargs):
+        """
+        Supervisor approval for one action up to one amount. The supervisor
+        gets no session; the returned "approval" token works once.
+        """
+        params = dict(zip(('username', 'password', 'action', 'amount'), args), **kwargs)
+        approver = await self._authenticate((params['username'], params['password']), {})
+        if approver is None or approver['id'] == user['id'] \
+                or not self.permissions.can(approver, params['action'], params.get('amount')):
+            return None
+        self._expire()
+        token = secrets.token_urlsafe(32)
+        with self._approvals_lock:
+            self._approvals[token] = (approver, params['action'], params.get('amount'),
+                                      time.monotonic() + self.approval_ttl)
+        return dict(approver, approval=token)
+    
+    def _take_approval(self, token, user, action, amount):
+        """
+        Consume an approval token (None without one). Raises ApprovalRequired
+        if it expired, was already used, or covers another action or amount.
+        """
+        if token is None:
+            return None
+        with self._approvals_lock:
+            entry = self._approvals.pop(token, None)
+        if entry is None or entry[3] < time.monotonic():
+            raise ApprovalRequired("Persetujuan supervisor tidak berlaku lagi", action, amount)
+        approver, approved_action, approved_amount, _ = entry
+        if approver['id'] == user['id'] or approved_action != action \
+                or (amount is not None and (approved_amount is None or amount > approved_amount)):
+            raise ApprovalRequired(f"Persetujuan supervisor bukan untuk {action} ini",
+                                   action, amount)
+        return approver
+    
+    def _checked_sale(self, user, cart, approver_token):
+        """
+        Read pool: rebuild the sale from catalog prices and active promotions,
+        check checkout and discount permissions, and reject totals that do
+        not match. Returns the cart to record.
+        """
+        self.permissions.require(user, 'checkout')
+        items = cart.get('items') or []
+        if not items:
+            raise ValueError("Keranjang kosong")
+        product_ids = [item['product_id'] for item in items]
+        catalog = {row[0]: row for row in self.db.get_product_rows(
+            ('id', 'code', 'name', 'category', 'selling_price'), product_ids)}
+        
+        check = Cart(promotions=PromotionEngine.from_db(self.db))
+        for item in items:
+            row = catalog.get(item['product_id'])
+            if row is None:
+                raise ValueError(f"Produk {item['product_id']} tidak ditemukan")
+            product_id, code, name, category, price = row
+            quantity = item['quantity']
+            if not isinstance(quantity, int) or quantity <= 0:
+                raise ValueError(f"Jumlah produk {code} tidak valid: {quantity}")
+            if item['price'] != to_rupiah(price) or item['subtotal'] != item['price'] * quantity:
+                raise ValueError(f"Harga produk {code} tidak sesuai katalog")
+            check.add({'id': product_id, 'code': code, 'name': name, 'category': category,
+                       'selling_price': price}, quantity)
+        
+        # Diskon manual dari Cart.to_sale; keranjang lain: persentase tersimpan,
+        # atau diskon total dikurangi promo yang dihitung server sebagai nominal
+        manual = cart.get('discount_amount', 0) - check.totals()['promotion_amount']
+        if cart.get('discount'):
+            check.set_discount(cart['discount']['type'], cart['discount']['value'])
+        elif cart.get('discount_percentage'):
+            check.set_discount('percentage', cart['discount_percentage'])
+        elif manual > 0:
+            check.set_discount('fixed', manual)
+        elif manual < 0:
+            raise ValueError("Diskon lebih kecil dari promo yang berlaku")
+        
+        percentage = check.discount_percentage()
+        approver = None
+        if not self.permissions.can(user, 'discount', percentage):
+            approver = self._take_approval(approver_token, user, 'discount', percentage)
+        self.permissions.require(user, 'discount', percentage, approver)
+        
+        totals = check.totals()
+        mismatched = [key for key in SALE_TOTALS if cart.get(key, 0) != totals[key]]
+        if mismatched:
+            raise ValueError(f"Total transaksi tidak cocok dengan hitungan server: "
+                             f"{', '.join(mismatched)}")
+        return dict(cart, user_id=user['id'], **{key: totals[key] for key in SALE_TOTALS})
+    
+    def _check_write(self, user, method, arguments):
+        self.permissions.require(user, METHOD_ACTIONS[method])
+        changes = arguments.get('changes') or {}
+        if method == 'update_product' and any(field in changes for field in PRICE_FIELDS):
+            self.permissions.require(user, 'edit_price')
+    
+    def _void(self, user, approver_token, arguments):
+        """Writer thread: permission check on the stored amount, then the void"""
+        with self.db.read() as conn:
+            row = conn.execute("SELECT final_amount FROM transactions WHERE id = ?",
+                               (arguments['transaction_id'],)).fetchone()
+        if row is None:
+            raise ValueError(f"Transaksi {arguments['transaction_id']} tidak ditemukan")
+        approver = None
+        if not self.permissions.can(user, 'void', row[0]):
+            approver = self._take_approval(approver_token, user, 'void', row[0])
+        self.permissions.require(user, 'void', row[0], approver)
+        return self.db.void_transaction(arguments['transaction_id'], user['id'],
+                                        arguments['reason'], approver)
+    
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._sales.get()]
+            # Tanpa jendela (0), batch berisi penjualan yang antre selama tulisan
+            # sebelumnya berjalan; jendela > 0 menukar latensi dengan batch lebih besar
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                if not self._sales.empty():
+                    batch.append(self._sales.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._sales.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            sales = [(cart, payment) for cart, payment, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._writer_executor,
+                                                     self.db.record_sales, sales)
+            except Exception as e:
+                # Seluruh batch gagal (mis. disk penuh): semua terminal diberi tahu
+                results = [e] * len(batch)
+            self.batches += 1
+            self.sales += len(batch)
+            
+            for (_, _, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+class RemoteError(Exception):
+    """An error raised on the server that has no local equivalent"""
+
+
+class DatabaseClient:
+    """
+    Thin client for SalesServer with the same methods as Database
+    (record_sale, void_transaction, search_transactions, ...). Calls block
+    like the local Database methods; each thread gets its own socket.
+    Product listeners only hear about writes made through this client.
+    """
+    
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=30.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._local = threading.local()
+        self._ids = 0
+        self._lock = threading.Lock()
+        self._sockets = []
+        self._product_listeners = []
+        self._session = None
+    
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn = (sock, sock.makefile('rb'))
+            self._local.conn = conn
+            with self._lock:
+                self._sockets.append(sock)
+        return conn
+    
+    def _drop_connection(self, sock):
+        self._local.conn = None
+        with self._lock:
+            if sock in self._sockets:
+                self._sockets.remove(sock)
+        sock.close()
+    
+    def call(self, method, *args, approver=None, token=None, **kwargs):
+        with self._lock:
+            self._ids += 1
+            request_id = self._ids
+        sock, reader = self._connection()
+        try:
+            sock.sendall(json.dumps({'id': request_id, 'method': method, 'args': args,
+                                     'kwargs': kwargs, 'token': token or self._session,
+                                     'approver': approver}).encode() + b"\n")
+            line = reader.readline()
+            if not line:
+                raise ConnectionError("Koneksi ke sales server terputus")
+            response = json.loads(line)
+            if response.get('id') != request_id:
+                raise ConnectionError(f"Balasan server untuk request {response.get('id')}, "
+                                      f"bukan {request_id}")
+        except Exception:
+            # Balasan yang terlambat (mis. setelah timeout) tidak boleh terbaca
+            # sebagai hasil panggilan berikutnya: buang koneksinya
+            self._drop_connection(sock)
+            raise
+        if 'error' in response:
+            raise self._exception(response['error'])
+        
+        result = response['result']
+        kind = TUPLE_RESULTS.get(method)
+        if kind == 'value' and result is not None:
+            result = tuple(result)
+        elif kind == 'items':
+            result = [tuple(item) for item in result]
+        return result
+    
+    @staticmethod
+    def _exception(error):
+        if error['type'] in ('PermissionDenied', 'ApprovalRequired'):
+            exc_type = ApprovalRequired if error['type'] == 'ApprovalRequired' else PermissionDenied
+            return exc_type(error['message'], error.get('action'), error.get('amount'))
+        if error['type'] == 'InsufficientStockError':
+            return InsufficientStockError([tuple(s) for s in error['shortages']])
+        if error['type'] in ('ValueError', 'IntegrityError'):
+            return ValueError(error['message'])
+        if error['type'] == 'KeyError':
+            return KeyError(error['message'])
+        return RemoteError(f"{error['type']}: {error['message']}")
+    
+    def authenticate_user(self, username, password):
+        """
+        Log in on the server; the session becomes this terminal's. While a
+        session is active, another login only checks the credentials: its
+        session is ended at once (use request_approval for supervisors).
+        """
+        user = self.call('authenticate_user', username, password)
+        if user is None:
+            return None
+        if self._session is None:
+            self._session = user['session']
+            return user
+        token = user.pop('session')
+        self.call('logout', token=token)
+        return user
+    
+    def request_approval(self, username, password, action, amount=None):
+        """
+        Supervisor approval for one action up to `amount`, or None. The
+        returned user carries a single-use "approval" token that expires
+        after APPROVAL_TTL_SECONDS; pass the user as approver.
+        """
+        return self.call('request_approval', username, password, action, amount)
+    
+    def logout(self):
+        if self._session is not None:
+            try:
+                self.call('logout')
+            finally:
+                self._session = None
+    
+    def void_transaction(self, transaction_id, voided_by, reason, approver=None):
+        """The server voids as the session user; approver comes from request_approval"""
+        return self.call('void_transaction', transaction_id, voided_by, reason,
+                         approver=approver['approval'] if approver else None)
+    
+    def record_sale(self, cart, payment, approver=None):
+        """approver (from request_approval) covers a discount that needs approval"""
+        result = self.call('record_sale', cart=cart, payment=payment,
+                           approver=approver['approval'] if approver else None)
+        self._notify_products({item['product_id'] for item in cart['items']})
+        return result
+    
+    def __getattr__(self, name):
+        if name in WRITE_METHODS or name in READ_METHODS:
+            return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+        raise AttributeError(name)
+    
+    # Listener produk: sama seperti Database, tapi hanya untuk tulisan lewat klien ini
+    def add_product_listener(self, callback):
+        self._product_listeners.append(callback)
+    
+    def remove_product_listener(self, callback):
+        if callback in self._product_listeners:
+            self._product_listeners.remove(callback)
+    
+    def _notify_products(self, product_ids):
+        product_ids = list(product_ids)
+        for callback in list(self._product_listeners):
+            try:
+                callback(product_ids)
+            except Exception:
+                logger.exception("Product listener gagal")
+    
+    def close(self):
+        with self._lock:
+            for sock in self._sockets:
+                sock.close()
+            self._sockets.clear()
+        self._local = threading.local()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sales server untuk beberapa terminal kasir")
+    parser.add_argument('--db', default="cashier_system.db")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--batch-window-ms', type=float, default=0)
+    parser.add_argument('--session-idle', type=float, default=SESSION_IDLE_SECONDS,
+                        help="detik tanpa aktivitas sebelum sesi terminal berakhir")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    server = SalesServer(args.db, args.host, args.port, args.max_batch, args.batch_window_ms,
+                         session_idle=args.session_idle)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,33 @@
 #admin_dashboard.py
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, simpledialog, filedialog
+import threading
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from tkinter import font as tkfont
+from core.permissions import APPROVAL, DENIED, PermissionDenied, get_permission_service
+from gui.task_runner import TaskRunner
+from gui.virtual_list import TransactionPageSource, VirtualTreeview
+
+# Interval refresh statistik dashboard (ms)
+REFRESH_INTERVAL_MS = 60_000
+
+# Interval cek nomor urut perubahan produk; kartu statistik dimuat ulang hanya jika berubah (ms)
+CHANGE_POLL_MS = 2_000
+
+# Jeda setelah ketikan terakhir sebelum pencarian dijalankan (ms)
+SEARCH_DEBOUNCE_MS = 300
+
+# Interval update label progres ekspor laporan (ms)
+REPORT_PROGRESS_MS = 250
+
+# Judul laporan -> nama di core.reports.REPORTS
+REPORT_TYPES = {
+    "Penjualan Harian": 'sales',
+    "Laba per Produk": 'profit',
+    "Pergerakan Stok": 'inventory',
+    "Daftar Transaksi": 'transactions',
+}
+REPORT_FORMATS = {"CSV": ".csv", "Excel (XLSX)": ".xlsx", "Parquet": ".parquet"}
 
 class AdminDashboard:
     def __init__(self, root, db, user, logout_callback):
@@ -12,9 +35,38 @@ class AdminDashboard:
         self.db = db
         self.user = user
         self.logout_callback = logout_callback
+        # Aturan role dikompilasi sekali; pemeriksaan tidak membaca file
+        self.permissions = get_permission_service()
+        
+        # Query dan render berat dijalankan di thread pool, bukan di main loop Tk
+        self.tasks = TaskRunner(root)
+        
+        # Nomor urut perubahan produk terakhir yang sudah tampil di kartu statistik
+        self.change_seq = None
         
         self.setup_ui()
-        self.load_dashboard_data()
+        self.schedule_dashboard_refresh()
+    
+    def logout(self):
+        """Cancel background work before handing control back to the login screen"""
+        self.tasks.shutdown()
+        self.logout_callback()
+    
+    def on_tab_changed(self, event=None):
+        """Drop results that belong to tabs the user has left"""
+        selected = self.notebook.select()
+        self.build_tab(selected)
+        
+        current = self.notebook.tab(selected, "text")
+        self.tasks.cancel_other_groups(current)
+        if current == "Dashboard" and not self.tasks.is_scheduled('dashboard_refresh'):
+            self.schedule_dashboard_refresh()
+    
+    def schedule_dashboard_refresh(self):
+        self.tasks.every('dashboard_refresh', REFRESH_INTERVAL_MS,
+                         self.load_dashboard_data, group="Dashboard")
+        self.tasks.every('stock_changes_poll', CHANGE_POLL_MS,
+                         self.poll_product_changes, group="Dashboard")
     
     def setup_ui(self):
         # Clear window
@@ -36,62 +88,164 @@ class AdminDashboard:
         
         # Logout button
         ttk.Button(header_frame, text="Logout", 
-                  command=self.logout_callback).pack(side=tk.RIGHT)
+                  command=self.logout).pack(side=tk.RIGHT)
         
         # Navigation tabs
         self.notebook = ttk.Notebook(self.main_frame)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        # Create tabs
-        self.create_dashboard_tab()
-        self.create_transaction_tab()
-        self.create_inventory_tab()
-        self.create_void_tab()
-        self.create_user_tab()
-        self.create_report_tab()
+        # Tab hanya dibangun saat pertama kali dipilih
+        self.tab_builders = {}
+        for title, builder in [("Dashboard", self.create_dashboard_tab),
+                               ("Transaksi", self.create_transaction_tab),
+                               ("Inventory", self.create_inventory_tab),
+                               ("Void Transaction", self.create_void_tab),
+                               ("User", self.create_user_tab),
+                               ("Laporan", self.create_report_tab)]:
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=title)
+            self.tab_builders[str(frame)] = (frame, builder)
+        
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self.build_tab(self.notebook.select())
+    
+    def build_tab(self, tab_id):
+        """Build a tab's widgets the first time it is shown"""
+        entry = self.tab_builders.pop(str(tab_id), None)
+        if entry is None:
+            return
+        frame, builder = entry
+        builder(frame)
     
-    def create_dashboard_tab(self):
+    def create_dashboard_tab(self, dashboard_frame):
         """Create dashboard with statistics"""
-        dashboard_frame = ttk.Frame(self.notebook)
-        self.notebook.add(dashboard_frame, text="Dashboard")
         
         # Statistics frame
         stats_frame = ttk.LabelFrame(dashboard_frame, text="Statistik Hari Ini")
         stats_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        # Create stats cards
-        stats_data = self.get_today_stats()
-        
         stats_grid = ttk.Frame(stats_frame)
         stats_grid.pack(fill=tk.X, padx=10, pady=10)
         
+        # Kartu dibuat dengan placeholder; nilai diisi setelah query selesai
         metrics = [
-            ("Total Penjualan", f"Rp {stats_data['total_sales']:,.0f}", "#27ae60"),
-            ("Transaksi", str(stats_data['transaction_count']), "#2980b9"),
-            ("Produk Terjual", str(stats_data['items_sold']), "#8e44ad"),
-            ("Rata-rata Transaksi", f"Rp {stats_data['avg_transaction']:,.0f}", "#e67e22"),
-            ("Stock Rendah", str(stats_data['low_stock']), "#e74c3c"),
-            ("Profit", f"Rp {stats_data['profit']:,.0f}", "#16a085")
+            ('total_sales', "Total Penjualan", "#27ae60"),
+            ('transaction_count', "Transaksi", "#2980b9"),
+            ('items_sold', "Produk Terjual", "#8e44ad"),
+            ('avg_transaction', "Rata-rata Transaksi", "#e67e22"),
+            ('low_stock', "Stock Rendah", "#e74c3c"),
+            ('profit', "Profit", "#16a085")
         ]
         
-        for i, (label, value, color) in enumerate(metrics):
+        self.stat_labels = {}
+        for i, (key, label, color) in enumerate(metrics):
             card = ttk.Frame(stats_grid, relief=tk.RAISED, borderwidth=1)
             card.grid(row=i//3, column=i%3, padx=5, pady=5, sticky="nsew")
             
             ttk.Label(card, text=label, font=("Arial", 10)).pack(pady=(10,0))
-            ttk.Label(card, text=value, font=("Arial", 16, "bold"), 
-                     foreground=color).pack(pady=(5,10))
+            value_label = ttk.Label(card, text="Memuat...", font=("Arial", 16, "bold"), 
+                                    foreground=color)
+            value_label.pack(pady=(5,10))
+            self.stat_labels[key] = value_label
         
         # Chart frame
-        chart_frame = ttk.LabelFrame(dashboard_frame, text="Grafik Penjualan 7 Hari")
-        chart_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.chart_frame = ttk.LabelFrame(dashboard_frame, text="Grafik Penjualan 7 Hari")
+        self.chart_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        self.create_sales_chart(chart_frame)
+        self.chart_widget = ttk.Label(self.chart_frame, text="Memuat grafik...")
+        self.chart_widget.pack(fill=tk.BOTH, expand=True)
     
-    def create_void_tab(self):
+    def load_dashboard_data(self):
+        """Fetch stats and chart in the background; widgets update when results arrive"""
+        if not getattr(self, 'stat_labels', None):
+            # Tab dashboard belum dibangun
+            return
+        
+        for label in self.stat_labels.values():
+            if label.cget("text") == "Gagal memuat":
+                label.configure(text="Memuat...")
+        
+        self.tasks.submit('dashboard_stats', self.get_today_stats,
+                          on_success=self.show_today_stats,
+                          on_error=lambda exc: self.show_today_stats(None),
+                          group="Dashboard")
+        self.tasks.submit('dashboard_chart', self.build_sales_chart,
+                          on_success=self.show_sales_chart,
+                          on_error=lambda exc: self.show_sales_chart(None),
+                          group="Dashboard")
+    
+    def poll_product_changes(self):
+        """Cheap cursor check; stats reload only after a sale, void or stock change"""
+        if not getattr(self, 'stat_labels', None):
+            return
+        self.tasks.submit('stock_changes_fetch', self.db.get_change_sequence,
+                          on_success=self.on_change_sequence, group="Dashboard")
+    
+    def on_change_sequence(self, seq):
+        previous, self.change_seq = self.change_seq, seq
+        if previous is None or seq == previous:
+            return
+        self.tasks.submit('dashboard_stats', self.get_today_stats,
+                          on_success=self.show_today_stats,
+                          on_error=lambda exc: self.show_today_stats(None),
+                          group="Dashboard")
+    
+    def get_today_stats(self):
+        """Today's statistics, read from the sales rollup tables"""
+        return self.db.get_today_stats()
+    
+    def show_today_stats(self, stats_data):
+        """Fill the stat cards (Tk thread)"""
+        if stats_data is None:
+            for label in self.stat_labels.values():
+                label.configure(text="Gagal memuat")
+            return
+        
+        values = {
+            'total_sales': f"Rp {stats_data['total_sales']:,.0f}",
+            'transaction_count': str(stats_data['transaction_count']),
+            'items_sold': str(stats_data['items_sold']),
+            'avg_transaction': f"Rp {stats_data['avg_transaction']:,.0f}",
+            'low_stock': str(stats_data['low_stock']),
+            'profit': f"Rp {stats_data['profit']:,.0f}"
+        }
+        for key, value in values.items():
+            self.stat_labels[key].configure(text=value)
+    
+    def build_sales_chart(self):
+        """Query the daily rollups and render the 7-day chart (worker thread)"""
+        # matplotlib hanya di-import saat grafik pertama kali dibutuhkan
+        from matplotlib.figure import Figure
+        from matplotlib.ticker import FuncFormatter
+        
+        series = self.db.get_sales_series(days=7)
+        
+        # Figure OO API (tanpa pyplot) aman dibuat di luar thread Tk
+        fig = Figure(figsize=(8, 3), dpi=100)
+        ax = fig.add_subplot(111)
+        labels = [datetime.strptime(day, '%Y-%m-%d').strftime('%d/%m') for day, _, _ in series]
+        ax.bar(labels, [total for _, total, _ in series], color="#2980b9")
+        ax.set_ylabel("Penjualan (Rp)")
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda v, _: f"{v:,.0f}"))
+        fig.tight_layout()
+        return fig
+    
+    def show_sales_chart(self, fig):
+        """Swap the chart placeholder for the rendered figure (Tk thread)"""
+        self.chart_widget.destroy()
+        if fig is None:
+            self.chart_widget = ttk.Label(self.chart_frame, text="Grafik gagal dimuat")
+            self.chart_widget.pack(fill=tk.BOTH, expand=True)
+            return
+        
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
+        canvas.draw()
+        self.chart_widget = canvas.get_tk_widget()
+        self.chart_widget.pack(fill=tk.BOTH, expand=True)
+    
+    def create_void_tab(self, void_frame):
         """Tab khusus untuk void transaction (admin only)"""
-        void_frame = ttk.Frame(self.notebook)
-        self.notebook.add(void_frame, text="Void Transaction")
         
         # Search frame
         search_frame = ttk.Frame(void_frame)
@@ -101,23 +255,39 @@ class AdminDashboard:
         self.search_entry = ttk.Entry(search_frame, width=30)
         self.search_entry.pack(side=tk.LEFT, padx=5)
         
-        ttk.Button(search_frame, text="Cari", 
-                  command=self.search_transaction).pack(side=tk.LEFT)
+        # Filter tanggal (YYYY-MM-DD) dan kasir, difilter di sisi database
+        ttk.Label(search_frame, text="Dari:").pack(side=tk.LEFT)
+        self.date_from_entry = ttk.Entry(search_frame, width=12)
+        self.date_from_entry.pack(side=tk.LEFT, padx=5)
+        ttk.Label(search_frame, text="Sampai:").pack(side=tk.LEFT)
+        self.date_to_entry = ttk.Entry(search_frame, width=12)
+        self.date_to_entry.pack(side=tk.LEFT, padx=5)
         
-        # Transaction list
-        columns = ("ID", "Kode", "Tanggal", "Total", "Kasir", "Aksi")
-        self.void_tree = ttk.Treeview(void_frame, columns=columns, show="headings", height=15)
+        ttk.Label(search_frame, text="Kasir:").pack(side=tk.LEFT)
+        self.cashiers = {"Semua": None}
+        self.cashiers.update({u['full_name']: u['id'] for u in self.db.get_users(active_only=False)})
+        self.cashier_combo = ttk.Combobox(search_frame, values=list(self.cashiers),
+                                          state="readonly", width=20)
+        self.cashier_combo.set("Semua")
+        self.cashier_combo.pack(side=tk.LEFT, padx=5)
         
-        for col in columns:
-            self.void_tree.heading(col, text=col)
-            self.void_tree.column(col, width=100)
+        ttk.Button(search_frame, text="Cari", 
+                  command=self.search_transaction).pack(side=tk.LEFT)
         
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(void_frame, orient=tk.VERTICAL, command=self.void_tree.yview)
-        self.void_tree.configure(yscrollcommand=scrollbar.set)
+        self._search_after_id = None
+        for entry in (self.search_entry, self.date_from_entry, self.date_to_entry):
+            entry.bind("<KeyRelease>", self.schedule_search)
+        self.cashier_combo.bind("<<ComboboxSelected>>", self.schedule_search)
         
-        self.void_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(10,0), pady=5)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=5)
+        # Transaction list: hanya baris yang terlihat yang ada di Treeview
+        columns = ("ID", "Kode", "Tanggal", "Total", "Kasir", "Aksi")
+        self.void_list = VirtualTreeview(
+            void_frame, columns, height=15, tasks=self.tasks,
+            row_values=lambda row: (row['id'], row['transaction_code'], row['created_at'],
+                                    f"Rp {row['final_amount']:,.0f}", row['cashier'] or "-",
+                                    row['status']))
+        self.void_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.void_tree = self.void_list.tree
         
         # Void form
         form_frame = ttk.LabelFrame(void_frame, text="Form Void")
@@ -130,24 +300,198 @@ class AdminDashboard:
         ttk.Button(form_frame, text="Proses Void", 
                   command=self.process_void,
                   style="Danger.TButton").grid(row=1, column=1, pady=10, sticky=tk.E)
+        
+        self.search_transaction()
+    
+    def schedule_search(self, event=None):
+        """Debounce: search once typing pauses for SEARCH_DEBOUNCE_MS"""
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self.search_transaction)
+    
+    def search_transaction(self):
+        """Point the void list at a new keyset-paginated source for the current filters"""
+        self._search_after_id = None
+        filters = {
+            'code_prefix': self.search_entry.get().strip() or None,
+            'date_from': self.date_from_entry.get().strip() or None,
+            'date_to': self.date_to_entry.get().strip() or None,
+            'user_id': self.cashiers.get(self.cashier_combo.get())
+        }
+        self.load_void_source(filters)
+    
+    def load_void_source(self, filters, offset=0):
+        """COUNT(*) and the first window run in the pool; the list swaps sources when done"""
+        # Tanpa group: hasil tetap dipasang walau user sempat pindah tab
+        rows = self.void_list.height + self.void_list.prefetch_rows
+        self.tasks.submit('void_search', TransactionPageSource(self.db, filters).load,
+                          rows, offset,
+                          on_success=lambda source: self.void_list.set_source(source, offset))
+    
+    def request_approval(self, action, amount=None):
+        """Ask a supervisor to log in and approve; returns the approver or None"""
+        username = simpledialog.askstring("Persetujuan Supervisor", "Username supervisor:",
+                                          parent=self.root)
+        if not username:
+            return None
+        password = simpledialog.askstring("Persetujuan Supervisor", "Password:",
+                                          show="*", parent=self.root)
+        if not password:
+            return None
+        
+        # Mode server: token persetujuan sekali pakai, bukan sesi supervisor
+        approver = self.db.request_approval(username, password, action, amount)
+        if approver is None or approver['id'] == self.user['id'] \
+                or not self.permissions.can(approver, action, amount):
+            messagebox.showerror("Akses Ditolak", "Supervisor tidak valid atau tidak berwenang!")
+            return None
+        return approver
     
     def process_void(self):
         """Process void transaction"""
-        selected = self.void_tree.selection()
+        selected = self.void_list.selected_row()
         if not selected:
             messagebox.showwarning("Peringatan", "Pilih transaksi terlebih dahulu!")
             return
+        if selected['status'] != 'completed':
+            messagebox.showwarning("Peringatan", "Transaksi ini sudah dibatalkan!")
+            return
         
         reason = self.reason_text.get("1.0", tk.END).strip()
         if not reason:
             messagebox.showwarning("Peringatan", "Harap isi alasan void!")
             return
         
+        # Cek hak akses: void di atas ambang butuh persetujuan supervisor
+        amount = selected['final_amount']
+        status = self.permissions.check(self.user, 'void', amount)
+        if status == DENIED:
+            messagebox.showerror("Akses Ditolak", "Anda tidak berhak membatalkan transaksi!")
+            return
+        approver = None
+        if status == APPROVAL:
+            approver = self.request_approval('void', amount)
+            if approver is None:
+                return
+        
         # Confirm void
         if messagebox.askyesno("Konfirmasi", 
                                "Apakah Anda yakin ingin membatalkan transaksi ini?"):
             # Process void in database
-            # ... implementation ...
+            try:
+                self.db.void_transaction(selected['id'], self.user['id'], reason, approver)
+            except (ValueError, PermissionDenied) as e:
+                messagebox.showerror("Error", str(e))
+                return
             messagebox.showinfo("Sukses", "Transaksi berhasil dibatalkan!")
-            self.search_transaction()
-            self.reason_text.delete("1.0", tk.END)
\ No newline at end of file
+            self.load_void_source(self.void_list.source.filters, self.void_list.offset)
+            self.reason_text.delete("1.0", tk.END)
+    
+    def create_report_tab(self, report_frame):
+        """Report export: streamed from the database in the background"""
+        form = ttk.LabelFrame(report_frame, text="Ekspor Laporan")
+        form.pack(fill=tk.X, padx=10, pady=5)
+        
+        ttk.Label(form, text="Jenis:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        self.report_type_combo = ttk.Combobox(form, values=list(REPORT_TYPES),
+                                              state="readonly", width=25)
+        self.report_type_combo.set(next(iter(REPORT_TYPES)))
+        self.report_type_combo.grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
+        
+        ttk.Label(form, text="Format:").grid(row=0, column=2, sticky=tk.W, padx=5, pady=5)
+        self.report_format_combo = ttk.Combobox(form, values=list(REPORT_FORMATS),
+                                                state="readonly", width=15)
+        self.report_format_combo.set("CSV")
+        self.report_format_combo.grid(row=0, column=3, sticky=tk.W, padx=5, pady=5)
+        
+        # Tanggal YYYY-MM-DD; kosong berarti tanpa batas
+        today = datetime.now()
+        ttk.Label(form, text="Dari:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
+        self.report_from_entry = ttk.Entry(form, width=12)
+        self.report_from_entry.insert(0, today.replace(day=1).strftime('%Y-%m-%d'))
+        self.report_from_entry.grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
+        ttk.Label(form, text="Sampai:").grid(row=1, column=2, sticky=tk.W, padx=5, pady=5)
+        self.report_to_entry = ttk.Entry(form, width=12)
+        self.report_to_entry.insert(0, today.strftime('%Y-%m-%d'))
+        self.report_to_entry.grid(row=1, column=3, sticky=tk.W, padx=5, pady=5)
+        
+        self.report_export_button = ttk.Button(form, text="Ekspor", command=self.export_report)
+        self.report_export_button.grid(row=2, column=1, sticky=tk.W, padx=5, pady=10)
+        self.report_cancel_button = ttk.Button(form, text="Batal", command=self.cancel_report,
+                                               state=tk.DISABLED)
+        self.report_cancel_button.grid(row=2, column=2, sticky=tk.W, padx=5, pady=10)
+        
+        self.report_status = ttk.Label(report_frame, text="")
+        self.report_status.pack(fill=tk.X, padx=10, pady=5)
+        
+        self._report_cancel = threading.Event()
+        self._report_rows = 0
+    
+    def export_report(self):
+        """Ask for a file name and run the export on the task runner"""
+        if not self.permissions.can(self.user, 'view_reports'):
+            messagebox.showerror("Akses Ditolak", "Anda tidak berhak melihat laporan!")
+            return
+        
+        title = self.report_type_combo.get()
+        extension = REPORT_FORMATS[self.report_format_combo.get()]
+        date_from = self.report_from_entry.get().strip() or None
+        date_to = self.report_to_entry.get().strip() or None
+        for value in (date_from, date_to):
+            if value:
+                try:
+                    datetime.strptime(value, '%Y-%m-%d')
+                except ValueError:
+                    messagebox.showwarning("Peringatan", "Format tanggal harus YYYY-MM-DD!")
+                    return
+        
+        path = filedialog.asksaveasfilename(
+            parent=self.root, defaultextension=extension,
+            initialfile=f"laporan_{REPORT_TYPES[title]}_{date_from or 'awal'}_{date_to or 'akhir'}{extension}",
+            filetypes=[(self.report_format_combo.get(), "*" + extension)])
+        if not path:
+            return
+        
+        from core.reports import ReportEngine
+        
+        # Progres ditulis thread worker, dibaca main loop Tk lewat timer
+        self._report_cancel.clear()
+        self._report_rows = 0
+        self.report_export_button.configure(state=tk.DISABLED)
+        self.report_cancel_button.configure(state=tk.NORMAL)
+        self.report_status.configure(text="Mengekspor...")
+        # Tanpa grup tab: ekspor tetap berjalan dan selesai walau user pindah tab
+        self.tasks.submit('report_export', ReportEngine(self.db).run,
+                          REPORT_TYPES[title], path, date_from, date_to,
+                          self.on_report_progress, self._report_cancel.is_set,
+                          on_success=self.on_report_done, on_error=self.on_report_failed)
+        self.tasks.every('report_progress', REPORT_PROGRESS_MS, self.show_report_progress)
+    
+    def on_report_progress(self, rows_read):
+        """Worker thread: only store the count"""
+        self._report_rows = rows_read
+    
+    def show_report_progress(self):
+        self.report_status.configure(text=f"Mengekspor... {self._report_rows:,} baris dibaca")
+    
+    def cancel_report(self):
+        self._report_cancel.set()
+        self.report_status.configure(text="Membatalkan...")
+    
+    def _report_finished(self, text):
+        self.tasks.cancel('report_progress')
+        self.report_export_button.configure(state=tk.NORMAL)
+        self.report_cancel_button.configure(state=tk.DISABLED)
+        self.report_status.configure(text=text)
+    
+    def on_report_done(self, summary):
+        if summary['cancelled']:
+            self._report_finished("Ekspor dibatalkan")
+            return
+        self._report_finished(f"Selesai: {summary['rows_written']:,} baris ditulis "
+                              f"({summary['rows_read']:,} baris dibaca, "
+                              f"{summary['seconds']:.1f} detik) ke {summary['path']}")
+    
+    def on_report_failed(self, exc):
+        self._report_finished("Ekspor gagal")
+        messagebox.showerror("Error", f"Gagal membuat laporan: {exc}")
@@ -0,0 +1,150 @@
+# task_runner.py
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskRunner:
+    """
+    Run database/report work on a thread pool and deliver results on the Tk
+    main thread. Worker threads never touch Tk: results go through a queue
+    that the main loop drains with root.after().
+    
+    Every task has a key; submitting a new task with the same key makes the
+    previous one stale, and stale results are dropped instead of delivered.
+    """
+    
+    def __init__(self, root, max_workers=4, poll_ms=30):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="dashboard")
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._generations = {}   # key -> generasi task terbaru
+        self._futures = {}       # key -> future task terbaru
+        self._groups = {}        # key -> nama grup (mis. tab)
+        self._timers = {}        # key -> id root.after untuk task periodik
+        self._polling = False
+        self._closed = False
+    
+    def submit(self, key, fn, *args, on_success=None, on_error=None, group=None):
+        """
+        Run fn(*args) in the pool. on_success(result) / on_error(exc) are
+        called on the Tk thread, only if this is still the latest task for key.
+        """
+        if self._closed:
+            return None
+        
+        with self._lock:
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+            previous = self._futures.get(key)
+            self._groups[key] = group
+        if previous is not None:
+            previous.cancel()
+        
+        def run():
+            try:
+                result = fn(*args)
+            except Exception as exc:
+                self._results.put((key, generation, None, exc, on_success, on_error))
+            else:
+                self._results.put((key, generation, result, None, on_success, on_error))
+        
+        future = self._executor.submit(run)
+        with self._lock:
+            self._futures[key] = future
+        self._ensure_polling()
+        return future
+    
+    def every(self, key, interval_ms, callback, group=None):
+        """
+        Call callback() on the Tk thread now and then every interval_ms until
+        cancelled. The callback is expected to submit() the actual work.
+        An existing chain for key is replaced, not run alongside.
+        """
+        if self._closed:
+            return
+        self.cancel(key)
+        with self._lock:
+            self._groups[key] = group
+        
+        def tick():
+            if self._closed:
+                return
+            self._timers[key] = self.root.after(interval_ms, tick)
+            callback()
+        
+        tick()
+    
+    def is_scheduled(self, key):
+        return key in self._timers
+    
+    def cancel(self, key):
+        """Drop the pending/running task for key and stop its periodic timer"""
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            future = self._futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            self.root.after_cancel(timer)
+    
+    def cancel_group(self, group):
+        """Cancel every task and timer submitted with this group"""
+        with self._lock:
+            keys = [k for k, g in self._groups.items() if g == group]
+        for key in keys:
+            self.cancel(key)
+    
+    def cancel_other_groups(self, keep):
+        """
+        Cancel the tasks of every group except `keep` (e.g. on tab switch).
+        Tasks submitted without a group are not tied to a tab and keep running.
+        """
+        with self._lock:
+            keys = [k for k, g in self._groups.items() if g is not None and g != keep]
+        for key in keys:
+            self.cancel(key)
+    
+    def shutdown(self):
+        """Cancel everything; called on logout or window close"""
+        self._closed = True
+        for key in list(self._generations) + list(self._timers):
+            self.cancel(key)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _ensure_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._drain)
+    
+    def _drain(self):
+        """Deliver finished results on the Tk thread"""
+        while True:
+            try:
+                key, generation, result, error, on_success, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            
+            with self._lock:
+                stale = self._closed or self._generations.get(key) != generation
+                if not stale:
+                    self._futures.pop(key, None)
+            if stale:
+                continue
+            
+            if error is not None:
+                if on_error:
+                    on_error(error)
+            elif on_success:
+                on_success(result)
+        
+        with self._lock:
+            pending = bool(self._futures)
+        if pending and not self._closed:
+            self.root.after(self.poll_ms, self._drain)
+        else:
+            self._polling = False
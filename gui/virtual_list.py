@@ -0,0 +1,268 @@
+# virtual_list.py
+import threading
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+
+
+class TransactionPageSource:
+    """
+    Windowed, read-only view over Database.search_transactions.
+    Rows are fetched in keyset pages of `page_size`; only a bounded number
+    of pages is cached, so memory stays flat however far the user scrolls.
+    rows() and page() query the database and may run on a worker thread;
+    cached_rows() never does, so the Tk thread can render from it.
+    """
+    
+    # Lompatan lebih jauh dari ini memakai transaction_cursor_at (OFFSET) sekali
+    MAX_WALK_PAGES = 4
+    
+    def __init__(self, db, filters=None, page_size=100, max_cached_pages=16):
+        self.db = db
+        self.filters = filters or {}
+        self.page_size = page_size
+        self.max_cached_pages = max_cached_pages
+        self._pages = OrderedDict()    # index halaman -> list baris (LRU)
+        self._anchors = {0: None}      # index halaman -> cursor (created_at, id) sebelum halaman
+        self._count = None
+        self._lock = threading.Lock()  # cache dipakai thread Tk dan worker
+    
+    def count(self):
+        if self._count is None:
+            self._count = self.db.count_transactions(**self.filters)
+        return self._count
+    
+    def load(self, rows, start=0):
+        """Fetch the count and rows [start, start + rows); meant for a worker thread"""
+        if self.count():
+            self.rows(start, rows)
+        return self
+    
+    def invalidate(self):
+        """Forget cached pages and count (after a void or a new sale)"""
+        with self._lock:
+            self._pages.clear()
+            self._anchors = {0: None}
+            self._count = None
+    
+    def is_cached(self, position):
+        with self._lock:
+            return position // self.page_size in self._pages
+    
+    def cached_rows(self, start, count):
+        """Rows [start, start + count) from the cache only; None where a page is not loaded"""
+        rows = []
+        with self._lock:
+            for position in range(start, start + count):
+                index, slot = divmod(position, self.page_size)
+                page = self._pages.get(index)
+                if page is None:
+                    rows.append(None)
+                elif slot < len(page):
+                    rows.append(page[slot])
+                else:
+                    break
+        return rows
+    
+    def rows(self, start, count):
+        """Return rows [start, start + count) in newest-first order"""
+        rows = []
+        index = start // self.page_size
+        skip = start - index * self.page_size
+        while len(rows) < count:
+            page = self.page(index)
+            if not page:
+                break
+            rows.extend(page[skip:])
+            skip = 0
+            index += 1
+        return rows[:count]
+    
+    def page(self, index):
+        with self._lock:
+            if index in self._pages:
+                self._pages.move_to_end(index)
+                return self._pages[index]
+            known = max(i for i in self._anchors if i <= index)
+        
+        if known != index:
+            if index - known > self.MAX_WALK_PAGES:
+                # Lompat langsung: cari baris terakhir halaman sebelumnya
+                cursor = self.db.transaction_cursor_at(index * self.page_size - 1, **self.filters)
+                if cursor is None:
+                    return self._store(index, [])
+                with self._lock:
+                    self._anchors[index] = cursor
+            else:
+                # Jalan maju dari halaman terdekat yang cursor-nya diketahui
+                for i in range(known, index):
+                    if not self.page(i):
+                        return self._store(index, [])
+        
+        with self._lock:
+            anchor = self._anchors[index]
+        rows = self.db.search_transactions(after=anchor, limit=self.page_size, **self.filters)
+        return self._store(index, rows)
+    
+    def _store(self, index, rows):
+        # Halaman kosong juga disimpan, supaya render tidak terus memintanya
+        with self._lock:
+            if rows:
+                last = rows[-1]
+                self._anchors[index + 1] = (last['created_at'], last['id'])
+            self._pages[index] = rows
+            while len(self._pages) > self.max_cached_pages:
+                self._pages.popitem(last=False)
+        return rows
+
+
+class VirtualTreeview(ttk.Frame):
+    """
+    Treeview that only ever holds the visible rows. The scrollbar maps to
+    the full row count of the source; scrolling re-fills a fixed set of
+    items instead of inserting every row.
+    
+    With a TaskRunner, page fetches and prefetch run in its pool: render()
+    shows the cached rows at once, placeholders for the rest, and renders
+    again when the fetch lands. The source's count must already be known
+    (source.load() in the pool before set_source).
+    """
+    
+    PLACEHOLDER = "Memuat..."
+    
+    def __init__(self, parent, columns, row_values, height=15, prefetch_rows=50, tasks=None,
+                 **kwargs):
+        super().__init__(parent, **kwargs)
+        self.row_values = row_values      # fungsi baris -> tuple nilai kolom
+        self.height = height
+        self.prefetch_rows = prefetch_rows
+        self.tasks = tasks
+        self.source = None
+        self.offset = 0
+        self.visible_rows = []
+        
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=height,
+                                 selectmode="browse")
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100)
+        
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # Item tetap; isinya diganti saat scroll
+        self.items = [self.tree.insert("", tk.END, values=()) for _ in range(height)]
+        
+        for widget in (self.tree, self):
+            widget.bind("<MouseWheel>", self.on_mousewheel)
+            widget.bind("<Button-4>", lambda e: self.scroll_by(-3))
+            widget.bind("<Button-5>", lambda e: self.scroll_by(3))
+        self.tree.bind("<Down>", lambda e: self.on_key(1))
+        self.tree.bind("<Up>", lambda e: self.on_key(-1))
+        self.tree.bind("<Next>", lambda e: self.scroll_by(self.height) or "break")
+        self.tree.bind("<Prior>", lambda e: self.scroll_by(-self.height) or "break")
+    
+    def set_source(self, source, offset=0):
+        """Show source from offset; call source.load() first to keep queries off the Tk thread"""
+        self.source = source
+        self.offset = max(0, min(offset, source.count() - self.height)) if source else 0
+        self.render()
+    
+    def refresh(self):
+        """Re-read the current window (e.g. after a void); counts on the calling thread"""
+        if self.source:
+            self.source.invalidate()
+            self.offset = min(self.offset, max(0, self.source.count() - self.height))
+            self.render()
+    
+    def selected_row(self):
+        """Source row of the selected item, or None"""
+        selection = self.tree.selection()
+        if not selection:
+            return None
+        slot = self.items.index(selection[0])
+        return self.visible_rows[slot] if slot < len(self.visible_rows) else None
+    
+    def render(self):
+        total = self.source.count() if self.source else 0
+        ahead = self.offset + self.height + self.prefetch_rows
+        if not total:
+            self.visible_rows = []
+        elif self.tasks is None:
+            self.visible_rows = self.source.rows(self.offset, self.height)
+            # Muat halaman berikutnya lebih dulu supaya scroll tetap halus
+            if ahead < total:
+                self.source.rows(ahead, 1)
+        else:
+            self.visible_rows = self.source.cached_rows(self.offset,
+                                                        min(self.height, total - self.offset))
+            if None in self.visible_rows or (ahead < total and not self.source.is_cached(ahead)):
+                self._fetch(total)
+        
+        selected = self.tree.selection()
+        for slot, item in enumerate(self.items):
+            if slot >= len(self.visible_rows):
+                self.tree.item(item, values=())
+            elif self.visible_rows[slot] is None:
+                self.tree.item(item, values=("", self.PLACEHOLDER))
+            else:
+                self.tree.item(item, values=self.row_values(self.visible_rows[slot]))
+        if selected:
+            self.tree.selection_remove(selected)
+        
+        if total:
+            first = self.offset / total
+            last = min(1.0, (self.offset + self.height) / total)
+            self.scrollbar.set(first, last)
+        else:
+            self.scrollbar.set(0, 1)
+    
+    def _fetch(self, total):
+        """Load the window and the prefetch row in the pool, then render again"""
+        source, offset = self.source, self.offset
+        ahead = offset + self.height + self.prefetch_rows
+        
+        def fetch():
+            source.rows(offset, self.height)
+            if ahead < total:
+                source.rows(ahead, 1)
+        
+        # Satu key per widget: geser cepat hanya menyisakan fetch terakhir
+        self.tasks.submit(f"virtual_list{self}", fetch,
+                          on_success=lambda _: source is self.source and self.render())
+    
+    def scroll_to(self, offset):
+        if not self.source:
+            return
+        offset = max(0, min(int(offset), self.source.count() - self.height))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+    
+    def scroll_by(self, rows):
+        self.scroll_to(self.offset + rows)
+    
+    def on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(value) * self.source.count() if self.source else 0)
+        elif action == "scroll":
+            step = self.height if unit == "pages" else 1
+            self.scroll_by(int(value) * step)
+    
+    def on_mousewheel(self, event):
+        self.scroll_by(-3 if event.delta > 0 else 3)
+    
+    def on_key(self, direction):
+        """Arrow keys past the window edge scroll the source instead of stopping"""
+        selection = self.tree.selection()
+        slot = self.items.index(selection[0]) if selection else -1
+        target = slot + direction
+        if 0 <= target < min(self.height, len(self.visible_rows)):
+            self.tree.selection_set(self.items[target])
+            self.tree.focus(self.items[target])
+        else:
+            self.scroll_by(direction)
+            if 0 <= slot < len(self.items):
+                self.tree.selection_set(self.items[slot])
+        return "break"
@@ -1,21 +1,45 @@
 # main.py
+import sys
+
+# Profiler harus terpasang sebelum import lain supaya waktunya ikut terukur
+if "--profile-startup" in sys.argv:
+    from utils.startup_profiler import StartupProfiler
+    PROFILER = StartupProfiler().install()
+else:
+    PROFILER = None
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import sys
 import os
 from database.database import Database
 from gui.login_window import LoginWindow
-from gui.admin_dashboard import AdminDashboard
-from gui.employee_dashboard import EmployeeDashboard
+
+def server_address(argv):
+    """(host, port) from '--server HOST:PORT', or None for a local database"""
+    if "--server" not in argv:
+        return None
+    index = argv.index("--server")
+    if index + 1 >= len(argv):
+        raise SystemExit("--server butuh HOST:PORT")
+    host, _, port = argv[index + 1].rpartition(":")
+    return host or "127.0.0.1", int(port)
 
 class CashierSystem:
-    def __init__(self):
+    def __init__(self, profiler=None, server=None):
+        self.profiler = profiler
         self.root = tk.Tk()
         self.root.title("Sistem Kasir Lengkap - PT. XYZ")
         self.root.geometry("1200x700")
+        self.mark("tk_ready")
         
-        # Initialize database
-        self.db = Database()
+        # Initialize database; mode terminal memakai sales server bersama
+        self.server = server
+        if server:
+            from database.server import DatabaseClient
+            self.db = DatabaseClient(*server)
+        else:
+            self.db = Database()
+        self.mark("database_ready")
         
         # Current user
         self.current_user = None
@@ -29,20 +53,46 @@ class CashierSystem:
             widget.destroy()
         
         LoginWindow(self.root, self.on_login_success)
+        
+        if self.profiler and not any(name == "login_shown" for name, _ in self.profiler.marks):
+            self.root.after_idle(self.report_startup)
+    
+    def mark(self, name):
+        if self.profiler:
+            self.profiler.mark(name)
+    
+    def report_startup(self):
+        """Print the startup profile once the login window is drawn"""
+        self.root.update_idletasks()
+        self.mark("login_shown")
+        print(self.profiler.report())
     
     def on_login_success(self, user_data):
         """Handle successful login"""
         self.current_user = user_data
         
-        # Show appropriate dashboard based on role
+        # Dashboard (dan library berat di baliknya) baru di-import setelah login
         if user_data['role'] in ['admin', 'manager']:
+            from gui.admin_dashboard import AdminDashboard
             AdminDashboard(self.root, self.db, user_data, self.logout)
         else:
+            from gui.employee_dashboard import EmployeeDashboard
             EmployeeDashboard(self.root, self.db, user_data, self.logout)
+        
+        if self.profiler:
+            self.root.update_idletasks()
+            self.mark("dashboard_shown")
+            name, elapsed = self.profiler.marks[-1]
+            print(f"{name:<30} {elapsed * 1000:9.1f} ms")
+            self.profiler.uninstall()
+            self.profiler = None
     
     def logout(self):
         """Logout current user"""
         self.current_user = None
+        if self.server:
+            # Sesi di sales server diakhiri supaya login berikutnya dapat token baru
+            self.db.logout()
         self.show_login()
     
     def run(self):
@@ -50,5 +100,5 @@ class CashierSystem:
         self.root.mainloop()
 
 if __name__ == "__main__":
-    app = CashierSystem()
+    app = CashierSystem(profiler=PROFILER, server=server_address(sys.argv))
     app.run()
\ No newline at end of file
@@ -0,0 +1,57 @@
+# conftest.py
+"""
+Pengganti Tk yang dipakai bersama oleh test GUI: tidak ada display di CI,
+jadi root.after dan widget diganti objek biasa.
+Test unittest mengimpornya lewat `from conftest import ...`.
+"""
+
+
+class FakeRoot:
+    """root.after/after_cancel without Tk; pump() runs the due callbacks"""
+    
+    def __init__(self):
+        self._callbacks = {}
+        self._ids = 0
+    
+    def after(self, ms, callback):
+        self._ids += 1
+        self._callbacks[self._ids] = callback
+        return self._ids
+    
+    def after_cancel(self, timer):
+        self._callbacks.pop(timer, None)
+    
+    def pump(self):
+        # Callback yang di-cancel oleh callback sebelumnya tidak dijalankan, seperti Tk
+        for timer in list(self._callbacks):
+            callback = self._callbacks.pop(timer, None)
+            if callback is not None:
+                callback()
+
+
+class FakeWidget:
+    """Entry/Combobox/Button/Label stand-in: get() and configure()"""
+    
+    def __init__(self, value=""):
+        self.value = value
+        self.options = {}
+    
+    def get(self):
+        return self.value
+    
+    def configure(self, **options):
+        self.options.update(options)
+
+
+class FakeNotebook:
+    """ttk.Notebook with one selected tab titled `title`"""
+    
+    def __init__(self, title):
+        self.title = title
+    
+    def select(self):
+        return "tab"
+    
+    def tab(self, tab_id, option):
+        return self.title
+
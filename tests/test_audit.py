@@ -0,0 +1,62 @@
+# test_audit.py
+"""
+Audit transaksi mencakup bulan yang sudah dipindah ke file arsip, dan
+mencatat bulan yang dilewati bila audit hanya membaca database aktif.
+
+    python -m pytest tests/test_audit.py
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from core.audit import TransactionAuditor
+from database.archive import Archiver
+from database.database import Database
+from benchmarks.workload import seed_history
+
+
+class ArchivedAuditTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "cashier.db"))
+        self.periods = seed_history(self.db, 3, 200, lines=3, end="2024-04")
+        self.archiver = Archiver(self.db, os.path.join(self.tmp.name, "archive"), keep_months=1)
+        self.auditor = TransactionAuditor(self.db, chunk_size=64)
+    
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+    
+    def test_archived_months_are_audited(self):
+        for period in self.periods[:2]:
+            self.archiver.archive_period(period)
+        path = self.archiver.archive_path(self.periods[0])
+        with sqlite3.connect(path) as conn:
+            conn.execute("UPDATE transactions SET final_amount = final_amount + 7 "
+                         "WHERE id = (SELECT MIN(id) FROM transactions)")
+        report = os.path.join(self.tmp.name, "audit.csv")
+        
+        summary = self.auditor.run(report)
+        
+        self.assertEqual(summary['transactions'], 600)
+        self.assertEqual(summary['archived_periods'], self.periods[:2])
+        self.assertEqual(summary['skipped_periods'], [])
+        self.assertEqual(summary['discrepancies']['final_amount'], 1)
+        with open(report, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn(f",{self.periods[0]}-", lines[1])
+    
+    def test_hot_only_run_lists_skipped_months(self):
+        self.archiver.archive_period(self.periods[0])
+        
+        summary = self.auditor.run(include_archived=False)
+        
+        self.assertEqual(summary['transactions'], 400)
+        self.assertEqual(summary['archived_periods'], [])
+        self.assertEqual(summary['skipped_periods'], [self.periods[0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+# test_cart.py
+"""
+Total Cart dalam rupiah integer: diskon dan pajak dibulatkan half up satu
+kali, tanpa sisa float di total akhir.
+
+    python -m pytest tests/test_cart.py
+"""
+import unittest
+
+from core.transaction import Cart, percent_of
+
+
+def product(product_id, price, category="Umum"):
+    return {'id': product_id, 'code': f"P{product_id:04d}", 'name': f"Produk {product_id}",
+            'category': category, 'selling_price': price}
+
+
+class PercentOfTest(unittest.TestCase):
+    def test_rounds_half_up_to_rupiah(self):
+        self.assertEqual(percent_of(1005, 10), 101)      # 100.5 -> 101
+        self.assertEqual(percent_of(1004, 10), 100)      # 100.4 -> 100
+        self.assertEqual(percent_of(3333, 12.5), 417)    # 416.625 -> 417
+        self.assertEqual(percent_of(0, 10), 0)
+
+
+class CartTotalsTest(unittest.TestCase):
+    def test_totals_are_integer_rupiah(self):
+        cart = Cart()
+        cart.add(product(1, 3333), 3)
+        cart.add(product(2, 1_500))
+        cart.set_discount('percentage', 12.5)
+        
+        totals = cart.totals()
+        self.assertEqual(totals['subtotal'], 11_499)
+        self.assertEqual(totals['discount_amount'], 1_437)    # 1437.375
+        self.assertEqual(totals['taxable_amount'], 10_062)
+        self.assertEqual(totals['tax_amount'], 1_006)         # 1006.2
+        self.assertEqual(totals['final_amount'], 11_068)
+        self.assertTrue(all(isinstance(value, int) for value in totals.values()))
+    
+    def test_many_lines_do_not_drift(self):
+        cart = Cart()
+        for i in range(1, 501):
+            cart.add(product(i, 1_105))
+        cart.set_discount('percentage', 3)
+        
+        totals = cart.totals()
+        self.assertEqual(totals['subtotal'], 552_500)
+        self.assertEqual(totals['discount_amount'], 16_575)
+        self.assertEqual(totals['tax_amount'], 53_593)       # 53592.5 -> 53593
+        self.assertEqual(totals['final_amount'], 589_518)
+    
+    def test_fixed_discount_is_capped_and_rounded(self):
+        cart = Cart()
+        cart.add(product(1, 10_000))
+        cart.set_discount('fixed', 2_500.5)
+        self.assertEqual(cart.totals()['discount_amount'], 2_501)
+        cart.set_discount('fixed', 50_000)
+        self.assertEqual(cart.totals()['discount_amount'], 10_000)
+        self.assertEqual(cart.totals()['final_amount'], 0)
+    
+    def test_undo_restores_totals(self):
+        cart = Cart()
+        cart.add(product(1, 2_000), 2)
+        before = cart.totals()
+        cart.set_quantity(1, 7)
+        cart.undo()
+        self.assertEqual(cart.totals(), before)
+    
+    def test_to_sale_matches_totals(self):
+        cart = Cart()
+        cart.add(product(1, 4_999), 2)
+        cart.set_discount('percentage', 10)
+        sale = cart.to_sale(user_id=1)
+        totals = cart.totals()
+        self.assertEqual(sale['final_amount'], totals['final_amount'])
+        self.assertEqual(sale['discount_percentage'], 10)
+        self.assertEqual(sum(item['subtotal'] for item in sale['items']), sale['subtotal'])
+
+
+if __name__ == "__main__":
+    unittest.main()
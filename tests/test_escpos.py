@@ -0,0 +1,74 @@
+# test_escpos.py
+"""
+Tata letak struk ESC/POS di kertas 58 mm (32 kolom) dan 80 mm (48 kolom):
+kolom angka tidak menempel dan nominal tidak pernah terpotong.
+
+    python -m pytest tests/test_escpos.py
+"""
+import re
+import unittest
+
+from core.escpos import EscPosRenderer, tax_label
+
+COMPANY = {'name': "Toko Sembako", 'address': "Jl. Merdeka 1", 'phone': "021-555",
+           'footer': "Terima kasih"}
+CONTROL = re.compile(rb'\x1b@|\x1b[Ead].|\x1d!.|\x1dV..', re.S)
+
+
+def receipt(items, tax_rate=10):
+    subtotal = sum(item['subtotal'] for item in items)
+    tax = subtotal * tax_rate // 100
+    return {'date': "2024-01-01 12:00:00", 'cashier': "Kasir 1", 'transaction_code': "TRX1",
+            'items': items, 'subtotal': subtotal, 'discount': 0, 'tax': tax,
+            'total': subtotal + tax, 'cash': subtotal + tax, 'change': 0}
+
+
+def item(name, quantity, price):
+    return {'name': name, 'quantity': quantity, 'price': price, 'subtotal': price * quantity}
+
+
+def lines(width, data):
+    raw = EscPosRenderer(COMPANY, width=width).render(data)
+    return [CONTROL.sub(b'', line).decode('cp437') for line in raw.split(b'\n')]
+
+
+class EscPosLayoutTest(unittest.TestCase):
+    ITEMS = [item("Beras 5kg", 2, 125_000), item("Minyak Goreng 2 Liter Pouch", 12, 38_500),
+             item("Gula", 1, 15_000)]
+    
+    def assert_amounts_intact(self, width, data):
+        rendered = lines(width, data)
+        text = "\n".join(rendered)
+        for entry in data['items']:
+            for amount in (entry['price'], entry['subtotal']):
+                # Nominal utuh dan dipisah spasi dari kolom sebelumnya
+                self.assertRegex(text, rf"(^|\s)Rp {amount:,}(\s|$)")
+        for line in rendered:
+            self.assertLessEqual(len(line), width, line)
+        return rendered
+    
+    def test_58mm_puts_names_on_their_own_line(self):
+        rendered = self.assert_amounts_intact(32, receipt(self.ITEMS))
+        self.assertIn("Beras 5kg", rendered)
+        self.assertIn("         2 Rp 125,000 Rp 250,000", rendered)
+    
+    def test_80mm_keeps_short_names_inline(self):
+        rendered = self.assert_amounts_intact(48, receipt(self.ITEMS))
+        self.assertTrue(any(line.startswith("Beras 5kg") and line.endswith("Rp 250,000")
+                            for line in rendered))
+        self.assertIn("Minyak Goreng 2 Liter Pouch", rendered)
+    
+    def test_large_amounts_keep_a_separator(self):
+        data = receipt(self.ITEMS + [item("Kulkas", 2, 12_500_000)])
+        for width in (32, 48):
+            rendered = self.assert_amounts_intact(width, data)
+            self.assertTrue(any("Rp 12,500,000 Rp 25,000,000" in line for line in rendered))
+    
+    def test_tax_label_follows_rate(self):
+        self.assertEqual(tax_label(receipt(self.ITEMS, tax_rate=11)), "Pajak (11%):")
+        self.assertEqual(tax_label(dict(receipt(self.ITEMS), tax_percentage=12)), "Pajak (12%):")
+        self.assertIn("Pajak (10%):", "\n".join(lines(32, receipt(self.ITEMS))))
+
+
+if __name__ == "__main__":
+    unittest.main()
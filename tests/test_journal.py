@@ -0,0 +1,166 @@
+# test_journal.py
+"""
+Pemulihan journal penjualan: proses penulis di-kill pada titik acak, ekor
+file terpotong, dan record dengan CRC rusak. Setiap penjualan yang sudah
+di-acknowledge harus tersimpan tepat satu kali.
+
+    python -m pytest tests/test_journal.py
+"""
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from database.database import Database
+from database.journal import HEADER, JournaledSales, SaleJournal, encode_record
+from benchmarks.workload import seed_products, make_cart
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def product_prices(db):
+    return dict(db.get_product_rows(('id', 'selling_price')))
+
+
+def run_child(db_path, journal_path, seed):
+    """Writer process: print each transaction_code once the journal has it on disk"""
+    rng = random.Random(seed)
+    db = Database(db_path)
+    prices = product_prices(db)
+    sales_front = JournaledSales(db, journal_path, interval_ms=5)
+    while True:
+        cart = make_cart(rng, prices, rng.randint(1, 8))
+        result = sales_front.record_sale(cart, {'method': 'cash', 'cash_paid': cart['final_amount']})
+        sys.stdout.write(result['transaction_code'] + "\n")
+        sys.stdout.flush()
+
+
+def stored_codes(db_path):
+    with Database(db_path) as db, db.read() as conn:
+        return [row[0] for row in conn.execute("SELECT transaction_code FROM transactions")]
+
+
+class JournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "cashier.db")
+        self.journal_path = os.path.join(self.tmp.name, "sales.journal")
+        with Database(self.db_path) as db:
+            seed_products(db, 50)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def journal_sales(self, count, seed=1):
+        """Journal `count` sales without applying them; returns their codes"""
+        rng = random.Random(seed)
+        with Database(self.db_path) as db:
+            prices = product_prices(db)
+            sales_front = JournaledSales(db, self.journal_path, autostart=False)
+            codes = []
+            for _ in range(count):
+                cart = make_cart(rng, prices, rng.randint(1, 5))
+                codes.append(sales_front.record_sale(cart, {'method': 'cash'})['transaction_code'])
+            # Tanpa close(): seolah proses mati sebelum applier berjalan
+            sales_front.journal.close()
+            sales_front.dead_letter.close()
+        return codes
+    
+    def recover(self):
+        with Database(self.db_path) as db:
+            sales_front = JournaledSales(db, self.journal_path, autostart=False)
+            recovered = sales_front.recovered
+            sales_front.close()
+        return recovered
+
+
+class KilledWriterTest(JournalTestCase):
+    def test_acknowledged_sales_survive_kills_at_random_points(self):
+        rng = random.Random(3)
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+        acknowledged = set()
+        for round_index in range(4):
+            child = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), '--child', self.db_path,
+                 self.journal_path, str(3 + round_index)],
+                stdout=subprocess.PIPE, text=True, env=env)
+            acked = []
+            reader = threading.Thread(target=lambda: acked.extend(line.strip() for line in child.stdout))
+            reader.start()
+            time.sleep(rng.uniform(0.3, 0.6))
+            child.kill()
+            child.wait()
+            reader.join()
+            # Baris terakhir bisa terpotong saat kill
+            acknowledged.update(code for code in acked if len(code) == 23)
+            self.recover()
+        
+        stored = stored_codes(self.db_path)
+        self.assertTrue(acknowledged)
+        self.assertEqual(acknowledged - set(stored), set())
+        self.assertEqual(len(stored), len(set(stored)))
+        self.assertEqual(os.path.getsize(self.journal_path), 0)
+
+
+class TornTailTest(JournalTestCase):
+    def test_partial_record_at_the_end_is_cut(self):
+        codes = self.journal_sales(5)
+        valid = os.path.getsize(self.journal_path)
+        record = encode_record({'cart': {'items': []}, 'payment': {}})
+        with open(self.journal_path, 'ab') as f:
+            f.write(record[:len(record) // 2])
+        
+        self.assertEqual(SaleJournal(self.journal_path).synced, valid)
+        self.assertEqual(self.recover(), 5)
+        self.assertEqual(sorted(stored_codes(self.db_path)), sorted(codes))
+    
+    def test_garbage_at_the_end_is_cut(self):
+        codes = self.journal_sales(5)
+        with open(self.journal_path, 'ab') as f:
+            f.write(os.urandom(3))
+        
+        self.assertEqual(self.recover(), 5)
+        self.assertEqual(sorted(stored_codes(self.db_path)), sorted(codes))
+
+
+class CorruptRecordTest(JournalTestCase):
+    def test_bad_crc_ends_the_journal(self):
+        codes = self.journal_sales(3)
+        with open(self.journal_path, 'r+b') as f:
+            data = bytearray(f.read())
+            # Balik satu byte di body record kedua
+            first_length, _ = HEADER.unpack_from(data, 0)
+            second = HEADER.size + first_length
+            data[second + HEADER.size + 5] ^= 0xFF
+            f.seek(0)
+            f.write(data)
+        
+        journal = SaleJournal(self.journal_path)
+        self.assertEqual(journal.synced, second)
+        self.assertEqual(len(journal.records()), 1)
+        journal.close()
+        self.assertEqual(self.recover(), 1)
+        self.assertEqual(stored_codes(self.db_path), codes[:1])
+    
+    def test_replay_skips_sales_already_stored(self):
+        codes = self.journal_sales(4)
+        with Database(self.db_path) as db:
+            journal = SaleJournal(self.journal_path)
+            db.record_sales([(record['cart'], record['payment'])
+                             for record, _ in journal.records(limit=2)],
+                            allow_oversell=True, skip_existing=True)
+            journal.close()
+        
+        self.assertEqual(self.recover(), 2)
+        self.assertEqual(sorted(stored_codes(self.db_path)), sorted(codes))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--child']:
+        run_child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    else:
+        unittest.main()
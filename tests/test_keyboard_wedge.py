@@ -0,0 +1,71 @@
+# test_keyboard_wedge.py
+"""
+EventBus dengan root Tk: poll root.after hanya berjalan selama ada
+subscriber, makin jarang saat antrian kosong, dan event tetap diantar di
+thread Tk.
+
+    python -m pytest tests/test_keyboard_wedge.py
+"""
+import threading
+import unittest
+
+from utils.keyboard_wedge import EventBus
+from conftest import FakeRoot
+
+
+class RecordingRoot(FakeRoot):
+    """FakeRoot that remembers each after() delay"""
+    
+    def __init__(self):
+        super().__init__()
+        self.delays = []
+    
+    def after(self, ms, callback):
+        self.delays.append(ms)
+        return super().after(ms, callback)
+
+
+class EventBusPollingTest(unittest.TestCase):
+    def setUp(self):
+        self.root = RecordingRoot()
+        self.bus = EventBus(self.root, poll_ms=10, idle_poll_ms=80)
+        self.received = []
+    
+    def test_no_poll_without_subscribers(self):
+        self.bus.publish('scan', "A001")
+        self.root.pump()
+        self.assertEqual(self.root.delays, [])
+    
+    def test_idle_poll_backs_off_and_resets_on_event(self):
+        self.bus.subscribe('scan', self.received.append)
+        for _ in range(5):
+            self.root.pump()
+        self.assertEqual(self.root.delays, [10, 20, 40, 80, 80, 80])
+        
+        publisher = threading.Thread(target=self.bus.publish, args=('scan', "A001"))
+        publisher.start()
+        publisher.join()
+        self.assertEqual(self.received, [])
+        self.root.pump()
+        self.assertEqual(self.received, ["A001"])
+        self.assertEqual(self.root.delays[-1], 10)
+    
+    def test_unsubscribe_stops_polling(self):
+        self.bus.subscribe('scan', self.received.append)
+        self.root.pump()
+        self.bus.unsubscribe('scan', self.received.append)
+        count = len(self.root.delays)
+        
+        self.root.pump()
+        self.assertEqual(len(self.root.delays), count)
+        self.assertEqual(self.root._callbacks, {})
+    
+    def test_close_stops_polling(self):
+        self.bus.subscribe('scan', self.received.append)
+        self.bus.close()
+        self.root.pump()
+        self.assertEqual(self.root._callbacks, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+# test_promotions.py
+"""
+PromotionEngine: nilai diskon tiap jenis promo dalam rupiah integer,
+update per baris sama dengan evaluasi ulang penuh, dan Cart menghitung
+diskon manual serta pajak sesudah promo.
+
+    python -m pytest tests/test_promotions.py
+"""
+import random
+import unittest
+from datetime import date
+
+from core.promotions import BUNDLE_PRICE, BUY_N_GET_M, TIERED_PERCENTAGE, PromotionEngine
+from core.transaction import Cart
+
+DEFINITIONS = [
+    {'name': "Beli 3 gratis 1", 'type': BUY_N_GET_M, 'products': ['P0001'], 'rule': '3:1'},
+    {'name': "Mie 3 = 10rb", 'type': BUNDLE_PRICE, 'categories': ['Mie'],
+     'quantity': 3, 'price': 10_000},
+    {'name': "Minuman grosir", 'type': TIERED_PERCENTAGE, 'categories': ['Minuman'],
+     'tiers': [(6, 5), (12, 12.5)]},
+]
+
+
+def product(product_id, price, category="Umum"):
+    return {'id': product_id, 'code': f"P{product_id:04d}", 'name': f"Produk {product_id}",
+            'category': category, 'selling_price': price}
+
+
+def line(product_id, price, quantity, category="Umum"):
+    return {'product_id': product_id, 'code': f"P{product_id:04d}", 'category': category,
+            'price': price, 'quantity': quantity}
+
+
+class RuleValueTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = PromotionEngine(DEFINITIONS)
+    
+    def test_buy_n_get_m_frees_every_fourth_unit(self):
+        self.assertEqual(self.engine.evaluate([line(1, 2_500, 8)]), 2 * 2_500)
+        self.assertEqual(self.engine.evaluate([line(1, 2_500, 3)]), 0)
+    
+    def test_bundle_takes_the_dearest_units(self):
+        lines = [line(2, 3_000, 2, "Mie"), line(3, 4_500, 2, "Mie")]
+        # Satu bundle: 4.500 + 4.500 + 3.000 = 12.000 -> 10.000
+        self.assertEqual(self.engine.evaluate(lines), 2_000)
+    
+    def test_tier_percentage_rounds_half_up(self):
+        self.assertEqual(self.engine.evaluate([line(4, 1_001, 5, "Minuman")]), 0)
+        # 6 x 1.001 = 6.006, 5% = 300,3 -> 300
+        self.assertEqual(self.engine.evaluate([line(4, 1_001, 6, "Minuman")]), 300)
+        # 12 x 1.001 = 12.012, 12,5% = 1.501,5 -> 1.502
+        self.assertEqual(self.engine.evaluate([line(4, 1_001, 12, "Minuman")]), 1_502)
+    
+    def test_rule_targeting_code_and_category_counts_once(self):
+        engine = PromotionEngine([{'name': "Dobel", 'type': BUY_N_GET_M, 'rule': '1:1',
+                                   'products': ['P0005'], 'categories': ['Snack']}])
+        self.assertEqual(engine.evaluate([line(5, 1_000, 2, "Snack")]), 1_000)
+        self.assertEqual(engine.evaluations, 1)
+    
+    def test_inactive_and_expired_rules_are_skipped(self):
+        engine = PromotionEngine([
+            dict(DEFINITIONS[0], active=False),
+            dict(DEFINITIONS[0], name="Lewat", end='2024-01-31'),
+            dict(DEFINITIONS[0], name="Belum", start='2024-03-01'),
+        ], today=date(2024, 2, 15))
+        self.assertEqual(engine.rules, [])
+
+
+class IncrementalUpdateTest(unittest.TestCase):
+    def test_line_updates_match_full_evaluation(self):
+        rng = random.Random(7)
+        catalog = [(1, 2_500, "Umum"), (2, 3_000, "Mie"), (3, 4_500, "Mie"),
+                   (4, 1_001, "Minuman"), (5, 7_250, "Minuman"), (6, 9_900, "Umum")]
+        engine = PromotionEngine(DEFINITIONS)
+        reference = PromotionEngine(DEFINITIONS)
+        quantities = {}
+        for _ in range(500):
+            product_id, price, category = rng.choice(catalog)
+            quantity = rng.choice([0, 0, 1, 2, 3, 5, 7, 13])
+            quantities[product_id] = quantity
+            engine.update_line(product_id, f"P{product_id:04d}", category, price, quantity)
+            
+            lines = [line(pid, p, quantities[pid], c) for pid, p, c in catalog
+                     if quantities.get(pid)]
+            self.assertEqual(engine.discount, reference.evaluate(lines))
+            self.assertIsInstance(engine.discount, int)
+
+
+class CartWithPromotionsTest(unittest.TestCase):
+    def test_manual_discount_and_tax_apply_after_promotions(self):
+        cart = Cart(promotions=PromotionEngine(DEFINITIONS))
+        cart.add(product(1, 2_500), 4)             # 10.000, gratis 1 = 2.500
+        cart.add(product(4, 1_001, "Minuman"), 6)  # 6.006, 5% = 300
+        cart.set_discount('percentage', 10)
+        
+        totals = cart.totals()
+        self.assertEqual(totals['subtotal'], 16_006)
+        self.assertEqual(totals['promotion_amount'], 2_800)
+        # 10% dari 13.206 = 1.320,6 -> 1.321
+        self.assertEqual(totals['discount_amount'], 2_800 + 1_321)
+        self.assertEqual(totals['tax_amount'], 1_189)         # 11.885 x 10% = 1.188,5
+        self.assertEqual(totals['final_amount'], 11_885 + 1_189)
+    
+    def test_removing_a_line_removes_its_promotion(self):
+        cart = Cart(promotions=PromotionEngine(DEFINITIONS))
+        cart.add(product(1, 2_500), 4)
+        cart.remove(1)
+        self.assertEqual(cart.totals()['promotion_amount'], 0)
+        self.assertEqual(cart.totals()['final_amount'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+# test_report_export.py
+"""
+Ekspor laporan dari tab Laporan harus selesai walau user pindah tab di
+tengah ekspor. Dijalankan tanpa display: root Tk diganti FakeRoot yang
+menjalankan callback after() secara manual.
+
+    python -m pytest tests/test_report_export.py
+"""
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from core.reports import ReportEngine
+from database.database import Database
+from gui.admin_dashboard import AdminDashboard
+from gui.task_runner import TaskRunner
+from conftest import FakeNotebook, FakeRoot, FakeWidget
+
+
+class ReportExportTabSwitchTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(':memory:')
+        self.root = FakeRoot()
+        
+        dashboard = AdminDashboard.__new__(AdminDashboard)
+        dashboard.root = self.root
+        dashboard.db = self.db
+        dashboard.user = {'id': 1, 'role': 'admin', 'full_name': "Administrator"}
+        dashboard.permissions = mock.Mock(can=lambda *args: True)
+        dashboard.tasks = TaskRunner(self.root, max_workers=2)
+        dashboard.tab_builders = {}
+        dashboard.schedule_dashboard_refresh = lambda: None
+        dashboard.notebook = FakeNotebook("Laporan")
+        dashboard.report_type_combo = FakeWidget("Penjualan Harian")
+        dashboard.report_format_combo = FakeWidget("CSV")
+        dashboard.report_from_entry = FakeWidget("")
+        dashboard.report_to_entry = FakeWidget("")
+        dashboard.report_export_button = FakeWidget()
+        dashboard.report_cancel_button = FakeWidget()
+        dashboard.report_status = FakeWidget()
+        dashboard._report_cancel = threading.Event()
+        dashboard._report_rows = 0
+        self.dashboard = dashboard
+    
+    def tearDown(self):
+        self.dashboard.tasks.shutdown()
+        self.db.close()
+        self.tmp.cleanup()
+    
+    def pump_until(self, condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail("ekspor tidak selesai")
+            self.root.pump()
+            time.sleep(0.01)
+    
+    def test_export_finishes_after_tab_switch(self):
+        path = os.path.join(self.tmp.name, "laporan.csv")
+        release = threading.Event()
+        run = ReportEngine.run
+        
+        def slow_run(engine, *args):
+            # Tahan ekspor sampai tab sudah dipindah
+            release.wait(5)
+            return run(engine, *args)
+        
+        with mock.patch('gui.admin_dashboard.filedialog.asksaveasfilename', return_value=path), \
+                mock.patch('core.reports.ReportEngine.run', slow_run):
+            self.dashboard.export_report()
+            self.assertEqual(self.dashboard.report_export_button.options['state'], "disabled")
+            
+            self.dashboard.notebook.title = "Dashboard"
+            self.dashboard.on_tab_changed()
+            release.set()
+            self.pump_until(lambda: self.dashboard.report_export_button.options['state'] == "normal")
+        
+        self.assertTrue(os.path.exists(path))
+        self.assertTrue(self.dashboard.report_status.options['text'].startswith("Selesai"))
+        self.assertFalse(self.dashboard.tasks.is_scheduled('report_progress'))
+
+
+if __name__ == "__main__":
+    unittest.main()
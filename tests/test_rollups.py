@@ -0,0 +1,90 @@
+# test_rollups.py
+"""
+Biaya di rollup memakai harga beli saat penjualan: penjualan, void dan
+rebuild_rollups harus sepakat walau harga beli produk berubah sesudahnya.
+File arsip dari skema lama (tanpa unit_cost) tetap bisa dibaca dan
+dikembalikan.
+
+    python -m pytest tests/test_rollups.py
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from database.archive import Archiver, PartitionedReader
+from database.database import Database
+from benchmarks.workload import seed_history
+
+
+def sale(product_id, quantity, price):
+    subtotal = quantity * price
+    return {'user_id': 1, 'subtotal': subtotal, 'discount_amount': 0, 'tax_amount': 0,
+            'final_amount': subtotal,
+            'items': [{'product_id': product_id, 'quantity': quantity, 'price': price,
+                       'subtotal': subtotal}]}
+
+
+class SaleTimeCostTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(':memory:')
+        self.product_id = self.db.add_product({
+            'code': 'P001', 'name': 'Kopi', 'category': 'Minuman',
+            'purchase_price': 1000, 'selling_price': 1500, 'stock': 100, 'min_stock': 5})
+    
+    def tearDown(self):
+        self.db.close()
+    
+    def cost(self):
+        with self.db.read() as conn:
+            return conn.execute("SELECT IFNULL(SUM(cost), 0) FROM sales_daily").fetchone()[0]
+    
+    def reprice(self, purchase_price):
+        self.db.update_product(self.product_id, {'purchase_price': purchase_price})
+    
+    def test_rebuild_matches_incremental_after_price_change(self):
+        self.db.record_sale(sale(self.product_id, 3, 1500), {'method': 'cash'})
+        self.reprice(4000)
+        self.db.record_sale(sale(self.product_id, 2, 1500), {'method': 'cash'})
+        self.assertEqual(self.cost(), 3 * 1000 + 2 * 4000)
+        
+        self.db.rebuild_rollups()
+        self.assertEqual(self.cost(), 3 * 1000 + 2 * 4000)
+    
+    def test_void_subtracts_the_cost_recorded_at_sale_time(self):
+        result = self.db.record_sale(sale(self.product_id, 3, 1500), {'method': 'cash'})
+        self.reprice(4000)
+        
+        self.db.void_transaction(result['transaction_id'], 1, "salah input")
+        self.assertEqual(self.cost(), 0)
+
+
+class OldArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "cashier.db"))
+        self.periods = seed_history(self.db, 2, 50, lines=2, end="2024-03")
+        self.archiver = Archiver(self.db, os.path.join(self.tmp.name, "archive"), keep_months=1)
+        self.archiver.archive_period(self.periods[0])
+        # Seolah file arsip dibuat sebelum migrasi 7
+        with sqlite3.connect(self.archiver.archive_path(self.periods[0])) as conn:
+            conn.execute("ALTER TABLE transaction_details DROP COLUMN unit_cost")
+    
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+    
+    def test_union_reads_old_archive(self):
+        rows = list(PartitionedReader(self.db).rows(
+            "SELECT COUNT(*), COUNT(unit_cost) FROM {transaction_details}"))
+        self.assertEqual(rows[0][0], 200)
+    
+    def test_restore_from_old_archive(self):
+        result = self.archiver.restore_period(self.periods[0])
+        self.assertEqual(result['transactions'], 50)
+        with self.db.read() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0], 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
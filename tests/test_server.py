@@ -0,0 +1,109 @@
+# test_server.py
+"""
+Validasi di SalesServer: total penjualan dihitung ulang dari katalog, diskon
+di atas batas kasir butuh token persetujuan sekali pakai, dan sesi yang
+menganggur berakhir.
+
+    python -m pytest tests/test_server.py
+"""
+import hashlib
+import time
+import unittest
+
+from core.permissions import ApprovalRequired, PermissionDenied
+from core.transaction import Cart
+from database.database import Database
+from database.server import DatabaseClient
+from benchmarks.server import BackgroundServer
+
+PAYMENT = {'method': 'cash', 'cash_paid': 1_000_000}
+
+
+def add_user(db, username, role):
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO users (username, password_hash, full_name, role) "
+                     "VALUES (?, ?, ?, ?)",
+                     (username, hashlib.sha256(b"rahasia").hexdigest(), username, role))
+
+
+class SalesServerValidationTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(':memory:')
+        self.product_id = self.db.add_product({
+            'code': "BRS5", 'name': "Beras 5kg", 'category': "Sembako",
+            'purchase_price': 60_000, 'selling_price': 74_999, 'stock': 100, 'min_stock': 1})
+        add_user(self.db, "kasir", 'cashier')
+        add_user(self.db, "spv", 'admin')
+        self.background = BackgroundServer(self.db, session_idle=60)
+        self.server = self.background.__enter__()
+        self.client = DatabaseClient(self.server.host, self.server.port)
+        self.cashier = self.client.authenticate_user("kasir", "rahasia")
+    
+    def tearDown(self):
+        self.client.close()
+        self.background.__exit__(None, None, None)
+        self.db.close()
+    
+    def cart(self, quantity=2, discount=None):
+        cart = Cart()
+        cart.add(self.db.get_product(self.product_id), quantity)
+        if discount:
+            cart.set_discount('percentage', discount)
+        return cart.to_sale(self.cashier['id'])
+    
+    def test_valid_sale_is_recorded(self):
+        result = self.client.record_sale(self.cart(), PAYMENT)
+        self.assertIn('transaction_code', result)
+    
+    def test_tampered_totals_are_rejected(self):
+        for key, value in (('final_amount', 1_000), ('tax_amount', 0), ('subtotal', 10)):
+            sale = self.cart()
+            sale[key] = value
+            with self.assertRaises(ValueError):
+                self.client.record_sale(sale, PAYMENT)
+        # Diskon yang disisipkan dihitung sebagai diskon manual dan dicek batasnya
+        sale = self.cart()
+        sale['discount_amount'] = 50_000
+        with self.assertRaises(PermissionDenied):
+            self.client.record_sale(sale, PAYMENT)
+        self.assertEqual(self.db.count_transactions(), 0)
+    
+    def test_tampered_price_is_rejected(self):
+        sale = self.cart()
+        sale['items'][0]['price'] = 1_000
+        sale['items'][0]['subtotal'] = 2_000
+        with self.assertRaises(ValueError):
+            self.client.record_sale(sale, PAYMENT)
+    
+    def test_discount_over_limit_needs_single_use_approval(self):
+        with self.assertRaises(ApprovalRequired):
+            self.client.record_sale(self.cart(discount=20), PAYMENT)
+        
+        approver = self.client.request_approval("spv", "rahasia", 'discount', 20)
+        self.assertNotIn('session', approver)
+        self.client.record_sale(self.cart(discount=20), PAYMENT, approver=approver)
+        # Token sudah terpakai
+        with self.assertRaises(ApprovalRequired):
+            self.client.record_sale(self.cart(discount=20), PAYMENT, approver=approver)
+    
+    def test_approval_is_scoped_to_amount(self):
+        approver = self.client.request_approval("spv", "rahasia", 'discount', 15)
+        with self.assertRaises(ApprovalRequired):
+            self.client.record_sale(self.cart(discount=20), PAYMENT, approver=approver)
+    
+    def test_supervisor_login_does_not_leave_a_session(self):
+        self.assertIsNotNone(self.client.authenticate_user("spv", "rahasia"))
+        self.assertEqual(len(self.server._sessions), 1)
+        # Sesi terminal tetap milik kasir
+        with self.assertRaises(PermissionDenied):
+            self.client.adjust_stock(self.product_id, 5, self.cashier['id'])
+    
+    def test_idle_session_expires(self):
+        self.server.session_idle = 0.05
+        time.sleep(0.1)
+        with self.assertRaises(PermissionDenied):
+            self.client.count_transactions()
+
+
+if __name__ == "__main__":
+    unittest.main()
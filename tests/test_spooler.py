@@ -0,0 +1,112 @@
+# test_spooler.py
+"""
+PrintSpooler dengan backend palsu: retry tidak menahan printer lain di
+worker yang sama dan shutdown tidak macet pada antrian penuh.
+
+    python -m pytest tests/test_spooler.py
+"""
+import threading
+import time
+import unittest
+
+from core.spooler import DONE, FAILED, PrintSpooler
+
+
+class RecordingBackend:
+    def __init__(self, failures=0, gate=None):
+        self.failures = failures
+        self.gate = gate
+        self.sent = []
+    
+    def send(self, job):
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.failures:
+            self.failures -= 1
+            raise OSError("printer offline")
+        self.sent.append(job.name)
+
+
+class PrintSpoolerTest(unittest.TestCase):
+    def test_retry_does_not_stall_other_printer(self):
+        flaky, healthy = RecordingBackend(failures=2), RecordingBackend()
+        spooler = PrintSpooler({'flaky': flaky, 'healthy': healthy}, workers=1, backoff=0.5)
+        try:
+            first = spooler.submit('flaky', data=b"1", name="a1")
+            second = spooler.submit('flaky', data=b"2", name="a2")
+            other = spooler.submit('healthy', data=b"3", name="b1")
+            
+            self.assertTrue(other.wait(0.4))
+            self.assertEqual(other.status, DONE)
+            self.assertNotEqual(first.status, DONE)
+            
+            self.assertTrue(second.wait(5))
+            self.assertEqual(flaky.sent, ["a1", "a2"])
+            self.assertEqual(first.attempts, 3)
+        finally:
+            spooler.shutdown()
+    
+    def test_shutdown_without_wait_fails_queued_jobs(self):
+        gate = threading.Event()
+        spooler = PrintSpooler({'p': RecordingBackend(gate=gate)}, workers=1, max_queue=2)
+        jobs = [spooler.submit('p', data=b"x", name=f"j{i}") for i in range(3)]
+        time.sleep(0.1)
+        
+        # Antrian penuh dan worker sibuk: shutdown tidak boleh menunggu
+        started = time.monotonic()
+        spooler.shutdown(wait=False)
+        self.assertLess(time.monotonic() - started, 0.5)
+        
+        gate.set()
+        for job in jobs:
+            self.assertTrue(job.wait(5))
+        self.assertEqual(jobs[0].status, DONE)
+        self.assertEqual([job.status for job in jobs[1:]], [FAILED, FAILED])
+    
+    
+    def test_submit_racing_shutdown_never_hangs_join(self):
+        spooler = PrintSpooler({'p': RecordingBackend()}, workers=2)
+        accepted = []
+        
+        def submitter():
+            while True:
+                try:
+                    accepted.append(spooler.submit('p', data=b"x"))
+                except RuntimeError:
+                    return
+        
+        threads = [threading.Thread(target=submitter) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        spooler.shutdown()
+        for thread in threads:
+            thread.join(5)
+        
+        # Setiap job yang diterima sudah selesai, jadi join() langsung kembali
+        joiner = threading.Thread(target=spooler.join, daemon=True)
+        joiner.start()
+        joiner.join(2)
+        self.assertFalse(joiner.is_alive())
+        self.assertTrue(accepted)
+        self.assertTrue(all(job.status == DONE for job in accepted))
+    
+    def test_submit_without_printer_uses_default(self):
+        first, second = RecordingBackend(), RecordingBackend()
+        spooler = PrintSpooler({'kasir': first, 'label': second}, workers=1)
+        try:
+            spooler.submit(None, data=b"x", name="struk").wait(5)
+            self.assertEqual(first.sent, ["struk"])
+        finally:
+            spooler.shutdown()
+        
+        spooler = PrintSpooler({'kasir': first, 'label': second}, default_printer='label')
+        try:
+            spooler.submit(None, data=b"x", name="qr").wait(5)
+            self.assertEqual(second.sent, ["qr"])
+        finally:
+            spooler.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+# test_task_runner.py
+"""
+Penjadwalan periodik TaskRunner tanpa display Tk.
+
+    python -m pytest tests/test_task_runner.py
+"""
+import unittest
+
+from gui.task_runner import TaskRunner
+from conftest import FakeRoot
+
+
+class TaskRunnerEveryTest(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.tasks = TaskRunner(self.root, max_workers=1)
+    
+    def tearDown(self):
+        self.tasks.shutdown()
+    
+    def test_every_replaces_existing_chain(self):
+        calls = []
+        self.tasks.every('refresh', 1000, lambda: calls.append('old'))
+        self.tasks.every('refresh', 1000, lambda: calls.append('new'))
+        calls.clear()
+        
+        self.root.pump()
+        self.assertEqual(calls, ['new'])
+        self.assertEqual(len(self.root._callbacks), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
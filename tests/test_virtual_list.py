@@ -0,0 +1,125 @@
+# test_virtual_list.py
+"""
+VirtualTreeview dengan TaskRunner: scroll dan lompatan jauh tidak menjalankan
+query di thread Tk; baris yang belum dimuat tampil sebagai placeholder lalu
+diisi setelah fetch di pool selesai.
+
+    python -m pytest tests/test_virtual_list.py
+"""
+import threading
+import time
+import unittest
+
+from database.database import Database
+from gui.task_runner import TaskRunner
+from gui.virtual_list import TransactionPageSource, VirtualTreeview
+from benchmarks.workload import seed_products, seed_sales
+from conftest import FakeRoot
+
+
+class FakeTree:
+    def __init__(self):
+        self.values = {}
+    
+    def item(self, item, values=()):
+        self.values[item] = values
+    
+    def selection(self):
+        return ()
+    
+    def selection_remove(self, items):
+        pass
+
+
+class FakeScrollbar:
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+class RecordingDatabase:
+    """Database proxy that records which thread ran each query"""
+    
+    def __init__(self, db):
+        self.db = db
+        self.threads = []
+    
+    def __getattr__(self, name):
+        method = getattr(self.db, name)
+        
+        def call(*args, **kwargs):
+            self.threads.append(threading.current_thread())
+            return method(*args, **kwargs)
+        return call
+
+
+class VirtualTreeviewAsyncTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = Database(':memory:')
+        seed_products(cls.db, 50)
+        seed_sales(cls.db, 3000, days=10)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+    
+    def setUp(self):
+        self.root = FakeRoot()
+        self.tasks = TaskRunner(self.root, max_workers=2)
+        self.recording = RecordingDatabase(self.db)
+        
+        view = VirtualTreeview.__new__(VirtualTreeview)
+        view._w = ".void_list"
+        view.row_values = lambda row: (row['id'], row['transaction_code'])
+        view.height = 15
+        view.prefetch_rows = 50
+        view.tasks = self.tasks
+        view.source = None
+        view.offset = 0
+        view.visible_rows = []
+        view.tree = FakeTree()
+        view.scrollbar = FakeScrollbar()
+        view.items = [f"I{i}" for i in range(view.height)]
+        self.view = view
+    
+    def tearDown(self):
+        self.tasks.shutdown()
+    
+    def pump_until_loaded(self, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while None in self.view.visible_rows or self.tasks._futures:
+            if time.monotonic() > deadline:
+                self.fail("halaman tidak termuat")
+            self.root.pump()
+            time.sleep(0.01)
+    
+    def main_thread_queries(self):
+        return [t for t in self.recording.threads if t is threading.main_thread()]
+    
+    def test_scrolling_never_queries_on_the_tk_thread(self):
+        source = TransactionPageSource(self.recording, {}).load(0)
+        self.recording.threads.clear()
+        
+        self.view.set_source(source)
+        self.assertEqual(self.view.tree.values["I0"], ("", VirtualTreeview.PLACEHOLDER))
+        self.pump_until_loaded()
+        
+        # Lompat ke tengah riwayat (OFFSET lewat transaction_cursor_at) lalu geser sedikit
+        self.view.scroll_to(source.count() // 2)
+        self.assertIn(None, self.view.visible_rows)
+        self.pump_until_loaded()
+        self.view.scroll_by(3)
+        self.pump_until_loaded()
+        
+        self.assertEqual(self.main_thread_queries(), [])
+        self.assertTrue(self.recording.threads)
+        
+        expected = TransactionPageSource(self.db, {}).rows(self.view.offset, self.view.height)
+        self.assertEqual([row['id'] for row in self.view.visible_rows],
+                         [row['id'] for row in expected])
+        self.assertEqual(self.view.tree.values["I0"],
+                         (expected[0]['id'], expected[0]['transaction_code']))
+
+
+if __name__ == "__main__":
+    unittest.main()
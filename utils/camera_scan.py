@@ -0,0 +1,352 @@
+#camera_scan.py
+# cv2 dan pyzbar di-import saat pipeline dipakai supaya startup tetap cepat
+import glob
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LatestFrameBuffer:
+    """
+    One-slot frame buffer between capture and decoding. put() always
+    replaces the waiting frame, so a slow decoder works on the newest frame
+    instead of falling further and further behind; replaced frames are
+    counted as dropped.
+    """
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._closed = False
+        self.dropped = 0
+    
+    def put(self, item, block=False):
+        """Store a frame; with block=True wait until the previous one is taken (no drops)"""
+        with self._cond:
+            if block:
+                while self._item is not None and not self._closed:
+                    self._cond.wait()
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._cond.notify_all()
+    
+    def get(self, timeout=None):
+        """Take the newest frame; None once closed and empty"""
+        with self._cond:
+            while self._item is None and not self._closed:
+                if not self._cond.wait(timeout):
+                    return None
+            item, self._item = self._item, None
+            self._cond.notify_all()
+            return item
+    
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class PyzbarDecoder:
+    """QR and 1D barcodes via zbar"""
+    
+    def __init__(self):
+        from pyzbar.pyzbar import decode
+        self._decode = decode
+    
+    def decode(self, frame):
+        return [obj.data.decode('utf-8', errors='replace') for obj in self._decode(frame)]
+
+
+class OpenCVDecoder:
+    """QR only, via cv2.QRCodeDetector (no zbar dependency)"""
+    
+    def __init__(self):
+        import cv2
+        self._detector = cv2.QRCodeDetector()
+    
+    def decode(self, frame):
+        ok, texts, _, _ = self._detector.detectAndDecodeMulti(frame)
+        return [text for text in texts if text] if ok else []
+
+
+DECODERS = {
+    'pyzbar': PyzbarDecoder,
+    'opencv': OpenCVDecoder,
+}
+
+
+def make_decoder(name):
+    if name not in DECODERS:
+        raise ValueError(f"Decoder tidak dikenal: {name}")
+    return DECODERS[name]()
+
+
+def preprocess(frame, grayscale=True, scale=1.0, roi=None):
+    """
+    Prepare a frame for decoding: crop to roi (x, y, w, h as fractions of
+    the frame), convert to grayscale and downscale by `scale`.
+    """
+    import cv2
+    
+    if roi is not None:
+        height, width = frame.shape[:2]
+        x, y, w, h = roi
+        frame = frame[int(y * height):int((y + h) * height), int(x * width):int((x + w) * width)]
+    if grayscale and frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if scale != 1.0:
+        frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return frame
+
+
+class Debouncer:
+    """
+    Suppress repeats of the same code. A code is reported once and then
+    ignored for as long as it keeps being seen within `window` seconds, so
+    an item held in front of the camera counts as one scan; take it away
+    for longer than the window to scan it again.
+    """
+    
+    def __init__(self, window=1.0):
+        self.window = window
+        self._last_seen = {}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+    
+    def accept(self, code, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            last = self._last_seen.get(code)
+            self._last_seen[code] = now
+            if last is not None and now - last < self.window:
+                self.suppressed += 1
+                return False
+            # Buang entri lama supaya dict tidak tumbuh terus
+            if len(self._last_seen) > 256:
+                self._last_seen = {c: t for c, t in self._last_seen.items()
+                                   if now - t < self.window}
+            return True
+
+
+class CameraSource:
+    """Live camera via cv2.VideoCapture"""
+    
+    live = True
+    
+    def __init__(self, index=0, width=None, height=None):
+        import cv2
+        
+        self.cap = cv2.VideoCapture(index)
+        if width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    
+    def read(self):
+        ok, frame = self.cap.read()
+        return frame if ok else None
+    
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(CameraSource):
+    """
+    Recorded video. With realtime=True frames are paced at the file's FPS
+    (and may be dropped like a real camera); otherwise every frame is
+    decoded as fast as possible.
+    """
+    
+    def __init__(self, path, realtime=False):
+        import cv2
+        
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise ValueError(f"Video tidak bisa dibuka: {path}")
+        self.live = realtime
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+        self._interval = 1.0 / fps if realtime else 0
+        self._next = None
+    
+    def read(self):
+        if self._interval:
+            now = time.perf_counter()
+            if self._next is not None and now < self._next:
+                time.sleep(self._next - now)
+            self._next = max(now, self._next or now) + self._interval
+        return super().read()
+
+
+class ImageSequenceSource:
+    """Image files (a list of paths or a glob pattern), decoded in order"""
+    
+    live = False
+    
+    def __init__(self, paths):
+        self.paths = sorted(glob.glob(paths)) if isinstance(paths, str) else list(paths)
+        self._index = 0
+    
+    def read(self):
+        import cv2
+        
+        while self._index < len(self.paths):
+            path = self.paths[self._index]
+            self._index += 1
+            frame = cv2.imread(path)
+            if frame is not None:
+                return frame
+            logger.warning("Gambar dilewati (tidak bisa dibaca): %s", path)
+        return None
+    
+    def release(self):
+        pass
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class ScanPipeline:
+    """
+    Staged camera scanning: a capture thread only reads frames into a
+    LatestFrameBuffer; decoder worker threads preprocess and decode them,
+    and each code passes a Debouncer before callback(code) is called.
+    
+    callback runs on a decoder thread; GUI code should hand it to the Tk
+    thread (e.g. root.after). Live sources drop stale frames; file sources
+    (live = False) decode every frame and the pipeline ends at end of input.
+    """
+    
+    def __init__(self, source, callback, decoder='pyzbar', workers=1, grayscale=True,
+                 scale=1.0, roi=None, debounce=1.0, max_latency_samples=10000):
+        self.source = source
+        self.callback = callback
+        self.decoder_name = decoder
+        self.workers = workers
+        self.grayscale = grayscale
+        self.scale = scale
+        self.roi = roi
+        self.debouncer = Debouncer(debounce)
+        self.buffer = LatestFrameBuffer()
+        self.max_latency_samples = max_latency_samples
+        
+        self._running = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._frames_captured = 0
+        self._frames_decoded = 0
+        self._codes_emitted = 0
+        self._latencies = []
+        self._decode_times = []
+        self._started = None
+        self._finished = None
+    
+    def start(self):
+        self._running.set()
+        self._started = time.perf_counter()
+        capture = threading.Thread(target=self._capture, name="scan-capture", daemon=True)
+        self._threads = [capture]
+        for index in range(self.workers):
+            # Satu decoder per thread: QRCodeDetector tidak thread-safe
+            decoder = make_decoder(self.decoder_name)
+            self._threads.append(threading.Thread(target=self._decode_loop, args=(decoder,),
+                                                  name=f"scan-decoder-{index}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+    
+    def stop(self):
+        self._running.clear()
+        self.buffer.close()
+    
+    def join(self, timeout=None):
+        """Wait for the pipeline to finish (end of file input or stop())"""
+        for thread in self._threads:
+            thread.join(timeout)
+    
+    def run(self):
+        """Start, wait until the source is exhausted, return stats()"""
+        self.start()
+        self.join()
+        return self.stats()
+    
+    @property
+    def running(self):
+        return self._running.is_set()
+    
+    def _capture(self):
+        block = not getattr(self.source, 'live', True)
+        try:
+            while self._running.is_set():
+                frame = self.source.read()
+                if frame is None:
+                    break
+                self._frames_captured += 1
+                self.buffer.put((time.perf_counter(), frame), block=block)
+        except Exception:
+            logger.exception("Capture kamera gagal")
+        finally:
+            self.source.release()
+            self.buffer.close()
+    
+    def _decode_loop(self, decoder):
+        while True:
+            item = self.buffer.get()
+            if item is None:
+                break
+            captured_at, frame = item
+            
+            started = time.perf_counter()
+            try:
+                codes = decoder.decode(preprocess(frame, self.grayscale, self.scale, self.roi))
+            except Exception:
+                logger.exception("Decode frame gagal")
+                codes = []
+            finished = time.perf_counter()
+            
+            with self._lock:
+                self._frames_decoded += 1
+                self._finished = finished
+                if len(self._latencies) < self.max_latency_samples:
+                    self._latencies.append(finished - captured_at)
+                    self._decode_times.append(finished - started)
+            
+            for code in codes:
+                if self.debouncer.accept(code):
+                    with self._lock:
+                        self._codes_emitted += 1
+                    try:
+                        self.callback(code)
+                    except Exception:
+                        logger.exception("Callback scanner gagal")
+        self._running.clear()
+    
+    def stats(self):
+        """Throughput and latency numbers (latency in ms, capture to decoded)"""
+        with self._lock:
+            latencies = list(self._latencies)
+            decode_times = list(self._decode_times)
+            decoded = self._frames_decoded
+            emitted = self._codes_emitted
+            end = self._finished if not self.running and self._finished else time.perf_counter()
+        elapsed = (end - self._started) if self._started else 0
+        return {
+            'frames_captured': self._frames_captured,
+            'frames_decoded': decoded,
+            'frames_dropped': self.buffer.dropped,
+            'codes_emitted': emitted,
+            'duplicates_suppressed': self.debouncer.suppressed,
+            'seconds': elapsed,
+            'capture_fps': self._frames_captured / elapsed if elapsed else 0,
+            'decode_fps': decoded / elapsed if elapsed else 0,
+            'latency_ms_p50': _percentile(latencies, 50) * 1000,
+            'latency_ms_p95': _percentile(latencies, 95) * 1000,
+            'latency_ms_max': max(latencies, default=0) * 1000,
+            'decode_ms_p50': _percentile(decode_times, 50) * 1000,
+        }
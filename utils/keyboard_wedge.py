@@ -0,0 +1,345 @@
+#keyboard_wedge.py
+# keyboard di-import saat reader dijalankan dengan hardware (bukan trace)
+import bisect
+import json
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Nama tombol `keyboard` yang dipetakan ke karakter
+KEY_CHARS = {'space': ' ', 'minus': '-', 'dot': '.', 'slash': '/', 'decimal': '.'}
+
+
+class BurstDetector:
+    """
+    Split a keystroke stream into scanner codes and human typing. A USB
+    scanner in keyboard-wedge mode types a whole code in a few ms per key; a
+    person needs 80 ms or more. Keys closer together than max_gap_ms form a
+    burst; a burst of at least min_length characters ended by the terminator
+    (or by a pause of end_gap_ms, for scanners without a suffix) is a code.
+    """
+    
+    def __init__(self, max_gap_ms=30, min_length=4, terminator='enter', end_gap_ms=80):
+        self.max_gap = max_gap_ms / 1000
+        self.min_length = min_length
+        self.terminator = terminator
+        self.end_gap = end_gap_ms / 1000
+        self._chars = []
+        self._first = None
+        self._last = None
+        self.human_keys = 0
+    
+    def feed(self, key, t):
+        """Feed one key-down at time t (seconds); returns (code, first_key_time) or None"""
+        result = None
+        if self._last is not None and t - self._last > self.max_gap:
+            # Jeda panjang: burst sebelumnya selesai (tanpa terminator)
+            result = self._finish()
+        
+        if key == self.terminator:
+            return self._finish() or result
+        
+        char = key if len(key) == 1 else KEY_CHARS.get(key)
+        if char is None:
+            return result
+        if not self._chars:
+            self._first = t
+        self._chars.append(char)
+        self._last = t
+        return result
+    
+    def flush(self, now):
+        """Emit a pending burst once no key arrived for end_gap_ms"""
+        if self._last is not None and now - self._last >= self.end_gap:
+            return self._finish()
+        return None
+    
+    @property
+    def pending(self):
+        return self._last is not None
+    
+    def _finish(self):
+        chars, first = self._chars, self._first
+        self._chars, self._first, self._last = [], None, None
+        if len(chars) >= self.min_length:
+            return ''.join(chars), first
+        self.human_keys += len(chars)
+        return None
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds"""
+    
+    BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.samples = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+    
+    def record(self, seconds):
+        ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+            self.samples += 1
+            self.total += ms
+            self.max = max(self.max, ms)
+    
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th percentile"""
+        target = self.samples * pct / 100
+        seen = 0
+        for bound, count in zip(self.BUCKETS_MS + (float('inf'),), self.counts):
+            seen += count
+            if count and seen >= target:
+                return min(bound, self.max)
+        return 0.0
+    
+    def summary(self):
+        labels = [f"<={b}ms" for b in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+        return {
+            'samples': self.samples,
+            'mean_ms': self.total / self.samples if self.samples else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max,
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+
+class EventBus:
+    """
+    Thread-safe publish/subscribe. With a Tk root, events published from
+    any thread are queued and delivered on the Tk thread by a root.after
+    poll; without one, subscribers are called directly on the publishing
+    thread (headless use, benchmarks).
+    
+    The poll runs only while someone is subscribed. When it finds the
+    queue empty its interval doubles up to idle_poll_ms, and drops back to
+    poll_ms as soon as an event arrives. subscribe() and unsubscribe()
+    start and stop the poll, so call them on the Tk thread.
+    """
+    
+    def __init__(self, root=None, poll_ms=10, idle_poll_ms=50):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.idle_poll_ms = max(idle_poll_ms, poll_ms)
+        self._queue = queue.SimpleQueue()
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        self._delay = poll_ms
+        self._closed = False
+    
+    def subscribe(self, topic, callback):
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(callback)
+        self._ensure_polling()
+    
+    def unsubscribe(self, topic, callback):
+        with self._lock:
+            callbacks = self._subscribers.get(topic, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                self._subscribers.pop(topic, None)
+            idle = not self._subscribers
+        if idle:
+            self._cancel_poll()
+    
+    def publish(self, topic, payload):
+        if self.root is None:
+            self._deliver(topic, payload)
+            return
+        with self._lock:
+            # Tanpa subscriber event dibuang, sama seperti tanpa root
+            if topic not in self._subscribers:
+                return
+        self._queue.put((topic, payload))
+    
+    def _deliver(self, topic, payload):
+        with self._lock:
+            callbacks = list(self._subscribers.get(topic, ()))
+        for callback in callbacks:
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("Subscriber %s gagal", topic)
+    
+    def _ensure_polling(self):
+        if self.root is not None and self._timer is None and not self._closed:
+            self._delay = self.poll_ms
+            self._timer = self.root.after(self._delay, self._drain)
+    
+    def _cancel_poll(self):
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+            self._timer = None
+    
+    def _drain(self):
+        self._timer = None
+        delivered = False
+        while True:
+            try:
+                topic, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(topic, payload)
+            delivered = True
+        
+        with self._lock:
+            subscribed = bool(self._subscribers)
+        if not subscribed or self._closed:
+            return
+        # Antrian kosong: poll makin jarang; ada event: kembali ke poll_ms
+        self._delay = self.poll_ms if delivered else min(self._delay * 2, self.idle_poll_ms)
+        self._timer = self.root.after(self._delay, self._drain)
+    
+    def close(self):
+        self._closed = True
+        self._cancel_poll()
+
+
+class ScanEvent:
+    __slots__ = ('code', 'first_key', 'completed')
+    
+    def __init__(self, code, first_key, completed):
+        self.code = code
+        self.first_key = first_key    # waktu event tombol pertama
+        self.completed = completed    # perf_counter saat kode lengkap diterima
+    
+    def __repr__(self):
+        return f"ScanEvent({self.code!r})"
+
+
+class KeyboardWedgeReader:
+    """
+    Event-driven reader for keyboard-wedge scanners. Key events (from the
+    `keyboard` hook or a recorded trace) go into a queue; one thread runs
+    the BurstDetector and publishes each code on the bus as a ScanEvent.
+    Latency from the final keystroke to the subscriber callback is
+    recorded in `latency`.
+    """
+    
+    def __init__(self, bus, detector=None, topic='scan'):
+        self.bus = bus
+        self.detector = detector or BurstDetector()
+        self.topic = topic
+        self.latency = LatencyHistogram()
+        self.codes = 0
+        self._keys = queue.SimpleQueue()
+        self._thread = None
+        self._hook = None
+        self._recording = None
+        self._running = False
+    
+    def subscribe(self, callback):
+        """callback(code) for every scanned code, with latency tracking"""
+        def deliver(event):
+            self.latency.record(time.perf_counter() - event.completed)
+            callback(event.code)
+        
+        self.bus.subscribe(self.topic, deliver)
+        return deliver
+    
+    def feed(self, key, t=None):
+        """Queue one key-down (thread-safe); t is the event time in seconds"""
+        received = time.perf_counter()
+        self._keys.put((key, received if t is None else t, received))
+    
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._process, name="keyboard-wedge", daemon=True)
+        self._thread.start()
+        return self
+    
+    def start_keyboard(self):
+        """Hook the real keyboard (event-driven, no polling)"""
+        import keyboard
+        
+        def on_event(event):
+            if event.event_type == keyboard.KEY_DOWN:
+                self.feed(event.name, event.time)
+        
+        self._hook = keyboard.hook(on_event)
+        return self.start()
+    
+    def stop(self):
+        if self._hook is not None:
+            import keyboard
+            keyboard.unhook(self._hook)
+            self._hook = None
+        self._running = False
+        self._keys.put(None)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _process(self):
+        detector = self.detector
+        while True:
+            try:
+                item = self._keys.get(timeout=detector.end_gap if detector.pending else None)
+            except queue.Empty:
+                # Tidak ada tombol lagi: selesaikan burst tanpa terminator
+                self._emit(detector.flush(float('inf')), time.perf_counter())
+                continue
+            if item is None:
+                self._emit(detector.flush(float('inf')), time.perf_counter())
+                return
+            
+            key, t, received = item
+            if self._recording is not None:
+                self._recording.append((key, t))
+            self._emit(detector.feed(key, t), received)
+    
+    def _emit(self, result, completed):
+        if result is None:
+            return
+        code, first_key = result
+        self.codes += 1
+        self.bus.publish(self.topic, ScanEvent(code, first_key, completed))
+    
+    def record(self):
+        """Start recording keystrokes; stop_recording() returns them as a trace"""
+        self._recording = []
+    
+    def stop_recording(self):
+        trace, self._recording = self._recording or [], None
+        return trace
+
+
+def save_trace(trace, path):
+    """Write keystrokes [(key, t), ...] as JSON lines with times relative to the first"""
+    start = trace[0][1] if trace else 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for key, t in trace:
+            f.write(json.dumps({'key': key, 't': round(t - start, 6)}) + "\n")
+
+
+def load_trace(path):
+    with open(path, encoding='utf-8') as f:
+        return [(row['key'], row['t']) for row in map(json.loads, f) if row]
+
+
+def replay_trace(reader, trace, speed=1.0):
+    """
+    Feed a recorded trace into the reader. speed=1 replays in real time,
+    speed=0 as fast as possible (timestamps keep the original gaps so
+    burst detection behaves the same).
+    """
+    base = time.perf_counter()
+    start = trace[0][1] if trace else 0
+    for key, t in trace:
+        offset = t - start
+        if speed:
+            delay = base + offset / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        reader.feed(key, base + offset)
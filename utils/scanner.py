@@ -1,18 +1,26 @@
 #scanner.py
-import cv2
-from pyzbar.pyzbar import decode
-import threading
-import time
-import keyboard  # For USB scanner emulating keyboard
+# cv2, pyzbar dan keyboard di-import saat scanner benar-benar dipakai
 
 class QRScanner:
-    def __init__(self, scanner_type="auto"):
+    def __init__(self, scanner_type="auto", camera_index=0, camera_options=None, *, root):
         """
         scanner_type: "camera", "keyboard", or "auto"
+        camera_options: ScanPipeline options (decoder, workers, grayscale,
+        scale, roi, debounce)
+        root: Tk root (required); keyboard and camera scans are delivered on
+        the Tk thread, since the callback updates widgets
         """
+        if root is None:
+            raise ValueError("QRScanner butuh root Tk supaya callback jalan di thread Tk")
         self.scanner_type = scanner_type
         self.callback = None
         self.scanning = False
+        self.camera_index = camera_index
+        self.camera_options = camera_options or {'scale': 0.5, 'debounce': 1.0}
+        self.camera_pipeline = None
+        self.camera_bus = None
+        self.keyboard_reader = None
+        self.root = root
         
     def start_scanning(self, callback):
         """Start scanning for QR codes"""
@@ -28,55 +36,39 @@ class QRScanner:
     
     def start_keyboard_scanner(self):
         """Listen for keyboard input (USB barcode scanner)"""
-        def keyboard_listener():
-            buffer = ""
-            while self.scanning:
-                event = keyboard.read_event()
-                if event.event_type == keyboard.KEY_DOWN:
-                    if event.name == 'enter':
-                        if buffer:
-                            self.callback(buffer.strip())
-                            buffer = ""
-                    elif len(event.name) == 1:
-                        buffer += event.name
-                time.sleep(0.01)
+        from utils.keyboard_wedge import EventBus, KeyboardWedgeReader
         
+        # Event-driven: hook keyboard -> antrian -> deteksi burst -> event bus
         self.scanning = True
-        thread = threading.Thread(target=keyboard_listener)
-        thread.daemon = True
-        thread.start()
+        self.keyboard_reader = KeyboardWedgeReader(EventBus(self.root))
+        self.keyboard_reader.subscribe(self.callback)
+        self.keyboard_reader.start_keyboard()
     
     def start_camera_scanner(self):
         """Use camera to scan QR codes"""
-        def camera_scanner():
-            cap = cv2.VideoCapture(0)
-            
-            while self.scanning:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # Decode QR codes
-                decoded_objects = decode(frame)
-                
-                for obj in decoded_objects:
-                    data = obj.data.decode('utf-8')
-                    self.callback(data)
-                
-                # Show camera preview (optional)
-                cv2.imshow('QR Scanner', frame)
-                
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    break
-            
-            cap.release()
-            cv2.destroyAllWindows()
+        from utils.camera_scan import CameraSource, ScanPipeline
+        from utils.keyboard_wedge import EventBus
         
+        # Capture, decode dan debounce berjalan di thread terpisah (tanpa preview);
+        # hasilnya lewat event bus supaya callback jalan di thread Tk
         self.scanning = True
-        thread = threading.Thread(target=camera_scanner)
-        thread.daemon = True
-        thread.start()
+        bus = self.camera_bus = EventBus(self.root)
+        bus.subscribe('scan', self.callback)
+        self.camera_pipeline = ScanPipeline(CameraSource(self.camera_index),
+                                            lambda code: bus.publish('scan', code),
+                                            **self.camera_options)
+        self.camera_pipeline.start()
     
     def stop_scanning(self):
         """Stop all scanning processes"""
-        self.scanning = False
\ No newline at end of file
+        self.scanning = False
+        if self.keyboard_reader is not None:
+            self.keyboard_reader.stop()
+            self.keyboard_reader.bus.close()
+            self.keyboard_reader = None
+        if self.camera_pipeline is not None:
+            self.camera_pipeline.stop()
+            self.camera_pipeline = None
+        if self.camera_bus is not None:
+            self.camera_bus.close()
+            self.camera_bus = None
\ No newline at end of file
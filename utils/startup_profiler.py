@@ -0,0 +1,73 @@
+# startup_profiler.py
+import builtins
+import sys
+import time
+
+# Library berat yang seharusnya belum ter-import saat jendela login muncul
+HEAVY_MODULES = ('matplotlib', 'pandas', 'numpy', 'reportlab', 'qrcode',
+                 'PIL', 'cv2', 'pyzbar', 'keyboard', 'win32api')
+
+
+class StartupProfiler:
+    """
+    Measures import and startup time for `main.py --profile-startup`.
+    Wraps builtins.__import__ to time the first import of each module
+    imported directly by application code (nested imports are included in
+    their parent's time), and records named milestones (e.g. 'login_shown').
+    For a full per-module tree use `python -X importtime main.py`.
+    """
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = []
+        self.imports = {}
+        self._depth = 0
+        self._original_import = None
+    
+    def install(self):
+        """Start timing imports"""
+        self._original_import = builtins.__import__
+        original = self._original_import
+        profiler = self
+        
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules or profiler._depth:
+                return original(name, globals, locals, fromlist, level)
+            
+            # Hanya import terluar yang dihitung (waktu inklusif)
+            profiler._depth += 1
+            started = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                profiler._depth -= 1
+                profiler.imports[name] = profiler.imports.get(name, 0) + time.perf_counter() - started
+        
+        builtins.__import__ = timed_import
+        return self
+    
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+    
+    def mark(self, name):
+        """Record a milestone relative to profiler start"""
+        self.marks.append((name, time.perf_counter() - self.start))
+    
+    def report(self, top=15):
+        """Return the startup report as text"""
+        lines = ["=== Startup profile ==="]
+        for name, elapsed in self.marks:
+            lines.append(f"{name:<30} {elapsed * 1000:9.1f} ms")
+        
+        lines.append("")
+        lines.append(f"Import paling lambat (top {top}, inklusif):")
+        slowest = sorted(self.imports.items(), key=lambda item: item[1], reverse=True)[:top]
+        for name, elapsed in slowest:
+            lines.append(f"  {name:<28} {elapsed * 1000:9.1f} ms")
+        
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        lines.append("")
+        lines.append("Library berat yang sudah ter-import: " + (", ".join(loaded) or "-"))
+        return "\n".join(lines)